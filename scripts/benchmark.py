@@ -0,0 +1,1059 @@
+"""
+Performance benchmarks for LocalMCP
+Run from the repository root, e.g. ``python scripts/benchmark.py index``,
+``python scripts/benchmark.py discovery --output base.json`` or
+``python scripts/benchmark.py compare base.json new.json``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.embedding_backend import (  # noqa: E402
+    EmbeddingBackend,
+    OnnxConfig,
+    load_backend,
+)
+from src.core.tool_index import IndexConfig, ToolIndex, normalize  # noqa: E402
+from src.core.vector_store import VECTOR_DTYPES, VectorStoreIndex  # noqa: E402
+
+
+def synthetic_embeddings(
+    num: int,
+    dimension: int,
+    seed: int = 0,
+    clusters: int = 64,
+    latent_dimension: int = 48,
+) -> np.ndarray:
+    """Clustered unit vectors with a low intrinsic dimension
+
+    Sentence embeddings occupy a low-rank subspace, so points are drawn around
+    cluster centers in a small latent space and projected up to ``dimension``.
+    The projection is fixed so catalogs and queries share the same space.
+    """
+    projection = (
+        np.random.default_rng(12345)
+        .standard_normal((latent_dimension, dimension))
+        .astype("float32")
+    )
+    centers = (
+        np.random.default_rng(54321)
+        .standard_normal((clusters, latent_dimension))
+        .astype("float32")
+    )
+
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, clusters, num)
+    latent = centers[labels] + 0.5 * rng.standard_normal(
+        (num, latent_dimension)
+    ).astype("float32")
+    vectors = latent @ projection
+    vectors += 0.05 * rng.standard_normal((num, dimension)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def percentile_ms(samples: List[float], q: float) -> float:
+    return float(np.percentile(samples, q) * 1000.0)
+
+
+def bench_index(
+    size: int,
+    dimension: int,
+    num_queries: int,
+    k: int,
+    configs: List[Dict[str, Any]],
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Measure recall@k against the flat index and single-query latency"""
+    vectors = synthetic_embeddings(size, dimension, seed)
+    queries = synthetic_embeddings(num_queries, dimension, seed + 1)
+    tools = [
+        SimpleNamespace(
+            id=f"tool_{i}", server_id="server", capabilities=[], requires_auth=False
+        )
+        for i in range(size)
+    ]
+
+    results = []
+    truth = None
+    for params in [{"backend": "flat"}] + configs:
+        config = IndexConfig(**params)
+        start = time.perf_counter()
+        index = ToolIndex(dimension, config, expected_size=size)
+        index.upsert(tools, vectors)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            hits = index.search(query, k)[0]
+            latencies.append(time.perf_counter() - start)
+            found.append({tool.id for tool, _ in hits})
+
+        if truth is None:
+            truth = found
+        recall = float(np.mean([len(f & t) / k for f, t in zip(found, truth)]))
+
+        results.append(
+            {
+                "catalog_size": size,
+                "backend": index.backend,
+                "params": params,
+                "build_seconds": build_seconds,
+                f"recall_at_{k}": recall,
+                "latency_p50_ms": percentile_ms(latencies, 50),
+                "latency_p99_ms": percentile_ms(latencies, 99),
+            }
+        )
+    return results
+
+
+def run_index_benchmark(args) -> List[Dict[str, Any]]:
+    configs = []
+    for ef in args.ef_search:
+        configs.append({"backend": "hnsw", "ef_search": ef})
+    for nprobe in args.nprobe:
+        configs.append({"backend": "ivf_pq", "nprobe": nprobe})
+
+    results = []
+    for size in args.sizes:
+        results.extend(
+            bench_index(size, args.dimension, args.queries, args.k, configs, args.seed)
+        )
+    return results
+
+
+def catalog_texts(
+    path: str, num_queries: int, seed: int
+) -> Tuple[List[str], List[str]]:
+    """Tool texts of a JSON catalog (list of {name, description, server_name})
+    and a sample of tool descriptions, reworded as intents"""
+    with open(path) as f:
+        catalog = json.load(f)
+    texts = [
+        f"{tool.get('server_name', '')} {tool['name']} {tool.get('description', '')}"
+        for tool in catalog
+    ]
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(catalog), size=min(num_queries, len(catalog)), replace=False)
+    intents = [
+        f"I need to {catalog[i].get('description') or catalog[i]['name']}"
+        for i in picks
+    ]
+    return texts, intents
+
+
+def load_catalog(path: str, model_name: str, num_queries: int, seed: int):
+    """Embed ``catalog_texts`` with the PyTorch model; intents are the queries"""
+    texts, intents = catalog_texts(path, num_queries, seed)
+    model = load_backend(model_name)
+    return (normalize(model.encode(texts)), normalize(model.encode(intents)))
+
+
+def index_bytes(index: ToolIndex) -> int:
+    """Memory held by the vector matrix plus the FAISS index"""
+    faiss_bytes = 0
+    if not isinstance(index.index, VectorStoreIndex):
+        # Imported here so it is not counted in the orchestrator import time
+        import faiss
+
+        faiss_bytes = len(faiss.serialize_index(index.index))
+    return index.vectors.nbytes + faiss_bytes
+
+
+def bench_quantization(
+    vectors: np.ndarray, queries: np.ndarray, k: int, backends: List[str]
+) -> List[Dict[str, Any]]:
+    """Memory per storage dtype against ranking change vs float32 flat"""
+    tools = [
+        SimpleNamespace(
+            id=f"tool_{i}", capabilities=[], requires_auth=False, server_id="bench"
+        )
+        for i in range(len(vectors))
+    ]
+    dimension = vectors.shape[1]
+
+    results = []
+    truth = None
+    baseline_bytes = None
+    for backend in backends:
+        for dtype in VECTOR_DTYPES:
+            index = ToolIndex(
+                dimension, IndexConfig(backend=backend, vector_dtype=dtype)
+            )
+            index.upsert(tools, vectors)
+            hits = index.search(queries, k)
+            ranked = [[tool.id for tool, _ in row] for row in hits]
+            if truth is None:
+                truth = ranked
+                baseline_bytes = index_bytes(index)
+
+            # Where each float32 top-k tool landed in this ranking (k+1 if missing)
+            displacement = [
+                abs(row.index(tool_id) - rank) if tool_id in row else k + 1 - rank
+                for row, expected in zip(ranked, truth)
+                for rank, tool_id in enumerate(expected)
+            ]
+            memory = index_bytes(index)
+            results.append(
+                {
+                    "catalog_size": len(vectors),
+                    "backend": index.backend,
+                    "vector_dtype": dtype,
+                    "memory_bytes": memory,
+                    "memory_ratio": memory / baseline_bytes,
+                    f"recall_at_{k}": float(
+                        np.mean(
+                            [
+                                len(set(row) & set(expected)) / k
+                                for row, expected in zip(ranked, truth)
+                            ]
+                        )
+                    ),
+                    "top1_agreement": float(
+                        np.mean(
+                            [
+                                bool(row) and row[0] == expected[0]
+                                for row, expected in zip(ranked, truth)
+                            ]
+                        )
+                    ),
+                    "mean_rank_displacement": float(np.mean(displacement)),
+                }
+            )
+    return results
+
+
+def run_quantization_benchmark(args) -> List[Dict[str, Any]]:
+    if args.catalog:
+        vectors, queries = load_catalog(
+            args.catalog, args.model, args.queries, args.seed
+        )
+        return bench_quantization(vectors, queries, args.k, args.backends)
+
+    results = []
+    for size in args.sizes:
+        vectors = synthetic_embeddings(size, args.dimension, args.seed)
+        queries = synthetic_embeddings(args.queries, args.dimension, args.seed + 1)
+        results.extend(bench_quantization(vectors, queries, args.k, args.backends))
+    return results
+
+
+# Simulated MCP environment -------------------------------------------------
+
+VERBS = [
+    "read",
+    "write",
+    "list",
+    "search",
+    "create",
+    "delete",
+    "update",
+    "query",
+    "fetch",
+    "send",
+    "convert",
+    "summarize",
+    "analyze",
+    "deploy",
+    "monitor",
+    "sync",
+]
+NOUNS = [
+    "file",
+    "issue",
+    "repository",
+    "email",
+    "calendar event",
+    "database row",
+    "document",
+    "image",
+    "ticket",
+    "message",
+    "invoice",
+    "container",
+    "log",
+    "metric",
+    "spreadsheet",
+    "contact",
+    "branch",
+    "dataset",
+    "webhook",
+    "report",
+]
+DOMAINS = [
+    "github",
+    "slack",
+    "postgres",
+    "s3",
+    "jira",
+    "gmail",
+    "docker",
+    "drive",
+    "stripe",
+    "notion",
+    "kubernetes",
+    "salesforce",
+    "sentry",
+    "figma",
+]
+CAPABILITIES = ["read", "write", "search", "admin", "network", "filesystem", "billing"]
+
+
+def synthetic_catalog(
+    size: int, tools_per_server: int = 20, seed: int = 0
+) -> List[SimpleNamespace]:
+    """Tool-shaped records with realistic names, descriptions and flags"""
+    rng = np.random.default_rng(seed)
+    num_servers = max(1, size // tools_per_server)
+    tools = []
+    for i in range(size):
+        server = i % num_servers
+        domain = DOMAINS[server % len(DOMAINS)]
+        verb, noun = VERBS[rng.integers(len(VERBS))], NOUNS[rng.integers(len(NOUNS))]
+        capabilities = list(
+            rng.choice(CAPABILITIES, size=rng.integers(1, 3), replace=False)
+        )
+        tools.append(
+            SimpleNamespace(
+                id=f"tool_{i}",
+                name=f"{domain}_{verb}_{noun.replace(' ', '_')}_{i}",
+                server_id=f"server_{server}",
+                server_name=f"{domain}-{server}",
+                description=f"{verb.capitalize()} a {noun} in {domain}",
+                capabilities=capabilities,
+                requires_auth=bool(rng.random() < 0.1),
+                idempotent=verb in ("read", "list", "search", "query", "fetch"),
+                cacheable=verb in ("read", "list", "search"),
+                input_schema={},
+            )
+        )
+    return tools
+
+
+def synthetic_intents(
+    tools: List[SimpleNamespace],
+    count: int,
+    repeat_ratio: float = 0.0,
+    seed: int = 0,
+    named_ratio: float = 0.0,
+) -> List[str]:
+    """Natural-language intents; ``repeat_ratio`` of them repeat an earlier one
+    and ``named_ratio`` name a tool directly ("<server> <tool name>")
+    """
+    rng = np.random.default_rng(seed)
+    intents = []
+    for _ in range(count):
+        if intents and rng.random() < repeat_ratio:
+            intents.append(intents[rng.integers(len(intents))])
+            continue
+        tool = tools[rng.integers(len(tools))]
+        if rng.random() < named_ratio:
+            intents.append(f"{tool.server_name} {tool.name}")
+            continue
+        prefix = ["I need to", "please", "help me", "can you"][rng.integers(4)]
+        intents.append(
+            f"{prefix} {tool.description.lower()} #{rng.integers(1_000_000)}"
+        )
+    return intents
+
+
+class HashingBackend(EmbeddingBackend):
+    """Deterministic bag-of-words encoder standing in for the embedding model
+
+    Lets the suite run offline and measure orchestrator overhead without
+    model inference dominating every number. ``config`` is the dimension.
+    """
+
+    name = "hashing"
+
+    def __init__(self, model_name: str, config: Optional[int] = None):
+        super().__init__(model_name, config)
+        self.dimension = config or 384
+        self._tokens: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def cache_id(cls, model_name: str, config: Optional[int] = None) -> str:
+        return f"hashing-{config or 384}"
+
+    def _token_vector(self, token: str) -> np.ndarray:
+        vector = self._tokens.get(token)
+        if vector is None:
+            rng = np.random.default_rng(zlib.crc32(token.encode()))
+            vector = self._tokens[token] = rng.standard_normal(self.dimension).astype(
+                "float32"
+            )
+        return vector
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                vectors[row] += self._token_vector(token)
+        return normalize(vectors)
+
+
+class SimulatedRegistry:
+    """In-memory tool registry with the interface the orchestrator uses"""
+
+    def __init__(self, tools: List[SimpleNamespace]):
+        self.tools = {tool.id: tool for tool in tools}
+
+    async def get_all_tools(self) -> List[SimpleNamespace]:
+        return list(self.tools.values())
+
+    async def get_tool(self, tool_id: str) -> Optional[SimpleNamespace]:
+        return self.tools.get(tool_id)
+
+
+class InMemoryCache:
+    """Stand-in for the shared cache tier"""
+
+    def __init__(self):
+        self.entries: Dict[str, Any] = {}
+
+    async def get(self, key: str) -> Any:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self.entries[key] = value
+
+    async def delete(self, key: str):
+        self.entries.pop(key, None)
+
+
+class SimulatedServerError(Exception):
+    pass
+
+
+class SimulatedServer:
+    """Fake MCP server with lognormal latency and random failures
+
+    ``latency_ms`` is the median; ``sigma`` is the log-space spread, so the
+    p99 is about ``latency_ms * exp(2.33 * sigma)``.
+    """
+
+    def __init__(
+        self,
+        server_id: str,
+        latency_ms: float = 20.0,
+        sigma: float = 0.5,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.server_id = server_id
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self.rng = np.random.default_rng(seed)
+        self.calls = 0
+
+    async def call(self, tool: Any, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        await asyncio.sleep(
+            self.latency_ms * self.rng.lognormal(0.0, self.sigma) / 1000.0
+        )
+        if self.rng.random() < self.failure_rate:
+            raise SimulatedServerError(f"{self.server_id} failed")
+        return {"tool": tool.id, "value": self.calls}
+
+
+def simulated_servers(tools: List[SimpleNamespace], args) -> Dict[str, SimulatedServer]:
+    """One server per distinct ``server_id``; ``--slow-fraction`` get 10x latency"""
+    rng = np.random.default_rng(args.seed)
+    servers = {}
+    for server_id in sorted({tool.server_id for tool in tools}):
+        slow = rng.random() < args.slow_fraction
+        servers[server_id] = SimulatedServer(
+            server_id,
+            latency_ms=args.latency_ms * (10 if slow else 1),
+            sigma=args.latency_sigma,
+            failure_rate=args.failure_rate,
+            seed=int(rng.integers(1 << 31)),
+        )
+    return servers
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+async def drive(
+    operation: Callable[[Any], Awaitable[Any]], items: Iterable[Any], concurrency: int
+) -> Tuple[List[float], int, float]:
+    """Run ``operation`` over ``items`` with at most ``concurrency`` in flight
+
+    Returns per-operation latencies (seconds), the number that raised, and
+    the wall-clock time.
+    """
+    queue = list(items)
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while queue:
+            item = queue.pop()
+            start = time.perf_counter()
+            try:
+                await operation(item)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def load_summary(latencies: List[float], errors: int, wall: float) -> Dict[str, Any]:
+    return {
+        "operations": len(latencies),
+        "errors": errors,
+        "throughput_per_second": len(latencies) / wall if wall > 0 else 0.0,
+        "latency_p50_ms": percentile_ms(latencies, 50) if latencies else None,
+        "latency_p99_ms": percentile_ms(latencies, 99) if latencies else None,
+    }
+
+
+_import_seconds: Optional[float] = None
+
+
+def import_orchestrator():
+    """The orchestrator class; the first call times the module import"""
+    global _import_seconds
+    start = time.perf_counter()
+    from src.core.orchestrator import SemanticToolOrchestrator
+
+    if _import_seconds is None:
+        _import_seconds = time.perf_counter() - start
+    return SemanticToolOrchestrator
+
+
+async def build_orchestrator(
+    tools: List[SimpleNamespace], args
+) -> Tuple[Any, Dict[str, Any]]:
+    """Construct and initialize an orchestrator, measuring cold start
+
+    Initialization runs in background mode, so the lexical-ready time (when
+    discovery first answers) and the semantic-ready time are both reported.
+    """
+    SemanticToolOrchestrator = import_orchestrator()
+    from src.core.lexical_index import RetrievalConfig
+    from src.core.model_executor import ExecutorConfig
+
+    if args.encoder == "hashing":
+        executor_config = ExecutorConfig(
+            backend=HashingBackend, backend_config=args.dimension
+        )
+    elif args.encoder == "onnx":
+        executor_config = ExecutorConfig(
+            backend="onnx",
+            backend_config=OnnxConfig(intra_op_threads=args.intra_op_threads),
+        )
+    else:
+        executor_config = ExecutorConfig()
+
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    orchestrator = SemanticToolOrchestrator(
+        SimulatedRegistry(tools),
+        InMemoryCache(),
+        embedding_model=args.model,
+        executor_config=executor_config,
+        retrieval_config=RetrievalConfig(
+            fast_path=args.retrieval == "hybrid", fusion=args.retrieval == "hybrid"
+        ),
+    )
+    constructed = time.perf_counter()
+    await orchestrator.initialize(wait=False)
+    lexical_ready = time.perf_counter()
+    if not await orchestrator.wait_until_ready():
+        raise RuntimeError(f"Orchestrator did not warm up: {orchestrator.warmup_error}")
+    ready = time.perf_counter()
+
+    return orchestrator, {
+        "import_seconds": _import_seconds,
+        "construct_seconds": constructed - start,
+        "lexical_ready_seconds": lexical_ready - start,
+        "cold_start_seconds": ready - start,
+        "rss_delta_bytes": rss_bytes() - rss_before,
+        "index_bytes": index_bytes(orchestrator.semantic_index),
+    }
+
+
+async def bench_discovery(size: int, args) -> List[Dict[str, Any]]:
+    tools = synthetic_catalog(size, seed=args.seed)
+    orchestrator, startup = await build_orchestrator(tools, args)
+    results = []
+    try:
+        # Exact-name ranking: share of "<server> <tool name>" intents whose
+        # top result is that tool
+        rng = np.random.default_rng(args.seed)
+        sample = [
+            tools[i]
+            for i in rng.choice(len(tools), min(200, len(tools)), replace=False)
+        ]
+        top1 = 0
+        for tool in sample:
+            scored = await orchestrator.discover_tools(
+                f"{tool.server_name} {tool.name}", {}, top_k=1
+            )
+            top1 += bool(scored) and scored[0].tool.id == tool.id
+        exact_name_top1 = top1 / len(sample)
+
+        for concurrency in args.concurrency:
+            # Fresh cache per level so every level sees the same hit ratio
+            await orchestrator.discovery_cache.invalidate()
+            intents = synthetic_intents(
+                tools,
+                args.requests,
+                args.repeat_ratio,
+                seed=args.seed + concurrency,
+                named_ratio=args.named_ratio,
+            )
+            latencies, errors, wall = await drive(
+                lambda intent: orchestrator.discover_tools(intent, {}, top_k=args.k),
+                intents,
+                concurrency,
+            )
+            results.append(
+                {
+                    "case": f"discovery/{size}/c{concurrency}",
+                    "catalog_size": size,
+                    "concurrency": concurrency,
+                    "encoder": args.encoder,
+                    "retrieval": args.retrieval,
+                    **startup,
+                    **load_summary(latencies, errors, wall),
+                    "cache_hit_rate": orchestrator.discovery_cache.get_metrics().get(
+                        "hit_rate"
+                    ),
+                    "exact_name_top1": exact_name_top1,
+                }
+            )
+    finally:
+        orchestrator.executor.shutdown(wait=False)
+    return results
+
+
+def synthetic_plan(
+    tools: List[SimpleNamespace],
+    num_calls: int,
+    rng: np.random.Generator,
+    dependency_ratio: float = 0.3,
+) -> List[Dict[str, Any]]:
+    """Tool calls where each call references an earlier one with some probability"""
+    calls = []
+    for i in range(num_calls):
+        inputs = {"query": f"value {i}"}
+        if i and rng.random() < dependency_ratio:
+            inputs["source"] = f"$call_{rng.integers(i)}.value"
+        calls.append(
+            {
+                "id": f"call_{i}",
+                "tool": tools[rng.integers(len(tools))],
+                "inputs": inputs,
+            }
+        )
+    return calls
+
+
+async def bench_planning(size: int, args) -> List[Dict[str, Any]]:
+    tools = synthetic_catalog(size, seed=args.seed)
+    orchestrator, startup = await build_orchestrator(tools, args)
+    servers = simulated_servers(tools, args)
+    rng = np.random.default_rng(args.seed)
+
+    # Latency history so planning estimates from per-tool sketches; plans
+    # draw from these tools
+    history = tools[:2_000]
+    for tool in history:
+        server = servers[tool.server_id]
+        for latency in server.latency_ms * rng.lognormal(0.0, server.sigma, 32):
+            orchestrator.record_execution(tool, True, float(latency))
+
+    async def invoke(tool: Any, inputs: Dict[str, Any]) -> Any:
+        return await servers[tool.server_id].call(tool, inputs)
+
+    async def execute(plan: Any) -> None:
+        failed = 0
+        async for result in orchestrator.execute_plan(plan, invoke):
+            failed += not result.ok
+        if failed:
+            raise SimulatedServerError(f"{failed} calls failed")
+
+    results = []
+    try:
+        for num_calls in args.calls:
+            for concurrency in args.concurrency:
+                specs = [
+                    synthetic_plan(history, num_calls, rng, args.dependency_ratio)
+                    for _ in range(args.requests)
+                ]
+                plans = []
+
+                async def create(spec):
+                    plans.append(await orchestrator.create_execution_plan(spec))
+
+                latencies, errors, wall = await drive(create, specs, concurrency)
+                results.append(
+                    {
+                        "case": f"planning/create/{size}/n{num_calls}/c{concurrency}",
+                        "catalog_size": size,
+                        "calls": num_calls,
+                        "concurrency": concurrency,
+                        **startup,
+                        **load_summary(latencies, errors, wall),
+                        "estimated_p95_ms": float(
+                            np.median([p.duration.p95 for p in plans])
+                        ),
+                    }
+                )
+
+                executed = plans[: args.execute_plans]
+                latencies, errors, wall = await drive(execute, executed, concurrency)
+                results.append(
+                    {
+                        "case": f"planning/execute/{size}/n{num_calls}/c{concurrency}",
+                        "catalog_size": size,
+                        "calls": num_calls,
+                        "concurrency": concurrency,
+                        **load_summary(latencies, errors, wall),
+                    }
+                )
+    finally:
+        orchestrator.executor.shutdown(wait=False)
+    return results
+
+
+async def bench_breaker(args) -> List[Dict[str, Any]]:
+    """Breaker overhead and behaviour against one simulated server per case"""
+    from src.core.circuit_breaker import MCPCircuitBreaker
+
+    results = []
+    for failure_rate in args.failure_rates:
+        for concurrency in args.concurrency:
+            server = SimulatedServer(
+                "bench",
+                args.latency_ms,
+                args.latency_sigma,
+                failure_rate,
+                seed=args.seed,
+            )
+            breaker = MCPCircuitBreaker("bench")
+            tool = SimpleNamespace(id="bench_tool", server_id="bench")
+
+            async def direct(_):
+                await server.call(tool, {})
+
+            async def guarded(_):
+                await breaker.call(server.call, tool, {})
+
+            baseline, _, _ = await drive(direct, range(args.requests), concurrency)
+            latencies, errors, wall = await drive(
+                guarded, range(args.requests), concurrency
+            )
+            metrics = breaker.get_metrics()
+            results.append(
+                {
+                    "case": f"breaker/f{failure_rate}/c{concurrency}",
+                    "failure_rate": failure_rate,
+                    "concurrency": concurrency,
+                    **load_summary(latencies, errors, wall),
+                    "server_p50_ms": percentile_ms(baseline, 50),
+                    "server_p99_ms": percentile_ms(baseline, 99),
+                    "server_calls": server.calls - len(baseline),
+                    "final_state": metrics["state"],
+                    "rejected": metrics["total_calls"] - (server.calls - len(baseline)),
+                    "adaptive_timeout_seconds": metrics["current_timeout"],
+                }
+            )
+    return results
+
+
+def run_discovery_benchmark(args) -> List[Dict[str, Any]]:
+    results = []
+    for size in args.sizes:
+        results.extend(asyncio.run(bench_discovery(size, args)))
+    return results
+
+
+def run_planning_benchmark(args) -> List[Dict[str, Any]]:
+    results = []
+    for size in args.sizes:
+        results.extend(asyncio.run(bench_planning(size, args)))
+    return results
+
+
+def run_breaker_benchmark(args) -> List[Dict[str, Any]]:
+    return asyncio.run(bench_breaker(args))
+
+
+# Results -------------------------------------------------------------------
+
+
+def run_metadata() -> Dict[str, Any]:
+    """Where and on what the results were produced, for cross-commit comparison"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import faiss
+
+    return {
+        "git_commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "faiss": getattr(faiss, "__version__", None),
+    }
+
+
+# Numeric fields that identify a case rather than measure it
+CASE_FIELDS = {"catalog_size", "concurrency", "calls", "failure_rate"}
+
+
+def case_key(result: Dict[str, Any]) -> str:
+    """Identity of a result row: its ``case`` or its non-metric fields"""
+    if "case" in result:
+        return result["case"]
+    identity = {
+        key: value
+        for key, value in result.items()
+        if isinstance(value, (str, dict)) or key in CASE_FIELDS
+    }
+    return json.dumps(identity, sort_keys=True)
+
+
+def compare_results(args) -> List[Dict[str, Any]]:
+    """Relative change of every numeric metric between two result files"""
+    with open(args.base) as f:
+        base = {case_key(row): row for row in json.load(f)["results"]}
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+
+    results = []
+    for row in new:
+        before = base.get(case_key(row))
+        if before is None:
+            continue
+        changes = {}
+        for key, value in row.items():
+            old = before.get(key)
+            if key in CASE_FIELDS:
+                continue
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and isinstance(old, (int, float))
+                and old
+            ):
+                changes[key] = {
+                    "base": old,
+                    "new": value,
+                    "change": (value - old) / abs(old),
+                }
+        results.append({"case": case_key(row), "metrics": changes})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser(
+        "index", help="Recall vs latency of ANN index backends against flat"
+    )
+    index_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000]
+    )
+    index_parser.add_argument("--dimension", type=int, default=384)
+    index_parser.add_argument("--queries", type=int, default=200)
+    index_parser.add_argument("-k", type=int, default=20)
+    index_parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 128])
+    index_parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 32])
+    index_parser.add_argument("--seed", type=int, default=0)
+    index_parser.add_argument("--output", help="Write JSON results to this file")
+    index_parser.set_defaults(func=run_index_benchmark)
+
+    quant_parser = subparsers.add_parser(
+        "quantization",
+        help="Memory saved vs ranking change of quantized vector storage",
+    )
+    quant_parser.add_argument(
+        "--catalog", help="JSON tool catalog to embed instead of synthetic vectors"
+    )
+    quant_parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    quant_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000]
+    )
+    quant_parser.add_argument("--dimension", type=int, default=384)
+    quant_parser.add_argument("--queries", type=int, default=200)
+    quant_parser.add_argument("-k", type=int, default=10)
+    quant_parser.add_argument("--backends", nargs="+", default=["flat", "hnsw"])
+    quant_parser.add_argument("--seed", type=int, default=0)
+    quant_parser.add_argument("--output", help="Write JSON results to this file")
+    quant_parser.set_defaults(func=run_quantization_benchmark)
+
+    def add_simulation_args(sub, requests: int):
+        sub.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+        sub.add_argument(
+            "--requests", type=int, default=requests, help="Operations per case"
+        )
+        sub.add_argument(
+            "--latency-ms",
+            type=float,
+            default=20.0,
+            help="Median simulated server latency",
+        )
+        sub.add_argument(
+            "--latency-sigma",
+            type=float,
+            default=0.5,
+            help="Log-space spread of server latency",
+        )
+        sub.add_argument("--seed", type=int, default=0)
+        sub.add_argument("--output", help="Write JSON results to this file")
+
+    def add_orchestrator_args(sub):
+        sub.add_argument(
+            "--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000]
+        )
+        sub.add_argument(
+            "--encoder",
+            choices=["hashing", "model", "onnx"],
+            default="hashing",
+            help="hashing: offline stand-in encoder; model: --model on PyTorch; "
+            "onnx: --model on ONNX Runtime, int8",
+        )
+        sub.add_argument(
+            "--intra-op-threads",
+            type=int,
+            default=0,
+            help="ONNX Runtime threads per inference (0: physical cores)",
+        )
+        sub.add_argument("--model", default="all-MiniLM-L6-v2")
+        sub.add_argument(
+            "--dimension",
+            type=int,
+            default=384,
+            help="Embedding dimension of the hashing encoder",
+        )
+        sub.add_argument(
+            "--retrieval",
+            choices=["hybrid", "vector"],
+            default="hybrid",
+            help="hybrid: lexical fast path + RRF fusion; vector: embeddings only",
+        )
+
+    discovery_parser = subparsers.add_parser(
+        "discovery", help="discover_tools throughput/latency, memory and cold start"
+    )
+    add_orchestrator_args(discovery_parser)
+    add_simulation_args(discovery_parser, requests=2_000)
+    discovery_parser.add_argument("-k", type=int, default=5)
+    discovery_parser.add_argument(
+        "--repeat-ratio",
+        type=float,
+        default=0.2,
+        help="Fraction of intents repeating an earlier one",
+    )
+    discovery_parser.add_argument(
+        "--named-ratio",
+        type=float,
+        default=0.2,
+        help="Fraction of intents naming a tool exactly",
+    )
+    discovery_parser.set_defaults(func=run_discovery_benchmark)
+
+    planning_parser = subparsers.add_parser(
+        "planning", help="create_execution_plan and plan execution on simulated servers"
+    )
+    add_orchestrator_args(planning_parser)
+    add_simulation_args(planning_parser, requests=200)
+    planning_parser.add_argument(
+        "--calls",
+        type=int,
+        nargs="+",
+        default=[10, 50, 200],
+        help="Tool calls per plan",
+    )
+    planning_parser.add_argument("--dependency-ratio", type=float, default=0.3)
+    planning_parser.add_argument(
+        "--execute-plans",
+        type=int,
+        default=20,
+        help="Plans per case that are also executed",
+    )
+    planning_parser.add_argument("--failure-rate", type=float, default=0.0)
+    planning_parser.add_argument(
+        "--slow-fraction",
+        type=float,
+        default=0.1,
+        help="Fraction of servers with 10x latency",
+    )
+    planning_parser.set_defaults(func=run_planning_benchmark)
+
+    breaker_parser = subparsers.add_parser(
+        "breaker", help="MCPCircuitBreaker.call overhead and tripping under failures"
+    )
+    add_simulation_args(breaker_parser, requests=2_000)
+    breaker_parser.add_argument(
+        "--failure-rates", type=float, nargs="+", default=[0.0, 0.05, 0.5]
+    )
+    breaker_parser.set_defaults(func=run_breaker_benchmark)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Relative change between two --output files"
+    )
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--output", help="Write JSON results to this file")
+    compare_parser.set_defaults(func=compare_results)
+
+    args = parser.parse_args()
+    results = args.func(args)
+
+    payload = json.dumps(
+        {"command": args.command, "metadata": run_metadata(), "results": results},
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+    print(payload)
+
+
+if __name__ == "__main__":
+    main()
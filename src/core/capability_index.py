@@ -0,0 +1,124 @@
+"""
+Capability Bitset Index
+Interned capability bitmasks per index slot so context filters become one
+vectorized mask that can be pushed into the vector search
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Optional
+
+import numpy as np
+
+from ..mcp.tool_registry import Tool
+
+# Interned like a capability so auth filtering shares the bitmask path
+REQUIRES_AUTH = "__requires_auth__"
+
+
+@dataclass(frozen=True)
+class ToolFilter:
+    """Constraints a discovered tool must satisfy"""
+
+    capabilities: FrozenSet[str] = frozenset()
+    requires_auth: bool = False
+    excluded_servers: FrozenSet[str] = field(default_factory=frozenset)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.capabilities or self.requires_auth or self.excluded_servers)
+
+    def matches(self, tool: Tool) -> bool:
+        """Per-tool check, for candidates that did not come through the bitmask"""
+        return (
+            self.capabilities.issubset(tool.capabilities)
+            and (tool.requires_auth or not self.requires_auth)
+            and tool.server_id not in self.excluded_servers
+        )
+
+
+class CapabilityIndex:
+    """
+    Per-slot capability bitmasks and server codes
+
+    Rows line up with ``ToolIndex`` slots. Capability names are interned to
+    bit positions on first sight; the mask grows by one uint64 word per 64
+    distinct capabilities.
+    """
+
+    def __init__(self):
+        self.capability_bits: Dict[str, int] = {}
+        self.server_codes: Dict[str, int] = {}
+        self.masks = np.zeros((0, 1), dtype="uint64")
+        self.servers = np.zeros(0, dtype="int32")
+        self.valid = np.zeros(0, dtype=bool)
+
+    def _bit(self, capability: str) -> int:
+        bit = self.capability_bits.get(capability)
+        if bit is None:
+            bit = self.capability_bits[capability] = len(self.capability_bits)
+            if bit >= 64 * self.masks.shape[1]:
+                self.masks = np.hstack(
+                    [self.masks, np.zeros((len(self.masks), 1), dtype="uint64")]
+                )
+        return bit
+
+    def _ensure_capacity(self, slot: int):
+        if slot < len(self.valid):
+            return
+        capacity = max(16, slot + 1, 2 * len(self.valid))
+        grow = capacity - len(self.valid)
+        self.masks = np.vstack(
+            [self.masks, np.zeros((grow, self.masks.shape[1]), dtype="uint64")]
+        )
+        self.servers = np.concatenate([self.servers, np.full(grow, -1, dtype="int32")])
+        self.valid = np.concatenate([self.valid, np.zeros(grow, dtype=bool)])
+
+    def set(self, slot: int, tool: Tool):
+        """Record a tool's capabilities, auth flag and server for a slot"""
+        names = list(tool.capabilities)
+        if tool.requires_auth:
+            names.append(REQUIRES_AUTH)
+        bits = [self._bit(name) for name in names]
+        self._ensure_capacity(slot)
+
+        self.masks[slot] = 0
+        for bit in bits:
+            self.masks[slot, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        self.servers[slot] = self.server_codes.setdefault(
+            tool.server_id, len(self.server_codes)
+        )
+        self.valid[slot] = True
+
+    def clear(self, slots: Iterable[int]):
+        slots = [slot for slot in slots if slot < len(self.valid)]
+        self.valid[slots] = False
+        self.masks[slots] = 0
+
+    def mask(self, tool_filter: Optional[ToolFilter], num_slots: int) -> np.ndarray:
+        """Boolean mask over the first ``num_slots`` slots of live, matching tools"""
+        self._ensure_capacity(max(num_slots - 1, 0))
+        allowed = self.valid[:num_slots].copy()
+        if tool_filter is None:
+            return allowed
+
+        names = set(tool_filter.capabilities)
+        if tool_filter.requires_auth:
+            names.add(REQUIRES_AUTH)
+        if names:
+            if not names.issubset(self.capability_bits):
+                # Nothing indexed provides one of the capabilities
+                return np.zeros(num_slots, dtype=bool)
+            required = np.zeros(self.masks.shape[1], dtype="uint64")
+            for name in names:
+                bit = self.capability_bits[name]
+                required[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+            allowed &= ((self.masks[:num_slots] & required) == required).all(axis=1)
+
+        codes = [
+            self.server_codes[server_id]
+            for server_id in tool_filter.excluded_servers
+            if server_id in self.server_codes
+        ]
+        if codes:
+            allowed &= ~np.isin(self.servers[:num_slots], codes)
+        return allowed
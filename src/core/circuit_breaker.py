@@ -4,14 +4,31 @@ Implements the Elastic Circuit De-Constructor (ECD) pattern for graceful degrada
 """
 
 import asyncio
+import contextvars
 import time
+from collections import deque
+from contextlib import asynccontextmanager
 from enum import Enum
-from typing import Any, Callable, Optional, Dict
-from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Optional, Dict, Tuple
+from dataclasses import dataclass
 import logging
 
+from .execution_stats import RollingStats
+from .instrumentation import Instrumentation
+
 logger = logging.getLogger(__name__)
 
+# Absolute ``time.monotonic()`` deadline of the call currently executing, so
+# calls made from inside it (e.g. a nested plan) inherit the remaining budget
+_current_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "mcp_call_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[float]:
+    """Deadline inherited from the enclosing breaker call, if any"""
+    return _current_deadline.get()
+
 
 class CircuitState(Enum):
     CLOSED = "closed"  # Normal operation
@@ -23,135 +40,498 @@ class CircuitState(Enum):
 @dataclass
 class CircuitBreakerConfig:
     """Configuration for circuit breaker behavior"""
-    failure_threshold: int = 5
-    timeout: float = 30.0  # seconds
-    half_open_limit: int = 3
+
+    failure_threshold: int = 5  # consecutive failures
+    timeout: float = 30.0  # seconds; upper bound of the adaptive timeout
+    adaptive_timeout: bool = True
+    timeout_multiplier: float = 3.0  # adaptive timeout = multiplier x p99
+    min_timeout: float = 0.5  # seconds
+    timeout_min_samples: int = 20  # successes before p99 is trusted
+    latency_window: int = 256
+    half_open_limit: int = 3  # concurrent probes while half-open
     success_threshold: int = 2
     deconstruction_threshold: int = 10
     reset_timeout: float = 60.0
-    
+    window_size: float = 60.0  # seconds covered by the sliding window
+    window_buckets: int = 12
+    minimum_calls: int = 10  # window volume before rates can trip
+    failure_rate_threshold: float = 0.5
+    slow_call_duration: float = 5.0  # seconds
+    slow_call_rate_threshold: float = 0.8
+
+
+@dataclass
+class BulkheadConfig:
+    """Configuration for adaptive per-server concurrency limits"""
+
+    initial_limit: int = 4
+    min_limit: int = 1
+    max_limit: int = 32
+    increase: float = 1.0  # added to the limit per window of successful calls
+    decrease_factor: float = 0.5
+    latency_target: Optional[float] = None  # ms; None = learned baseline
+    latency_tolerance: float = 2.0  # overloaded above tolerance x baseline
+
 
 @dataclass
 class ServerErrorInfo:
     """Information about server errors"""
+
     error_type: str
     message: str
     timestamp: float
     retryable: bool
-    
+
+
+class SlidingWindow:
+    """
+    Time-bucketed counts of calls, failures and slow calls
+
+    The window is split into ``buckets`` slots of equal length; a slot is
+    zeroed when time wraps around to it, so totals cover roughly the last
+    ``size`` seconds at O(buckets) cost.
+    """
+
+    def __init__(self, size: float = 60.0, buckets: int = 12):
+        self.bucket_length = size / buckets
+        self.calls = [0] * buckets
+        self.failures = [0] * buckets
+        self.slow = [0] * buckets
+        self.epochs = [-1] * buckets
+
+    def _slot(self, now: float) -> int:
+        epoch = int(now // self.bucket_length)
+        slot = epoch % len(self.calls)
+        if self.epochs[slot] != epoch:
+            self.epochs[slot] = epoch
+            self.calls[slot] = self.failures[slot] = self.slow[slot] = 0
+        return slot
+
+    def record(self, success: bool, slow: bool, now: Optional[float] = None):
+        slot = self._slot(time.time() if now is None else now)
+        self.calls[slot] += 1
+        self.failures[slot] += not success
+        self.slow[slot] += slow
+
+    def totals(self, now: Optional[float] = None) -> Tuple[int, int, int]:
+        """Calls, failures and slow calls within the window"""
+        epoch = int((time.time() if now is None else now) // self.bucket_length)
+        live = [i for i, e in enumerate(self.epochs) if epoch - e < len(self.epochs)]
+        return (
+            sum(self.calls[i] for i in live),
+            sum(self.failures[i] for i in live),
+            sum(self.slow[i] for i in live),
+        )
+
+    def reset(self):
+        for i in range(len(self.calls)):
+            self.epochs[i] = -1
+            self.calls[i] = self.failures[i] = self.slow[i] = 0
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when the caller's deadline expires before the call completes"""
+
+    def __init__(self, server_id: str):
+        self.server_id = server_id
+        super().__init__(f"Deadline exceeded before call to {server_id} completed")
+
 
 class CircuitOpenError(Exception):
     """Raised when circuit breaker is open"""
+
     def __init__(self, server_id: str, message: str = None):
         self.server_id = server_id
         super().__init__(message or f"Circuit breaker is OPEN for server {server_id}")
-        
+
 
 class ServiceDegradedError(Exception):
     """Raised when service is in degraded state"""
+
     def __init__(self, server_id: str, fallback_available: bool = False):
         self.server_id = server_id
         self.fallback_available = fallback_available
         super().__init__(f"Service {server_id} is degraded")
 
 
+@dataclass
+class BulkheadPermit:
+    """One held bulkhead slot; ``rejected`` is set when the breaker turned
+    the call away, so its outcome says nothing about the server"""
+
+    rejected: bool = False
+
+
+class AdaptiveBulkhead:
+    """
+    Per-server concurrency limit adjusted AIMD-style
+
+    Works like a semaphore whose size is ``capacity``. Each call that
+    completes within the latency target grows the limit by ``increase /
+    limit`` (about +increase per window of calls); a failure or a slow call
+    multiplies it by ``decrease_factor``, at most once per observed latency
+    so one burst of slow calls counts as a single congestion signal.
+    """
+
+    def __init__(self, server_id: str, config: Optional[BulkheadConfig] = None):
+        self.server_id = server_id
+        self.config = config or BulkheadConfig()
+
+        self.limit = float(self.config.initial_limit)
+        self.in_flight = 0
+        self._waiters: deque = deque()
+
+        # Latency tracking (ms)
+        self.latency_ewma: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+
+        # Metrics
+        self.total_admitted = 0
+        self.total_waited = 0
+        self.decreases = 0
+
+    @property
+    def capacity(self) -> int:
+        """Current number of calls admitted concurrently"""
+        return max(self.config.min_limit, int(self.limit))
+
+    @property
+    def available(self) -> int:
+        return max(0, self.capacity - self.in_flight)
+
+    async def acquire(self):
+        """Wait for a free slot"""
+        self.total_admitted += 1
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            return
+
+        self.total_waited += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just before the cancellation
+                self.release()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.capacity:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(
+        self, deadline: Optional[float] = None
+    ) -> AsyncIterator[BulkheadPermit]:
+        """Hold a slot for one call and feed its outcome into the limit
+
+        Waiting for the slot stops at ``deadline`` (``time.monotonic()``).
+        Pass the yielded permit to ``MCPCircuitBreaker.call``: calls the
+        breaker rejects, including ones answered by a fallback, release the
+        slot without counting as a success or a congestion signal.
+        """
+        if deadline is None:
+            await self.acquire()
+        else:
+            try:
+                await asyncio.wait_for(
+                    self.acquire(), max(0.0, deadline - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError(self.server_id)
+        permit = BulkheadPermit()
+        start = time.perf_counter()
+        try:
+            yield permit
+        except (CircuitOpenError, ServiceDegradedError, DeadlineExceededError):
+            self.release()
+            raise
+        except Exception:
+            self.release()
+            if not permit.rejected:
+                self.record(False, (time.perf_counter() - start) * 1000.0)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        else:
+            self.release()
+            if not permit.rejected:
+                self.record(True, (time.perf_counter() - start) * 1000.0)
+
+    def record(self, success: bool, latency: float):
+        """Adjust the limit from one call outcome (latency in milliseconds)"""
+        if self.latency_ewma is None:
+            self.latency_ewma = self.baseline_latency = latency
+        else:
+            self.latency_ewma += 0.2 * (latency - self.latency_ewma)
+            # The baseline follows improvements quickly and degradations slowly
+            alpha = 0.5 if latency < self.baseline_latency else 0.01
+            self.baseline_latency += alpha * (latency - self.baseline_latency)
+
+        target = self.config.latency_target or (
+            self.config.latency_tolerance * self.baseline_latency
+        )
+        if success and latency <= target:
+            self.limit = min(
+                float(self.config.max_limit),
+                self.limit + self.config.increase / self.limit,
+            )
+            self._wake()
+            return
+
+        now = time.time()
+        if (now - self._last_decrease) * 1000.0 < self.latency_ewma:
+            return
+        self._last_decrease = now
+        self.decreases += 1
+        self.limit = max(
+            float(self.config.min_limit), self.limit * self.config.decrease_factor
+        )
+        logger.info(
+            f"Concurrency limit for {self.server_id} reduced to {self.capacity}"
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get bulkhead metrics"""
+        return {
+            "server_id": self.server_id,
+            "limit": self.limit,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "total_admitted": self.total_admitted,
+            "total_waited": self.total_waited,
+            "decreases": self.decreases,
+            "latency_ewma": self.latency_ewma,
+            "baseline_latency": self.baseline_latency,
+        }
+
+
 class MCPCircuitBreaker:
     """
     Advanced circuit breaker implementation for MCP servers
     Implements the Elastic Circuit De-Constructor pattern
     """
-    
-    def __init__(self, 
-                 server_id: str,
-                 config: Optional[CircuitBreakerConfig] = None):
+
+    def __init__(
+        self,
+        server_id: str,
+        config: Optional[CircuitBreakerConfig] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         self.server_id = server_id
         self.config = config or CircuitBreakerConfig()
-        
+        self.instrumentation = instrumentation or Instrumentation()
+
         # State management
         self.state = CircuitState.CLOSED
         self.failure_count = 0
         self.success_count = 0
         self.consecutive_successes = 0
-        
+
         # Timing
         self.last_failure_time: Optional[float] = None
         self.last_success_time: Optional[float] = None
         self.state_changed_time: float = time.time()
         self.half_open_start_time: Optional[float] = None
-        
+
         # Error tracking
         self.error_history: list[ServerErrorInfo] = []
         self.half_open_attempts = 0
-        
+        self.half_open_in_flight = 0
+        self.window = SlidingWindow(self.config.window_size, self.config.window_buckets)
+        # ms; successful calls, plus the full timeout for calls that timed out
+        self.latency = RollingStats(self.config.latency_window)
+
         # Metrics
         self.total_calls = 0
         self.total_failures = 0
         self.total_successes = 0
-        
+        self.total_rejected = 0
+
     def is_available(self) -> bool:
-        """Check if the circuit breaker allows calls"""
-        return self.state in [CircuitState.CLOSED, CircuitState.HALF_OPEN, 
-                             CircuitState.DECONSTRUCTED]
-        
-    async def call(self, 
-                   func: Callable,
-                   *args,
-                   fallback: Optional[Callable] = None,
-                   **kwargs) -> Any:
+        """Check if the circuit breaker allows calls
+
+        An OPEN circuit counts as available once its reset timeout has
+        passed: the next call moves it to HALF_OPEN, so discovery must keep
+        offering the server or it would never be probed again.
+        """
+        if self.state == CircuitState.OPEN:
+            return self._should_attempt_reset()
+        return self.state in [
+            CircuitState.CLOSED,
+            CircuitState.HALF_OPEN,
+            CircuitState.DECONSTRUCTED,
+        ]
+
+    async def call(
+        self,
+        func: Callable,
+        *args,
+        fallback: Optional[Callable] = None,
+        deadline: Optional[float] = None,
+        permit: Optional[BulkheadPermit] = None,
+        **kwargs,
+    ) -> Any:
         """
         Execute a function through the circuit breaker
-        
+
         Args:
             func: The function to execute
             fallback: Optional fallback function for degraded state
+            deadline: Absolute ``time.monotonic()`` deadline; defaults to the
+                deadline of the enclosing breaker call, if any
+            permit: Bulkhead slot held for this call; marked rejected when
+                the call never reaches the server
             *args, **kwargs: Arguments for the function
-            
+
         Returns:
             Result from the function or fallback
-            
+
         Raises:
             CircuitOpenError: If circuit is open and no fallback available
             ServiceDegradedError: If service is degraded with no fallback
+            DeadlineExceededError: If the deadline leaves no time for the call
         """
         self.total_calls += 1
-        
+
         # Check circuit state
         if self.state == CircuitState.OPEN:
             if self._should_attempt_reset():
                 logger.info(f"Circuit breaker {self.server_id} attempting reset")
                 self._transition_to_half_open()
             else:
+                self._record_rejection("open", fallback, permit)
                 if fallback:
                     logger.warning(f"Circuit open for {self.server_id}, using fallback")
                     return await self._execute_fallback(fallback, *args, **kwargs)
                 raise CircuitOpenError(self.server_id)
-                
+
         elif self.state == CircuitState.DECONSTRUCTED:
+            self._record_rejection("deconstructed", fallback, permit)
             if fallback:
                 logger.info(f"Service {self.server_id} degraded, using fallback")
                 return await self._execute_fallback(fallback, *args, **kwargs)
             raise ServiceDegradedError(self.server_id, fallback_available=False)
-            
+
+        # The caller's remaining budget caps the adaptive timeout
+        timeout = self.current_timeout()
+        deadline = self._effective_deadline(deadline)
+        bounded_by_deadline = False
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceededError(self.server_id)
+            if remaining < timeout:
+                timeout, bounded_by_deadline = remaining, True
+
+        # Only a few probes may test a recovering server at once
+        probing = self.state == CircuitState.HALF_OPEN
+        if probing:
+            if self.half_open_in_flight >= self.config.half_open_limit:
+                self._record_rejection("probe_limit", fallback, permit)
+                if fallback:
+                    return await self._execute_fallback(fallback, *args, **kwargs)
+                raise CircuitOpenError(
+                    self.server_id,
+                    f"Circuit breaker for {self.server_id} is HALF_OPEN "
+                    f"and its probe limit is reached",
+                )
+            self.half_open_in_flight += 1
+
         # Execute the call
+        start = time.perf_counter()
+        token = _current_deadline.set(time.monotonic() + timeout)
         try:
-            result = await self._execute_with_timeout(func, *args, **kwargs)
-            await self._on_success()
+            attributes = None
+            if self.instrumentation.enabled:
+                attributes = {"server": self.server_id, "state": self.state.value}
+            with self.instrumentation.span("breaker.call", attributes):
+                result = await self._execute_with_timeout(
+                    func, timeout, *args, **kwargs
+                )
+            await self._on_success(time.perf_counter() - start)
             return result
-            
+
+        except TimeoutError as e:
+            if bounded_by_deadline:
+                # The caller ran out of time; not the server's fault
+                raise DeadlineExceededError(self.server_id) from e
+            # Let a server that slowed down raise its own p99 over time
+            self.latency.record(False, timeout * 1000.0)
+            await self._on_failure(e, time.perf_counter() - start)
+            raise
+
         except Exception as e:
-            await self._on_failure(e)
+            await self._on_failure(e, time.perf_counter() - start)
             raise
-            
-    async def _execute_with_timeout(self, func: Callable, *args, **kwargs) -> Any:
-        """Execute function with timeout"""
+
+        finally:
+            _current_deadline.reset(token)
+            if probing:
+                self.half_open_in_flight -= 1
+
+    def current_timeout(self) -> float:
+        """Per-call timeout in seconds: multiplier x observed p99, clamped"""
+        if (
+            not self.config.adaptive_timeout
+            or self.latency.count < self.config.timeout_min_samples
+        ):
+            return self.config.timeout
+        p99 = self.latency.quantile(0.99) / 1000.0
+        return min(
+            self.config.timeout,
+            max(self.config.min_timeout, self.config.timeout_multiplier * p99),
+        )
+
+    @staticmethod
+    def _effective_deadline(deadline: Optional[float]) -> Optional[float]:
+        inherited = _current_deadline.get()
+        if deadline is None:
+            return inherited
+        return deadline if inherited is None else min(deadline, inherited)
+
+    async def _execute_with_timeout(
+        self, func: Callable, timeout: float, *args, **kwargs
+    ) -> Any:
+        """Execute function with timeout (seconds)"""
         try:
-            return await asyncio.wait_for(
-                func(*args, **kwargs),
-                timeout=self.config.timeout
-            )
+            return await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
         except asyncio.TimeoutError:
             raise TimeoutError(f"Call to {self.server_id} timed out")
-            
+
+    def _record_rejection(
+        self,
+        reason: str,
+        fallback: Optional[Callable],
+        permit: Optional[BulkheadPermit] = None,
+    ):
+        self.total_rejected += 1
+        if permit is not None:
+            permit.rejected = True
+        if self.instrumentation.enabled:
+            self.instrumentation.event(
+                "circuit_breaker.rejected",
+                {
+                    "server": self.server_id,
+                    "reason": reason,
+                    "fallback": fallback is not None,
+                },
+            )
+
     async def _execute_fallback(self, fallback: Callable, *args, **kwargs) -> Any:
         """Execute fallback function"""
         try:
@@ -159,79 +539,103 @@ class MCPCircuitBreaker:
         except Exception as e:
             logger.error(f"Fallback for {self.server_id} also failed: {e}")
             raise
-            
-    async def _on_success(self):
-        """Handle successful call"""
+
+    async def _on_success(self, duration: float = 0.0):
+        """Handle successful call (duration in seconds)"""
         self.total_successes += 1
         self.last_success_time = time.time()
         self.consecutive_successes += 1
-        
+        slow = duration >= self.config.slow_call_duration
+        self.window.record(True, slow)
+        self.latency.record(True, duration * 1000.0)
+
         if self.state == CircuitState.HALF_OPEN:
             self.success_count += 1
-            
+
             if self.success_count >= self.config.success_threshold:
                 logger.info(f"Circuit breaker {self.server_id} recovered")
                 self._transition_to_closed()
-                
+
         elif self.state == CircuitState.DECONSTRUCTED:
             # Check if service is recovering
             if self.consecutive_successes >= self.config.success_threshold * 2:
                 logger.info(f"Service {self.server_id} recovering from degraded state")
                 self._transition_to_half_open()
-                
+
         # Reset failure count on success in closed state
         if self.state == CircuitState.CLOSED:
             self.failure_count = 0
-            
-    async def _on_failure(self, error: Exception):
-        """Handle failed call"""
+            if slow and self._window_exceeded():
+                logger.warning(
+                    f"Circuit breaker {self.server_id} opening on slow calls"
+                )
+                self._transition_to_open()
+
+    async def _on_failure(self, error: Exception, duration: float = 0.0):
+        """Handle failed call (duration in seconds)"""
         self.total_failures += 1
         self.failure_count += 1
         self.consecutive_successes = 0
         self.last_failure_time = time.time()
-        
+        self.window.record(False, duration >= self.config.slow_call_duration)
+
         # Record error info
         error_info = ServerErrorInfo(
             error_type=type(error).__name__,
             message=str(error),
             timestamp=time.time(),
-            retryable=self._is_retryable_error(error)
+            retryable=self._is_retryable_error(error),
         )
         self.error_history.append(error_info)
-        
+
         # Keep only recent errors
         if len(self.error_history) > 100:
             self.error_history = self.error_history[-100:]
-            
-        # State transitions based on failure count
+
+        # State transitions based on failure count and window rates
         if self.state == CircuitState.CLOSED:
-            if self.failure_count >= self.config.failure_threshold:
+            if (
+                self.failure_count >= self.config.failure_threshold
+                or self._window_exceeded()
+            ):
                 logger.warning(f"Circuit breaker {self.server_id} opening")
                 self._transition_to_open()
-                
+
         elif self.state == CircuitState.HALF_OPEN:
             # Immediate transition back to open on failure
             logger.warning(f"Circuit breaker {self.server_id} reopening")
             self._transition_to_open()
-            
+
         elif self.state == CircuitState.OPEN:
             # Check if we should move to deconstructed state
             if self.failure_count >= self.config.deconstruction_threshold:
                 logger.error(f"Service {self.server_id} entering degraded state")
                 self._transition_to_deconstructed()
-                
+
+    def _window_exceeded(self) -> bool:
+        """Failure or slow-call rate over threshold with enough volume"""
+        calls, failures, slow = self.window.totals()
+        if calls < self.config.minimum_calls:
+            return False
+        return (
+            failures / calls >= self.config.failure_rate_threshold
+            or slow / calls >= self.config.slow_call_rate_threshold
+        )
+
     def _should_attempt_reset(self) -> bool:
         """Check if we should attempt to reset the circuit"""
-        if self.last_failure_time is None:
-            return True
-            
-        time_since_failure = time.time() - self.last_failure_time
-        
+        # Slow-call trips open the circuit without a failure, so measure from
+        # whichever happened last
+        last_event = max(self.last_failure_time or 0.0, self.state_changed_time)
+        time_since_failure = time.time() - last_event
+
         # Exponential backoff for reset attempts
-        backoff_time = self.config.reset_timeout * (2 ** min(self.half_open_attempts, 5))
-        
+        backoff_time = self.config.reset_timeout * (
+            2 ** min(self.half_open_attempts, 5)
+        )
+
         return time_since_failure >= backoff_time
-        
+
     def _is_retryable_error(self, error: Exception) -> bool:
         """Determine if an error is retryable"""
         # Non-retryable errors
@@ -240,46 +644,61 @@ class MCPCircuitBreaker:
             TypeError,
             AttributeError,
             KeyError,
-            NotImplementedError
+            NotImplementedError,
         ]
-        
+
         return not any(isinstance(error, err_type) for err_type in non_retryable)
-        
+
+    def _change_state(self, state: CircuitState):
+        previous = self.state
+        self.state = state
+        self.state_changed_time = time.time()
+        if previous is state:
+            return
+        if self.instrumentation.enabled:
+            self.instrumentation.event(
+                "circuit_breaker.state_change",
+                {
+                    "server": self.server_id,
+                    "from_state": previous.value,
+                    "to_state": state.value,
+                },
+            )
+
     def _transition_to_closed(self):
         """Transition to closed state"""
-        self.state = CircuitState.CLOSED
-        self.state_changed_time = time.time()
+        self._change_state(CircuitState.CLOSED)
         self.failure_count = 0
         self.success_count = 0
         self.half_open_attempts = 0
         self.consecutive_successes = 0
-        
+        self.window.reset()
+
     def _transition_to_open(self):
         """Transition to open state"""
-        self.state = CircuitState.OPEN
-        self.state_changed_time = time.time()
+        self._change_state(CircuitState.OPEN)
         self.success_count = 0
-        
+        self.window.reset()
+
     def _transition_to_half_open(self):
         """Transition to half-open state"""
-        self.state = CircuitState.HALF_OPEN
-        self.state_changed_time = time.time()
+        self._change_state(CircuitState.HALF_OPEN)
         self.half_open_start_time = time.time()
         self.half_open_attempts += 1
         self.success_count = 0
         self.failure_count = 0
-        
+
     def _transition_to_deconstructed(self):
         """Transition to deconstructed (degraded) state"""
-        self.state = CircuitState.DECONSTRUCTED
-        self.state_changed_time = time.time()
-        
+        self._change_state(CircuitState.DECONSTRUCTED)
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get circuit breaker metrics"""
         success_rate = 0.0
         if self.total_calls > 0:
             success_rate = self.total_successes / self.total_calls
-            
+        window_calls, window_failures, window_slow = self.window.totals()
+
         return {
             "server_id": self.server_id,
             "state": self.state.value,
@@ -290,9 +709,22 @@ class MCPCircuitBreaker:
             "failure_count": self.failure_count,
             "consecutive_successes": self.consecutive_successes,
             "time_in_state": time.time() - self.state_changed_time,
-            "recent_errors": len(self.error_history)
+            "recent_errors": len(self.error_history),
+            "window_calls": window_calls,
+            "window_failure_rate": (
+                window_failures / window_calls if window_calls else 0.0
+            ),
+            "window_slow_call_rate": (
+                window_slow / window_calls if window_calls else 0.0
+            ),
+            "half_open_in_flight": self.half_open_in_flight,
+            "current_timeout": self.current_timeout(),
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p95": self.latency.quantile(0.95),
+            "latency_p99": self.latency.quantile(0.99),
+            "total_rejected": self.total_rejected,
         }
-        
+
     def reset(self):
         """Manually reset the circuit breaker"""
         logger.info(f"Manually resetting circuit breaker for {self.server_id}")
@@ -301,28 +733,46 @@ class MCPCircuitBreaker:
 
 class CircuitBreakerRegistry:
     """Registry for managing multiple circuit breakers"""
-    
-    def __init__(self, default_config: Optional[CircuitBreakerConfig] = None):
+
+    def __init__(
+        self,
+        default_config: Optional[CircuitBreakerConfig] = None,
+        bulkhead_config: Optional[BulkheadConfig] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         self.breakers: Dict[str, MCPCircuitBreaker] = {}
+        self.bulkheads: Dict[str, AdaptiveBulkhead] = {}
         self.default_config = default_config or CircuitBreakerConfig()
-        
+        self.bulkhead_config = bulkhead_config or BulkheadConfig()
+        self.instrumentation = instrumentation or Instrumentation()
+
     def get_breaker(self, server_id: str) -> MCPCircuitBreaker:
         """Get or create a circuit breaker for a server"""
         if server_id not in self.breakers:
             self.breakers[server_id] = MCPCircuitBreaker(
-                server_id, 
-                self.default_config
+                server_id, self.default_config, self.instrumentation
             )
         return self.breakers[server_id]
-        
+
+    def get_bulkhead(self, server_id: str) -> AdaptiveBulkhead:
+        """Get or create the concurrency bulkhead for a server"""
+        if server_id not in self.bulkheads:
+            self.bulkheads[server_id] = AdaptiveBulkhead(
+                server_id, self.bulkhead_config
+            )
+        return self.bulkheads[server_id]
+
     def get_all_metrics(self) -> Dict[str, Dict[str, Any]]:
         """Get metrics for all circuit breakers"""
-        return {
+        metrics = {
             server_id: breaker.get_metrics()
             for server_id, breaker in self.breakers.items()
         }
-        
+        for server_id, bulkhead in self.bulkheads.items():
+            metrics.setdefault(server_id, {})["bulkhead"] = bulkhead.get_metrics()
+        return metrics
+
     def reset_all(self):
         """Reset all circuit breakers"""
         for breaker in self.breakers.values():
-            breaker.reset()
\ No newline at end of file
+            breaker.reset()
@@ -0,0 +1,136 @@
+"""
+Discovery Request Batcher
+Coalesces concurrent tool discovery requests into a single batched encode and
+multi-row index search
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+DiscoverBatchFn = Callable[
+    [List[Tuple[str, Dict[str, Any]]], int], Awaitable[List[Any]]
+]
+CacheKeyFn = Callable[[str, Dict[str, Any]], str]
+
+
+class DiscoveryBatcher:
+    """
+    Micro-batching layer in front of ``discover_tools_batch``
+
+    Requests arriving within ``window`` seconds of the first queued request
+    are flushed together (earlier if ``max_batch_size`` is reached). Requests
+    with the same cache key and ``top_k`` share a single in-flight result.
+    """
+
+    def __init__(
+        self,
+        discover_batch: DiscoverBatchFn,
+        cache_key: CacheKeyFn,
+        window: float = 0.002,
+        max_batch_size: int = 64,
+    ):
+        self.discover_batch = discover_batch
+        self.cache_key = cache_key
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self._pending: List[Tuple[Tuple[str, int], str, Dict[str, Any], int]] = []
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks; a flush collected
+        # mid-run would leave its callers waiting forever
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.total_requests = 0
+        self.coalesced_requests = 0
+        self.total_batches = 0
+
+    async def submit(
+        self, intent: str, context: Dict[str, Any], top_k: int = 5
+    ) -> List[Any]:
+        """Queue a discovery request and wait for its batch to complete"""
+        self.total_requests += 1
+        key = (self.cache_key(intent, context), top_k)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced_requests += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[key] = future
+            self._pending.append((key, intent, context, top_k))
+
+            if len(self._pending) >= self.max_batch_size:
+                self._schedule_flush(0)
+            elif self._timer is None:
+                self._schedule_flush(self.window)
+
+        # Shield so one cancelled caller does not cancel the shared result
+        return await asyncio.shield(future)
+
+    def _schedule_flush(self, delay: float):
+        loop = asyncio.get_running_loop()
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._start_flush, loop)
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop):
+        task = loop.create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self):
+        """Run every queued request, one batch per distinct ``top_k``"""
+        self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.total_batches += 1
+
+        groups = defaultdict(list)
+        for key, intent, context, top_k in batch:
+            groups[top_k].append((key, intent, context))
+
+        for top_k, entries in groups.items():
+            try:
+                results = await self.discover_batch(
+                    [(intent, context) for _, intent, context in entries], top_k
+                )
+            except Exception as e:
+                for key, _, _ in entries:
+                    self._resolve(key, exception=e)
+                continue
+
+            for (key, _, _), result in zip(entries, results):
+                self._resolve(key, result=result)
+
+    def _resolve(
+        self,
+        key: Tuple[str, int],
+        result: Any = None,
+        exception: Optional[BaseException] = None,
+    ):
+        future = self._inflight.pop(key, None)
+        if future is None or future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get batching metrics"""
+        return {
+            "total_requests": self.total_requests,
+            "coalesced_requests": self.coalesced_requests,
+            "total_batches": self.total_batches,
+            "avg_batch_size": (
+                (self.total_requests - self.coalesced_requests) / self.total_batches
+                if self.total_batches
+                else 0.0
+            ),
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,245 @@
+"""
+Discovery Result Cache
+Two-tier cache for tool discovery results: an in-process LRU in front of the
+shared CacheManager, plus a semantic tier that serves near-duplicate intents
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cache_manager import CacheManager
+
+
+@dataclass
+class DiscoveryCacheConfig:
+    """Configuration for discovery result caching"""
+
+    max_entries: int = 1024
+    ttl: float = 300.0  # seconds
+    semantic_enabled: bool = True
+    semantic_threshold: float = 0.95  # minimum cosine similarity of intents
+    generation_check_interval: float = (
+        1.0  # seconds between reads of the shared generation
+    )
+
+
+# Shared-tier key holding the current generation of every process's entries
+GENERATION_KEY = "discovery:generation"
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    context_key: str
+    embedding: Optional[np.ndarray] = None
+
+
+class DiscoveryCache:
+    """
+    Cache for ``discover_tools`` results
+
+    Lookups go LRU -> CacheManager. The semantic tier compares a new intent's
+    (normalized) embedding against cached intents with the same context and
+    reuses the result when cosine similarity reaches the threshold.
+
+    Shared-tier keys carry a generation that lives in the shared tier
+    itself: ``invalidate`` bumps it there, and every process (including
+    one started later) adopts the newest generation within
+    ``generation_check_interval``, so no process reads entries written
+    before an invalidation. Processes serving a shared tool index also key
+    entries by ``index_version``, so workers on different catalog versions
+    never exchange results.
+
+    The LRU tier holds live objects. Values written to the shared tier go
+    through ``pack``/``unpack`` so a remote cache stores a compact payload
+    instead of the full object graph.
+    """
+
+    def __init__(
+        self,
+        backend: CacheManager,
+        config: Optional[DiscoveryCacheConfig] = None,
+        pack: Optional[Callable[[Any], Any]] = None,
+        unpack: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.backend = backend
+        self.config = config or DiscoveryCacheConfig()
+        self.pack = pack or (lambda value: value)
+        self.unpack = unpack or (lambda payload: payload)
+        self.generation = 0
+        self.index_version: Optional[int] = None
+        self._generation_checked = float("-inf")
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # context key -> cache keys with an intent embedding
+        self._semantic: Dict[str, Dict[str, None]] = {}
+        self._semantic_matrix: Dict[str, Tuple[List[str], np.ndarray]] = {}
+
+        # Metrics
+        self.lru_hits = 0
+        self.backend_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _backend_key(self, key: str) -> str:
+        if self.index_version is None:
+            return f"discovery:{self.generation}:{key}"
+        return f"discovery:{self.generation}.{self.index_version}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Exact lookup in the LRU tier, then the shared tier"""
+        await self.sync_generation()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.lru_hits += 1
+                return entry.value
+            self._drop(key)
+
+        payload = await self.backend.get(self._backend_key(key))
+        value = self.unpack(payload) if payload else None
+        if value:
+            self.backend_hits += 1
+            self._store(key, _Entry(value, time.time() + self.config.ttl, ""))
+            return value
+
+        return None
+
+    def get_similar(self, context_key: str, embedding: np.ndarray) -> Optional[Any]:
+        """Semantic lookup: a cached result for a near-duplicate intent"""
+        if not self.config.semantic_enabled:
+            return None
+
+        keys, matrix = self._matrix_for(context_key)
+        if not keys:
+            return None
+
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.config.semantic_threshold:
+            return None
+
+        entry = self._entries.get(keys[best])
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        self._entries.move_to_end(keys[best])
+        self.semantic_hits += 1
+        return entry.value
+
+    def record_miss(self):
+        self.misses += 1
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        context_key: str,
+        embedding: Optional[np.ndarray] = None,
+    ):
+        """Store a result in both tiers
+
+        ``embedding`` should be the L2-normalized intent embedding; without
+        it the entry only serves exact hits.
+        """
+        self._store(
+            key, _Entry(value, time.time() + self.config.ttl, context_key, embedding)
+        )
+        await self.backend.set(
+            self._backend_key(key), self.pack(value), ttl=int(self.config.ttl)
+        )
+
+    async def invalidate(self):
+        """Drop every entry in every process, e.g. after the tool index changed"""
+        shared = await self._shared_generation()
+        self._reset(max(self.generation, shared or 0) + 1)
+        self.invalidations += 1
+        await self.backend.set(GENERATION_KEY, self.generation)
+
+    async def sync_generation(self, force: bool = False):
+        """Adopt a newer generation another process has published"""
+        now = time.monotonic()
+        if (
+            not force
+            and now - self._generation_checked < self.config.generation_check_interval
+        ):
+            return
+        self._generation_checked = now
+        shared = await self._shared_generation()
+        if shared is not None and shared > self.generation:
+            self._reset(shared)
+
+    def set_index_version(self, version: Optional[int]):
+        """Key entries by a shared tool index version; drops local entries"""
+        self.index_version = version
+        self._reset(self.generation)
+
+    async def _shared_generation(self) -> Optional[int]:
+        value = await self.backend.get(GENERATION_KEY)
+        return int(value) if value is not None else None
+
+    def _reset(self, generation: int):
+        self.generation = generation
+        self._entries.clear()
+        self._semantic.clear()
+        self._semantic_matrix.clear()
+
+    def _store(self, key: str, entry: _Entry):
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        if entry.embedding is not None:
+            self._semantic.setdefault(entry.context_key, {})[key] = None
+            self._semantic_matrix.pop(entry.context_key, None)
+
+        while len(self._entries) > self.config.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry.embedding is not None:
+            keys = self._semantic.get(entry.context_key)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._semantic[entry.context_key]
+            self._semantic_matrix.pop(entry.context_key, None)
+
+    def _matrix_for(self, context_key: str) -> Tuple[List[str], np.ndarray]:
+        """Stacked intent embeddings for one context, rebuilt when it changes"""
+        cached = self._semantic_matrix.get(context_key)
+        if cached is not None:
+            return cached
+
+        keys = list(self._semantic.get(context_key, ()))
+        if not keys:
+            return [], np.zeros((0, 0), dtype="float32")
+        matrix = np.stack([self._entries[key].embedding for key in keys])
+        self._semantic_matrix[context_key] = (keys, matrix)
+        return keys, matrix
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache metrics"""
+        hits = self.lru_hits + self.backend_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "lru_hits": self.lru_hits,
+            "backend_hits": self.backend_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "generation": self.generation,
+            "index_version": self.index_version,
+        }
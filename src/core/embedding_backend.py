@@ -0,0 +1,343 @@
+"""
+Embedding Backends
+Pluggable intent/tool encoders behind ModelExecutor: PyTorch through
+sentence-transformers, or an exported ONNX Runtime model with optional
+dynamic int8 quantization for CPU-only nodes
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Type, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend:
+    """
+    Encodes texts into float32 vectors
+
+    Backends are built as ``Backend(model_name, config)`` inside the process
+    that runs them (one per worker in "process" mode), so subclasses must be
+    importable module-level classes with a picklable config.
+    """
+
+    name = "custom"
+
+    def __init__(self, model_name: str, config: Any = None):
+        self.model_name = model_name
+        self.config = config
+
+    @classmethod
+    def cache_id(cls, model_name: str, config: Any = None) -> str:
+        """Identifies this backend's vectors in the embedding store
+
+        Backends whose vectors differ from the reference model's must return
+        an id of their own so persisted embeddings are not mixed.
+        """
+        return f"{model_name}@{cls.name}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+@dataclass
+class SentenceTransformerConfig:
+    """Configuration for the PyTorch backend"""
+
+    device: Optional[str] = None  # None: CUDA if available, else CPU
+    batch_size: int = 32
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """PyTorch inference through sentence-transformers"""
+
+    name = "sentence-transformers"
+
+    def __init__(
+        self, model_name: str, config: Optional[SentenceTransformerConfig] = None
+    ):
+        from sentence_transformers import SentenceTransformer
+
+        super().__init__(model_name, config or SentenceTransformerConfig())
+        self.model = SentenceTransformer(model_name, device=self.config.device)
+
+    @classmethod
+    def cache_id(cls, model_name: str, config: Any = None) -> str:
+        # The reference backend; keeps existing embedding stores valid
+        return model_name
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(
+            self.model.encode(texts, batch_size=self.config.batch_size), dtype="float32"
+        )
+
+
+@dataclass
+class OnnxConfig:
+    """Configuration for the ONNX Runtime backend
+
+    Each inference uses up to ``intra_op_threads`` cores, and the executor
+    runs ``ExecutorConfig.max_workers`` inferences at once; keep their
+    product at or below the cores available to the node.
+    """
+
+    cache_dir: str = os.path.join("~", ".cache", "localmcp", "onnx")
+    model_dir: Optional[str] = None  # pre-exported model; default <cache_dir>/<model>
+    quantize: bool = True  # dynamic int8 weights (float32 activations)
+    intra_op_threads: int = 0  # threads per inference; 0: one per physical core
+    inter_op_threads: int = 1  # only used with parallel_execution
+    parallel_execution: bool = False  # run independent graph branches concurrently
+    allow_spinning: bool = (
+        True  # False: idle threads sleep, freeing CPU between requests
+    )
+    max_length: Optional[int] = None  # tokens; None: the model's max_seq_length
+    batch_size: int = 32
+
+
+ONNX_MODEL = "model.onnx"
+ONNX_INT8_MODEL = "model.int8.onnx"
+ONNX_META = "onnx.json"
+POOLING_MODES = ("mean", "cls", "max")
+
+
+def export_onnx(model_name: str, directory: str, opset: int = 14) -> str:
+    """Export a sentence-transformers model to ONNX
+
+    Writes the transformer graph, its fast tokenizer and the pooling and
+    normalization settings to ``directory``. Needs PyTorch; the exported
+    model does not. The export is staged and renamed into place, so
+    concurrent exporters (e.g. worker processes) never see a partial one.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling, Transformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    modules = list(model)
+    transformer = modules[0]
+    pooling = next((module for module in modules if isinstance(module, Pooling)), None)
+    if not isinstance(transformer, Transformer) or pooling is None:
+        raise ValueError(f"{model_name} is not a transformer + pooling model")
+    unsupported = [
+        type(module).__name__
+        for module in modules[1:]
+        if not isinstance(module, (Pooling, Normalize))
+    ]
+    if unsupported:
+        raise ValueError(
+            f"Cannot export {model_name}: unsupported modules {unsupported}"
+        )
+    pooling_mode = pooling.get_pooling_mode_str()
+    if pooling_mode not in POOLING_MODES:
+        raise ValueError(
+            f"Cannot export {model_name}: unsupported pooling {pooling_mode}"
+        )
+    tokenizer = transformer.tokenizer
+    if not tokenizer.is_fast:
+        raise ValueError(f"Cannot export {model_name}: no fast tokenizer")
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, *inputs):
+            return self.auto_model(**dict(zip(input_names, inputs)))[0]
+
+    staging = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer.auto_model.eval()),
+            tuple(sample[name] for name in input_names),
+            os.path.join(staging, ONNX_MODEL),
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(staging)
+    with open(os.path.join(staging, ONNX_META), "w") as f:
+        json.dump(
+            {
+                "model_name": model_name,
+                "inputs": input_names,
+                "pooling": pooling_mode,
+                "normalize": any(isinstance(module, Normalize) for module in modules),
+                "max_length": transformer.max_seq_length or tokenizer.model_max_length,
+                "pad_token": tokenizer.pad_token,
+                "pad_token_id": tokenizer.pad_token_id,
+                "dimension": model.get_sentence_embedding_dimension(),
+            },
+            f,
+        )
+
+    try:
+        os.rename(staging, directory)
+    except OSError:
+        # Another process finished first; its export is equivalent
+        shutil.rmtree(staging, ignore_errors=True)
+    logger.info(f"Exported {model_name} to ONNX at {directory}")
+    return directory
+
+
+def quantize_onnx(directory: str) -> str:
+    """Write a dynamically int8-quantized copy of an exported model"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target = os.path.join(directory, ONNX_INT8_MODEL)
+    staging = f"{target}.tmp-{os.getpid()}"
+    quantize_dynamic(
+        os.path.join(directory, ONNX_MODEL), staging, weight_type=QuantType.QInt8
+    )
+    os.replace(staging, target)
+    return target
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime inference on CPU
+
+    The model is exported on first use (which needs PyTorch once) and
+    reused from ``cache_dir`` afterwards; at runtime only onnxruntime and
+    the ``tokenizers`` package are loaded. Dynamic int8 quantization
+    shrinks the weights about 4x and speeds up the matrix multiplies on
+    CPUs with VNNI/AVX-512, at a small cost in embedding fidelity;
+    tests/unit/test_onnx_parity.py checks it against the PyTorch model.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, config: Optional[OnnxConfig] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        super().__init__(model_name, config or OnnxConfig())
+        directory = self.config.model_dir or os.path.join(
+            os.path.expanduser(self.config.cache_dir),
+            re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name),
+        )
+        if not os.path.exists(os.path.join(directory, ONNX_META)):
+            export_onnx(model_name, directory)
+        with open(os.path.join(directory, ONNX_META)) as f:
+            self.meta: Dict[str, Any] = json.load(f)
+
+        model_path = os.path.join(directory, ONNX_MODEL)
+        if self.config.quantize:
+            model_path = os.path.join(directory, ONNX_INT8_MODEL)
+            if not os.path.exists(model_path):
+                quantize_onnx(directory)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.config.intra_op_threads
+        options.inter_op_num_threads = self.config.inter_op_threads
+        options.execution_mode = (
+            ort.ExecutionMode.ORT_PARALLEL
+            if self.config.parallel_execution
+            else ort.ExecutionMode.ORT_SEQUENTIAL
+        )
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if not self.config.allow_spinning:
+            options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, "tokenizer.json"))
+        self.tokenizer.enable_truncation(
+            self.config.max_length or self.meta["max_length"]
+        )
+        self.tokenizer.enable_padding(
+            pad_id=self.meta["pad_token_id"], pad_token=self.meta["pad_token"]
+        )
+        self.dimension = self.meta["dimension"]
+
+    @classmethod
+    def cache_id(cls, model_name: str, config: Optional[OnnxConfig] = None) -> str:
+        quantize = (config or OnnxConfig()).quantize
+        return f"{model_name}@onnx-int8" if quantize else f"{model_name}@onnx"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        batches = [
+            self._encode_batch(texts[start : start + self.config.batch_size])
+            for start in range(0, len(texts), self.config.batch_size)
+        ]
+        if not batches:
+            return np.zeros((0, self.dimension), dtype="float32")
+        return np.concatenate(batches)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array(
+            [encoding.attention_mask for encoding in encodings], dtype="int64"
+        )
+        inputs = {
+            "input_ids": np.array(
+                [encoding.ids for encoding in encodings], dtype="int64"
+            ),
+            "attention_mask": mask,
+            "token_type_ids": np.array(
+                [encoding.type_ids for encoding in encodings], dtype="int64"
+            ),
+        }
+        token_embeddings = self.session.run(
+            None, {name: inputs[name] for name in self.meta["inputs"]}
+        )[0]
+
+        # Same pooling and normalization as the sentence-transformers pipeline
+        pooling = self.meta["pooling"]
+        if pooling == "cls":
+            embeddings = token_embeddings[:, 0]
+        elif pooling == "max":
+            embeddings = np.where(mask[:, :, None] > 0, token_embeddings, -1e9).max(
+                axis=1
+            )
+        else:
+            summed = (token_embeddings * mask[:, :, None]).sum(axis=1)
+            embeddings = summed / np.maximum(mask.sum(axis=1, keepdims=True), 1e-9)
+        embeddings = embeddings.astype("float32")
+        if self.meta["normalize"]:
+            embeddings /= np.maximum(
+                np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12
+            )
+        return embeddings
+
+
+BACKENDS: Dict[str, Type[EmbeddingBackend]] = {
+    SentenceTransformerBackend.name: SentenceTransformerBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+BackendSpec = Union[str, Type[EmbeddingBackend]]
+
+
+def backend_class(backend: BackendSpec) -> Type[EmbeddingBackend]:
+    """Resolve a backend name from ``BACKENDS`` or pass a subclass through"""
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend: {backend}")
+        return BACKENDS[backend]
+    return backend
+
+
+def load_backend(
+    model_name: str, backend: BackendSpec = "sentence-transformers", config: Any = None
+) -> EmbeddingBackend:
+    """Build an embedding backend; its heavy imports happen here, not at startup"""
+    return backend_class(backend)(model_name, config)
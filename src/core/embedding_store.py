@@ -0,0 +1,189 @@
+"""
+Persistent Embedding Store
+Memory-mapped on-disk cache of tool embeddings so orchestrator restarts only
+encode tools that are new or whose description changed
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..mcp.tool_registry import Tool
+from .tool_index import tool_description
+
+
+class EmbeddingStore:
+    """
+    Append-only embedding cache for one embedding model
+
+    Layout under ``<root>/<model>/``:
+        embeddings.f32  raw float32 rows, memory-mapped
+        keys.json       row order of content hashes plus the vector dimension
+        index.faiss     serialized tool index (written by ``ToolIndex.save``)
+        index.json      tool id to FAISS id mapping for the serialized index
+        lock            flock'd by writers; processes may share the directory
+    """
+
+    def __init__(self, root: str, model_name: str):
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.path = os.path.join(root, safe_name)
+        self.model_name = model_name
+        os.makedirs(self.path, exist_ok=True)
+
+        self.dimension: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._load()
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.path, "embeddings.f32")
+
+    @property
+    def keys_path(self) -> str:
+        return os.path.join(self.path, "keys.json")
+
+    @property
+    def lock_path(self) -> str:
+        return os.path.join(self.path, "lock")
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, "index.faiss")
+
+    @property
+    def index_meta_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    @staticmethod
+    def key(tool: Tool) -> str:
+        """Content hash of the text embedded for a tool"""
+        return hashlib.sha256(tool_description(tool).encode()).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get_many(self, keys: List[str]) -> Tuple[Optional[np.ndarray], List[int]]:
+        """Return stored vectors for ``keys`` and the positions that missed
+
+        Missing rows in the returned array are zero.
+        """
+        missing = [i for i, key in enumerate(keys) if key not in self.rows]
+        if self._vectors is None:
+            return None, list(range(len(keys)))
+
+        result = np.zeros((len(keys), self.dimension), dtype="float32")
+        hits = [(i, self.rows[key]) for i, key in enumerate(keys) if key in self.rows]
+        if hits:
+            positions, rows = zip(*hits)
+            result[list(positions)] = self._vectors[list(rows)]
+        return result, missing
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """Append vectors for keys not yet stored and persist the key list
+
+        Runs under an exclusive file lock and first picks up rows other
+        processes have appended, so workers sharing the directory extend
+        one store instead of overwriting each other's rows.
+        """
+        vectors = np.asarray(vectors, dtype="float32")
+        with self._locked():
+            self._load()
+            pending = {
+                key: vector
+                for key, vector in zip(keys, vectors)
+                if key not in self.rows
+            }
+            new = list(pending.items())
+            if not new:
+                return
+
+            dimension = self.dimension if self.rows else vectors.shape[1]
+            if vectors.shape[1] != dimension:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"store dimension {dimension}"
+                )
+
+            start = len(self.rows)
+            with open(self.vectors_path, "ab") as f:
+                # Drop rows left behind by an interrupted write
+                f.truncate(start * dimension * 4)
+                f.write(np.stack([vector for _, vector in new]).tobytes())
+
+            rows = dict(self.rows)
+            for offset, (key, _) in enumerate(new):
+                rows[key] = start + offset
+
+            # Vectors are on disk before the key list that references them
+            self._set_rows(rows, dimension)
+            self._write_keys()
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock shared by all processes using this directory"""
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        """Open the store on disk, discarding it if the files disagree"""
+        rows: Dict[str, int] = {}
+        dimension = None
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path) as f:
+                meta = json.load(f)
+            expected_size = len(meta["keys"]) * meta["dimension"] * 4
+            if (
+                meta.get("model_name") == self.model_name
+                and os.path.exists(self.vectors_path)
+                and os.path.getsize(self.vectors_path) >= expected_size
+            ):
+                dimension = meta["dimension"]
+                rows = {key: i for i, key in enumerate(meta["keys"])}
+        self._set_rows(rows, dimension)
+
+    def _set_rows(self, rows: Dict[str, int], dimension: Optional[int]):
+        """Memory-map the given rows, then publish them to readers
+
+        The map is replaced before the row table, so a concurrent
+        ``get_many`` never looks up a row the map does not cover.
+        """
+        if rows:
+            self._vectors = np.memmap(
+                self.vectors_path,
+                dtype="float32",
+                mode="r",
+                shape=(len(rows), dimension),
+            )
+        self.dimension = dimension
+        self.rows = rows
+        if not rows:
+            self._vectors = None
+
+    def _write_keys(self):
+        """Atomically replace the key list"""
+        keys = [None] * len(self.rows)
+        for key, row in self.rows.items():
+            keys[row] = key
+
+        tmp_path = self.keys_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "model_name": self.model_name,
+                    "dimension": self.dimension,
+                    "keys": keys,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.keys_path)
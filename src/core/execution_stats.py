@@ -0,0 +1,223 @@
+"""
+Execution Statistics
+Fixed-size rolling statistics for servers, tools and sessions so scoring and
+planning read O(1) summaries instead of scanning unbounded history
+"""
+
+import math
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class LatencySketch:
+    """
+    Log-bucketed latency histogram with bounded relative error
+
+    Bucket ``i`` covers ``(gamma**(i-1), gamma**i]`` milliseconds offset by
+    ``min_value``, so any quantile is reported within ``relative_accuracy``
+    of the true value. Values can be removed again, which lets a ring buffer
+    keep the sketch in sync with its window.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.02,
+        min_value: float = 0.01,
+        max_value: float = 3_600_000.0,
+    ):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.num_buckets = (
+            int(math.ceil(math.log(max_value / min_value) / self._log_gamma)) + 1
+        )
+        self.counts = np.zeros(self.num_buckets, dtype="int64")
+        self.count = 0
+
+    def _bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int(math.ceil(math.log(value / self.min_value) / self._log_gamma))
+        return min(index, self.num_buckets - 1)
+
+    def add(self, value: float):
+        self.counts[self._bucket(value)] += 1
+        self.count += 1
+
+    def remove(self, value: float):
+        bucket = self._bucket(value)
+        if self.counts[bucket] > 0:
+            self.counts[bucket] -= 1
+            self.count -= 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate ``q``-quantile (0..1), or None when empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank, side="right"))
+        bucket = min(bucket, self.num_buckets - 1)
+        if bucket == 0:
+            return self.min_value
+        # Midpoint of the bucket in log space
+        return self.min_value * 2 * self.gamma**bucket / (self.gamma + 1)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Draw latencies from the histogram, log-uniform within each bucket"""
+        if self.count == 0:
+            return np.zeros(size)
+        buckets = rng.choice(self.num_buckets, size=size, p=self.counts / self.count)
+        upper = self.min_value * self.gamma**buckets
+        return upper / self.gamma ** rng.random(size)
+
+    def merge(self, other: "LatencySketch"):
+        self.counts += other.counts
+        self.count += other.count
+
+
+class RollingStats:
+    """
+    Ring buffer of the last ``window`` executions
+
+    Success rate and mean latency are maintained incrementally (the evicted
+    sample is subtracted), EWMA latency is updated per sample and the latency
+    sketch mirrors the window for p50/p95/p99.
+    """
+
+    def __init__(self, window: int = 256, ewma_alpha: float = 0.2):
+        self.window = window
+        self.ewma_alpha = ewma_alpha
+
+        self._latencies = np.zeros(window, dtype="float64")
+        self._successes = np.zeros(window, dtype=bool)
+        self._next = 0
+        self.count = 0
+
+        self._success_sum = 0
+        self._latency_sum = 0.0
+        self.ewma_latency: Optional[float] = None
+        self.sketch = LatencySketch()
+        self.total = 0
+
+    def record(self, success: bool, latency: float):
+        """Add one execution (latency in milliseconds)"""
+        if self.count == self.window:
+            old_latency = self._latencies[self._next]
+            self._success_sum -= int(self._successes[self._next])
+            self._latency_sum -= old_latency
+            self.sketch.remove(old_latency)
+        else:
+            self.count += 1
+
+        self._latencies[self._next] = latency
+        self._successes[self._next] = success
+        self._next = (self._next + 1) % self.window
+
+        self._success_sum += int(success)
+        self._latency_sum += latency
+        self.sketch.add(latency)
+        self.total += 1
+
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += self.ewma_alpha * (latency - self.ewma_latency)
+
+    @property
+    def success_rate(self) -> float:
+        return self._success_sum / self.count if self.count else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self._latency_sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.sketch.quantile(q)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return self.sketch.sample(rng, size)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "success_rate": self.success_rate,
+            "mean_latency": self.mean_latency,
+            "ewma_latency": self.ewma_latency,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class SessionStats:
+    """Ring buffer of recent ``(tool_id, success)`` pairs for one session"""
+
+    def __init__(self, window: int = 128):
+        self.window = window
+        self._entries: list[Optional[Tuple[str, bool]]] = [None] * window
+        self._next = 0
+        self.successes: Counter = Counter()
+
+    def record(self, tool_id: str, success: bool):
+        evicted = self._entries[self._next]
+        if evicted is not None and evicted[1]:
+            self.successes[evicted[0]] -= 1
+            if self.successes[evicted[0]] <= 0:
+                del self.successes[evicted[0]]
+        self._entries[self._next] = (tool_id, success)
+        self._next = (self._next + 1) % self.window
+        if success:
+            self.successes[tool_id] += 1
+
+
+class ExecutionStats:
+    """Rolling statistics per server, per tool and per session"""
+
+    def __init__(
+        self, window: int = 256, session_window: int = 128, max_sessions: int = 10_000
+    ):
+        self.window = window
+        self.session_window = session_window
+        self.max_sessions = max_sessions
+
+        self.servers: Dict[str, RollingStats] = {}
+        self.tools: Dict[str, RollingStats] = {}
+        self.sessions: "OrderedDict[str, SessionStats]" = OrderedDict()
+
+    def record(
+        self,
+        server_id: str,
+        tool_id: str,
+        success: bool,
+        latency: float,
+        session_id: Optional[str] = None,
+    ):
+        """Record one tool execution (latency in milliseconds)"""
+        for stats, key in ((self.servers, server_id), (self.tools, tool_id)):
+            if key not in stats:
+                stats[key] = RollingStats(self.window)
+            stats[key].record(success, latency)
+
+        if session_id is not None:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = SessionStats(self.session_window)
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            else:
+                self.sessions.move_to_end(session_id)
+            session.record(tool_id, success)
+
+    def server(self, server_id: str) -> Optional[RollingStats]:
+        return self.servers.get(server_id)
+
+    def tool(self, tool_id: str) -> Optional[RollingStats]:
+        return self.tools.get(tool_id)
+
+    def session_successes(self, session_id: str, tool_id: str) -> int:
+        """Recent successful uses of a tool within a session"""
+        session = self.sessions.get(session_id)
+        return session.successes.get(tool_id, 0) if session else 0
@@ -0,0 +1,130 @@
+"""
+Hedged Requests
+Cuts tail latency of idempotent tool calls by sending a delayed backup request
+to an equivalent tool on another server and keeping whichever answers first
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..mcp.tool_registry import Tool
+
+logger = logging.getLogger(__name__)
+
+# (call spec, primary tool) -> (backup tool, delay in seconds) or None
+SelectBackupFn = Callable[
+    [Dict[str, Any], Tool], Awaitable[Optional[Tuple[Tool, float]]]
+]
+AttemptFn = Callable[[Tool], Awaitable[Any]]
+
+
+@dataclass
+class HedgingConfig:
+    """Configuration for hedged requests"""
+
+    enabled: bool = False
+    delay_quantile: float = 0.95  # hedge once the primary exceeds this latency quantile
+    min_samples: int = 20  # latency history needed before a tool is hedged
+    budget_ratio: float = 0.1  # hedges allowed per eligible call
+    budget_burst: float = 10.0  # tokens that can accumulate
+
+
+class HedgeBudget:
+    """Token bucket refilled by calls, so hedges stay a fraction of load"""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def deposit(self):
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class Hedger:
+    """
+    Runs a call with an optional hedge
+
+    ``select`` picks the backup tool and the delay after which it is sent.
+    The first successful answer wins and the other attempt is cancelled; if
+    both fail, the primary's error is raised.
+    """
+
+    def __init__(self, select: SelectBackupFn, config: Optional[HedgingConfig] = None):
+        self.select = select
+        self.config = config or HedgingConfig()
+        self.budget = HedgeBudget(self.config.budget_ratio, self.config.budget_burst)
+
+        # Metrics
+        self.eligible_calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    async def run(
+        self, call: Dict[str, Any], tool: Tool, attempt: AttemptFn
+    ) -> Tuple[Any, Tool, bool]:
+        """Returns the result, the tool that produced it and whether it was hedged"""
+        choice = await self.select(call, tool) if self.config.enabled else None
+        if choice is None:
+            return await attempt(tool), tool, False
+
+        self.eligible_calls += 1
+        self.budget.deposit()
+        backup, delay = choice
+
+        primary = asyncio.create_task(attempt(tool))
+        tasks = {primary: tool}
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result(), tool, False
+            if not self.budget.withdraw():
+                self.budget_denied += 1
+                return await primary, tool, False
+
+            self.hedges += 1
+            logger.debug(
+                f"Hedging {tool.id} with {backup.id} after {delay * 1000:.0f}ms"
+            )
+            hedge = asyncio.create_task(attempt(backup))
+            tasks[hedge] = backup
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result(), tasks[task], True
+            raise primary.exception()
+        finally:
+            # Cancel the loser (or every attempt, if the caller was cancelled)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get hedging metrics"""
+        return {
+            "enabled": self.config.enabled,
+            "eligible_calls": self.eligible_calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "hedge_rate": (
+                self.hedges / self.eligible_calls if self.eligible_calls else 0.0
+            ),
+            "win_rate": self.hedge_wins / self.hedges if self.hedges else 0.0,
+            "budget_tokens": self.budget.tokens,
+        }
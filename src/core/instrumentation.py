@@ -0,0 +1,369 @@
+"""
+Hot-Path Instrumentation
+Spans, per-phase latency histograms and events for discovery, planning and
+circuit breakers, fanned out to pluggable exporters (Prometheus, OpenTelemetry)
+"""
+
+import contextvars
+import logging
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from .execution_stats import LatencySketch
+
+logger = logging.getLogger(__name__)
+
+Attributes = Optional[Dict[str, Any]]
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "localmcp_current_span", default=None
+)
+
+
+class Span:
+    """One timed operation; ``parent`` links it into a trace"""
+
+    __slots__ = (
+        "name",
+        "attributes",
+        "parent",
+        "start_ns",
+        "duration",
+        "error",
+        "_instrumentation",
+        "_start",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        instrumentation: "Instrumentation",
+        name: str,
+        attributes: Attributes,
+        parent: Optional["Span"],
+    ):
+        self.name = name
+        self.attributes = dict(attributes) if attributes else {}
+        self.parent = parent
+        self.start_ns = time.time_ns()
+        self.duration = 0.0  # seconds, set when the span ends
+        self.error: Optional[str] = None
+        self._instrumentation = instrumentation
+        self._start = time.perf_counter()
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None):
+        self.duration = time.perf_counter() - self._start
+        if error is not None:
+            self.error = type(error).__name__
+        self._instrumentation._end(self)
+
+    # Used as a context manager the span is current, so nested spans and
+    # events attach to it
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self._token)
+        self.end(exc)
+        return False
+
+
+class _NullSpan:
+    """Shared stand-in returned while instrumentation is disabled"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def end(self, error: Optional[BaseException] = None):
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Exporter:
+    """Receives finished spans and events; subclasses override what they need"""
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        pass
+
+    def on_event(self, name: str, attributes: Dict[str, Any], span: Optional[Span]):
+        pass
+
+
+class Instrumentation:
+    """
+    Entry point the orchestrator, plan executor and breakers report to
+
+    Without exporters it is disabled: ``span`` returns a shared no-op object
+    and ``event`` returns immediately. Callers check ``enabled`` before
+    building attribute dicts, so the hot path pays one attribute check.
+    Exporter errors are logged and never reach the caller.
+    """
+
+    def __init__(self, exporters: Optional[Sequence[Exporter]] = None):
+        self.exporters: List[Exporter] = list(exporters or [])
+        self.enabled = bool(self.exporters)
+
+    def add_exporter(self, exporter: Exporter):
+        self.exporters.append(exporter)
+        self.enabled = True
+
+    def span(
+        self, name: str, attributes: Attributes = None, parent: Optional[Span] = None
+    ) -> Span:
+        """Start a span; a child of ``parent`` or of the current span
+
+        Use it as a context manager, or call ``end()`` on it explicitly when
+        it must not become the current span (e.g. across ``yield``).
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        span = Span(self, name, attributes, parent or _current_span.get())
+        self._dispatch("on_start", span)
+        return span
+
+    def event(self, name: str, attributes: Attributes = None):
+        """Record a point-in-time event, attached to the current span"""
+        if not self.enabled:
+            return
+        self._dispatch("on_event", name, attributes or {}, _current_span.get())
+
+    def _end(self, span: Span):
+        self._dispatch("on_end", span)
+
+    def _dispatch(self, method: str, *args):
+        for exporter in self.exporters:
+            try:
+                getattr(exporter, method)(*args)
+            except Exception as e:
+                logger.warning(f"{type(exporter).__name__}.{method} failed: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrics of exporters that keep them in process"""
+        metrics = {}
+        for exporter in self.exporters:
+            if isinstance(exporter, InMemoryExporter):
+                metrics.update(exporter.get_metrics())
+        return metrics
+
+
+class InMemoryExporter(Exporter):
+    """Per-phase latency sketches and event counts, read via ``get_metrics``"""
+
+    def __init__(self):
+        self.phases: Dict[str, LatencySketch] = defaultdict(LatencySketch)
+        self.errors: Counter = Counter()
+        self.events: Counter = Counter()
+
+    def on_end(self, span: Span):
+        self.phases[span.name].add(span.duration * 1000.0)
+        if span.error is not None:
+            self.errors[span.name] += 1
+
+    def on_event(self, name: str, attributes: Dict[str, Any], span: Optional[Span]):
+        self.events[name] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "phases": {
+                name: {
+                    "count": sketch.count,
+                    "errors": self.errors[name],
+                    "p50_ms": sketch.quantile(0.5),
+                    "p95_ms": sketch.quantile(0.95),
+                    "p99_ms": sketch.quantile(0.99),
+                }
+                for name, sketch in self.phases.items()
+            },
+            "events": dict(self.events),
+        }
+
+
+# Seconds; discovery phases are sub-millisecond to tens of ms, tool calls up to ~30s
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2, "deconstructed": 3}
+
+
+class PrometheusExporter(Exporter):
+    """
+    Prometheus histograms per phase plus event and breaker metrics
+
+    Phases are labelled by span name and, where the span carries one, by
+    ``server``. With ``port`` the exporter serves ``/metrics`` itself; the
+    bundled ``config/prometheus.yml`` scrapes port 9464.
+    """
+
+    def __init__(
+        self,
+        registry=None,
+        namespace: str = "localmcp",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        port: Optional[int] = None,
+    ):
+        from prometheus_client import (
+            REGISTRY,
+            Counter,
+            Gauge,
+            Histogram,
+            start_http_server,
+        )
+
+        registry = registry or REGISTRY
+        self.phase_duration = Histogram(
+            "phase_duration_seconds",
+            "Duration of instrumented phases",
+            ["phase", "server"],
+            namespace=namespace,
+            buckets=buckets,
+            registry=registry,
+        )
+        self.phase_errors = Counter(
+            "phase_errors_total",
+            "Instrumented phases that raised",
+            ["phase", "server"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.events = Counter(
+            "events_total",
+            "Instrumentation events",
+            ["event", "server"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.breaker_transitions = Counter(
+            "breaker_transitions_total",
+            "Circuit breaker state transitions",
+            ["server", "from_state", "to_state"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.breaker_state = Gauge(
+            "breaker_state",
+            "Circuit breaker state (0 closed, 1 half-open, 2 open, 3 degraded)",
+            ["server"],
+            namespace=namespace,
+            registry=registry,
+        )
+        if port is not None:
+            start_http_server(port, registry=registry)
+
+    def on_end(self, span: Span):
+        server = str(span.attributes.get("server", ""))
+        self.phase_duration.labels(span.name, server).observe(span.duration)
+        if span.error is not None:
+            self.phase_errors.labels(span.name, server).inc()
+
+    def on_event(self, name: str, attributes: Dict[str, Any], span: Optional[Span]):
+        server = str(attributes.get("server", ""))
+        self.events.labels(name, server).inc()
+        if name == "circuit_breaker.state_change":
+            self.breaker_transitions.labels(
+                server, attributes["from_state"], attributes["to_state"]
+            ).inc()
+            self.breaker_state.labels(server).set(
+                BREAKER_STATE_VALUES.get(attributes["to_state"], -1)
+            )
+
+
+class OpenTelemetryExporter(Exporter):
+    """
+    Mirrors spans and events into OpenTelemetry, e.g. for Jaeger
+
+    Root spans nest under the active OpenTelemetry span (such as a FastAPI
+    request span). ``jaeger()`` builds a tracer that ships spans over OTLP
+    to the Jaeger collector from ``docker-compose.yml``.
+    """
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("localmcp")
+        self._spans: Dict[int, Any] = {}
+
+    @classmethod
+    def jaeger(
+        cls,
+        endpoint: str = "http://localhost:4318/v1/traces",
+        service_name: str = "localmcp",
+    ) -> "OpenTelemetryExporter":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": service_name})
+        )
+        provider.add_span_processor(
+            BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint))
+        )
+        return cls(provider.get_tracer("localmcp"))
+
+    def on_start(self, span: Span):
+        parent = self._spans.get(id(span.parent)) if span.parent is not None else None
+        context = (
+            self._trace.set_span_in_context(parent) if parent is not None else None
+        )
+        self._spans[id(span)] = self.tracer.start_span(
+            span.name, context=context, start_time=span.start_ns
+        )
+
+    def on_end(self, span: Span):
+        otel_span = self._spans.pop(id(span), None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if not isinstance(value, (bool, int, float, str)):
+                value = str(value)
+            otel_span.set_attribute(key, value)
+        if span.error is not None:
+            otel_span.set_status(
+                self._trace.Status(self._trace.StatusCode.ERROR, span.error)
+            )
+        otel_span.end(end_time=span.start_ns + int(span.duration * 1e9))
+
+    def on_event(self, name: str, attributes: Dict[str, Any], span: Optional[Span]):
+        otel_span = self._spans.get(id(span)) if span is not None else None
+        if otel_span is not None:
+            otel_span.add_event(
+                name, {key: str(value) for key, value in attributes.items()}
+            )
@@ -0,0 +1,41 @@
+"""
+Lazy Imports
+Module proxies that defer importing heavy dependencies (FAISS,
+sentence-transformers) until they are first used
+"""
+
+import importlib
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """
+    Stands in for a module and imports it on first attribute access
+
+    ``faiss = LazyModule("faiss")`` at module level keeps ``import`` of the
+    enclosing module cheap; code paths that never touch ``faiss`` (planning,
+    circuit breaking) never pay for loading it.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        module: Optional[ModuleType] = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
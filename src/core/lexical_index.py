@@ -0,0 +1,264 @@
+"""
+Lexical Tool Index
+BM25 inverted index over tool server names, names and descriptions, plus
+exact tool/server name matching; needs no model, so it can answer discovery
+without encoding the intent
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from ..mcp.tool_registry import Tool
+from .capability_index import ToolFilter
+
+_WORD = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z0-9]+|[A-Z0-9]+")
+
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "can",
+        "for",
+        "from",
+        "help",
+        "i",
+        "in",
+        "into",
+        "is",
+        "it",
+        "me",
+        "my",
+        "need",
+        "of",
+        "on",
+        "or",
+        "please",
+        "the",
+        "this",
+        "to",
+        "want",
+        "with",
+        "you",
+    }
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; snake_case, camelCase and kebab-case are split"""
+    return [
+        token
+        for token in (word.lower() for word in _WORD.findall(text))
+        if token not in STOPWORDS
+    ]
+
+
+def lexical_text(tool: Tool) -> str:
+    return f"{tool.server_name} {tool.name} {tool.description}"
+
+
+def phrase(text: str) -> str:
+    """Normalized token sequence used to match names inside an intent"""
+    return " ".join(tokenize(text))
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: ``sum(1 / (k + rank))`` per id, best first"""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+@dataclass
+class RetrievalConfig:
+    """Configuration for hybrid lexical + vector tool retrieval"""
+
+    fast_path: bool = True  # answer intents naming a tool without encoding them
+    fusion: bool = True  # fuse lexical and vector candidates; False: vector only
+    rrf_k: int = 60
+    candidates: int = 20  # per retriever, before fusion
+
+
+class LexicalIndex:
+    """
+    Okapi BM25 over tool text, keyed by tool id
+
+    Postings map each term to per-tool term frequencies, so updates touch
+    only the changed tools. Thread-safe: searches may run in the index pool
+    while the catalog is being updated.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.tools: Dict[str, Tool] = {}
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.lengths: Dict[str, int] = {}
+        self.total_length = 0
+        self._terms: Dict[str, List[str]] = {}
+        # Name and server-name phrases -> tool ids, for exact matching
+        self.names: Dict[str, Set[str]] = defaultdict(set)
+        self.server_names: Dict[str, Set[str]] = defaultdict(set)
+        self._phrases: Dict[str, Tuple[str, str]] = {}
+        self.max_phrase_tokens = 1
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+    def __contains__(self, tool_id: str) -> bool:
+        return tool_id in self.tools
+
+    def upsert(self, tools: Iterable[Tool]):
+        """Add tools or replace their indexed text"""
+        with self._lock:
+            for tool in tools:
+                self._remove(tool.id)
+                counts = Counter(tokenize(lexical_text(tool)))
+                for term, count in counts.items():
+                    self.postings[term][tool.id] = count
+                length = sum(counts.values())
+                self.tools[tool.id] = tool
+                self.lengths[tool.id] = length
+                self.total_length += length
+                self._terms[tool.id] = list(counts)
+
+                name, server_name = phrase(tool.name), phrase(tool.server_name)
+                self.names[name].add(tool.id)
+                self.server_names[server_name].add(tool.id)
+                self._phrases[tool.id] = (name, server_name)
+                self.max_phrase_tokens = max(
+                    self.max_phrase_tokens,
+                    name.count(" ") + 1,
+                    server_name.count(" ") + 1,
+                )
+
+    def sync(self, tools: Iterable[Tool]):
+        """Hold exactly ``tools``, re-indexing only tools that were replaced"""
+        tools = {tool.id: tool for tool in tools}
+        with self._lock:
+            for tool_id in [tool_id for tool_id in self.tools if tool_id not in tools]:
+                self._remove(tool_id)
+            self.upsert(
+                [
+                    tool
+                    for tool_id, tool in tools.items()
+                    if self.tools.get(tool_id) is not tool
+                ]
+            )
+
+    def remove(self, tool_ids: Iterable[str]) -> List[str]:
+        with self._lock:
+            return [tool_id for tool_id in tool_ids if self._remove(tool_id)]
+
+    def _remove(self, tool_id: str) -> bool:
+        if tool_id not in self.tools:
+            return False
+        for term in self._terms.pop(tool_id):
+            postings = self.postings[term]
+            del postings[tool_id]
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(tool_id)
+        del self.tools[tool_id]
+
+        for key, table in zip(
+            self._phrases.pop(tool_id), (self.names, self.server_names)
+        ):
+            table[key].discard(tool_id)
+            if not table[key]:
+                del table[key]
+        return True
+
+    def match_names(
+        self, query: str, tool_filter: Optional[ToolFilter] = None
+    ) -> List[Tool]:
+        """Tools the query names explicitly, e.g. "github create_issue"
+
+        A tool matches when its name appears in the query as a contiguous
+        token sequence. Single-word names only count together with their
+        server's name, since they are easily ordinary words ("search").
+        If the query names servers, matches are limited to those servers.
+        """
+        tokens = tokenize(query)
+        with self._lock:
+            named_tools: Set[str] = set()
+            on_named_servers: Set[str] = set()
+            for start in range(len(tokens)):
+                for end in range(
+                    start + 1, min(len(tokens), start + self.max_phrase_tokens) + 1
+                ):
+                    key = " ".join(tokens[start:end])
+                    named_tools.update(self.names.get(key, ()))
+                    on_named_servers.update(self.server_names.get(key, ()))
+
+            matches = []
+            for tool_id in named_tools:
+                name = self._phrases[tool_id][0]
+                if on_named_servers and tool_id not in on_named_servers:
+                    continue
+                if " " not in name and tool_id not in on_named_servers:
+                    continue
+                tool = self.tools[tool_id]
+                if tool_filter is None or tool_filter.matches(tool):
+                    matches.append(tool)
+            return sorted(matches, key=lambda tool: tool.id)
+
+    def search(
+        self, query: str, k: int, tool_filter: Optional[ToolFilter] = None
+    ) -> List[Tuple[Tool, float]]:
+        """Top ``k`` tools by BM25 score, best first
+
+        Tools sharing no term with the query are omitted.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or not self.tools:
+                return []
+            num_docs = len(self.tools)
+            average_length = self.total_length / num_docs or 1.0
+
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1.0 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for tool_id, count in postings.items():
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self.lengths[tool_id] / average_length
+                    )
+                    scores[tool_id] += idf * count * (self.k1 + 1) / (count + norm)
+
+            if tool_filter is not None and not tool_filter.is_empty:
+                candidates = (
+                    (tool_id, score)
+                    for tool_id, score in scores.items()
+                    if tool_filter.matches(self.tools[tool_id])
+                )
+            else:
+                candidates = scores.items()
+            best = heapq.nlargest(k, candidates, key=lambda item: item[1])
+            return [(self.tools[tool_id], score) for tool_id, score in best]
+
+    def search_many(
+        self, queries: Sequence[Tuple[str, Optional[ToolFilter]]], k: int
+    ) -> List[List[Tuple[Tool, float]]]:
+        """``search`` for each ``(query, tool_filter)`` pair"""
+        return [self.search(query, k, tool_filter) for query, tool_filter in queries]
@@ -0,0 +1,212 @@
+"""
+Model Executor
+Runs embedding-model and vector-index work off the asyncio event loop, with a
+bounded number of queued jobs so callers feel backpressure instead of
+stalling every other coroutine
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .embedding_backend import (
+    BackendSpec,
+    EmbeddingBackend,
+    backend_class,
+    load_backend,
+)
+
+
+@dataclass
+class ExecutorConfig:
+    """Configuration for model and index execution"""
+
+    mode: str = "thread"  # "thread" or "process"
+    max_workers: int = 1
+    max_pending: int = 64  # jobs queued or running before callers wait
+    index_workers: int = 2
+    backend: BackendSpec = "sentence-transformers"  # name in BACKENDS or a subclass
+    backend_config: Any = None  # e.g. OnnxConfig for the "onnx" backend
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when a job cannot be queued before its timeout"""
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        super().__init__(f"Model executor has {max_pending} pending jobs")
+
+
+# Model loaded once per worker process in "process" mode
+_worker_model: Optional[EmbeddingBackend] = None
+
+
+def _init_worker(model_name: str, backend: BackendSpec, backend_config: Any):
+    global _worker_model
+    _worker_model = load_backend(model_name, backend, backend_config)
+
+
+def _worker_encode(texts: List[str]) -> np.ndarray:
+    return np.asarray(_worker_model.encode(texts), dtype="float32")
+
+
+def _worker_ready() -> bool:
+    return _worker_model is not None
+
+
+class ModelExecutor:
+    """
+    Executes encode calls and index operations in worker pools
+
+    In "thread" mode the model lives in this process and ``encode`` runs in a
+    thread pool (PyTorch and ONNX Runtime release the GIL during inference).
+    In "process" mode each worker process loads its own copy of the model
+    and this process never loads it. ``ExecutorConfig.backend`` chooses the
+    embedding backend (see embedding_backend). Index work always runs in a
+    thread pool because the index lives in this process; FAISS releases the
+    GIL while searching.
+
+    The model is loaded on the first ``encode`` or by an explicit ``load``,
+    never in the constructor, so startup does not wait for it.
+    """
+
+    def __init__(self, model_name: str, config: Optional[ExecutorConfig] = None):
+        self.model_name = model_name
+        self.config = config or ExecutorConfig()
+        if self.config.mode not in ("thread", "process"):
+            raise ValueError(f"Unknown executor mode: {self.config.mode}")
+
+        # Identifies the backend's vectors, e.g. for the embedding store
+        self.model_id = backend_class(self.config.backend).cache_id(
+            model_name, self.config.backend_config
+        )
+        self.model: Optional[EmbeddingBackend] = None
+        self.loaded = False
+        self._loading: Optional[asyncio.Future] = None
+        self._model_pool: Executor
+        if self.config.mode == "process":
+            self._model_pool = ProcessPoolExecutor(
+                max_workers=self.config.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_name, self.config.backend, self.config.backend_config),
+            )
+        else:
+            self._model_pool = ThreadPoolExecutor(
+                max_workers=self.config.max_workers, thread_name_prefix="model"
+            )
+        self._index_pool = ThreadPoolExecutor(
+            max_workers=self.config.index_workers, thread_name_prefix="index"
+        )
+
+        # Created lazily so the executor can be built outside a running loop
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        # Metrics
+        self.pending = 0
+        self.waiting = 0
+        self.total_jobs = 0
+
+    async def load(self):
+        """Load the model in the background pool; concurrent callers share one load"""
+        if self.loaded:
+            return
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        try:
+            await asyncio.shield(self._loading)
+        except Exception:
+            self._loading = None  # let a later call retry
+            raise
+
+    async def _load(self):
+        if self.config.mode == "process":
+            # Any job starts a worker, whose initializer loads the model
+            await asyncio.gather(
+                *(
+                    self._submit(self._model_pool, _worker_ready, None)
+                    for _ in range(self.config.max_workers)
+                )
+            )
+        else:
+            self.model = await self._submit(
+                self._model_pool,
+                partial(
+                    load_backend,
+                    self.model_name,
+                    self.config.backend,
+                    self.config.backend_config,
+                ),
+                None,
+            )
+        self.loaded = True
+
+    async def encode(
+        self, texts: List[str], timeout: Optional[float] = None
+    ) -> np.ndarray:
+        """Embed texts without blocking the event loop"""
+        if not self.loaded:
+            await self.load()
+        if self.model is not None:
+            func = partial(self.model.encode, texts)
+        else:
+            func = partial(_worker_encode, texts)
+        result = await self._submit(self._model_pool, func, timeout)
+        return np.asarray(result, dtype="float32")
+
+    async def run(
+        self, func: Callable, *args, timeout: Optional[float] = None, **kwargs
+    ) -> Any:
+        """Run an index operation (search, upsert, rebuild, ...) in a thread"""
+        return await self._submit(
+            self._index_pool, partial(func, *args, **kwargs), timeout
+        )
+
+    async def _submit(
+        self, pool: Executor, func: Callable, timeout: Optional[float]
+    ) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.config.max_pending)
+
+        # Backpressure: wait for a free slot, optionally bounded by timeout
+        self.waiting += 1
+        try:
+            if timeout is None:
+                await self._slots.acquire()
+            else:
+                await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise ExecutorSaturatedError(self.config.max_pending)
+        finally:
+            self.waiting -= 1
+
+        self.pending += 1
+        self.total_jobs += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, func)
+        finally:
+            self.pending -= 1
+            self._slots.release()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get executor metrics"""
+        return {
+            "mode": self.config.mode,
+            "model": self.model_id,
+            "model_loaded": self.loaded,
+            "pending": self.pending,
+            "waiting": self.waiting,
+            "total_jobs": self.total_jobs,
+            "max_pending": self.config.max_pending,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop worker pools"""
+        self._model_pool.shutdown(wait=wait)
+        self._index_pool.shutdown(wait=wait)
@@ -7,21 +7,41 @@ Based on research findings for handling hundreds of MCP tools efficiently
 import asyncio
 import hashlib
 import json
+import logging
+import os
+import struct
 import time
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import faiss
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..mcp.tool_registry import ToolRegistry, Tool
 from .cache_manager import CacheManager
-from .circuit_breaker import CircuitBreaker
+from .circuit_breaker import (
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    DeadlineExceededError,
+    ServiceDegradedError,
+)
+from .tool_index import IndexConfig, ToolIndex, normalize, tool_description
+from .capability_index import ToolFilter
+from .lexical_index import LexicalIndex, RetrievalConfig, reciprocal_rank_fusion
+from .shared_index import SharedIndexStore
+from .embedding_store import EmbeddingStore
+from .discovery_batcher import DiscoveryBatcher
+from .model_executor import ExecutorConfig, ModelExecutor
+from .discovery_cache import DiscoveryCache, DiscoveryCacheConfig
+from .execution_stats import ExecutionStats
+from .hedging import Hedger, HedgingConfig
+from .instrumentation import Instrumentation
+from .result_cache import ResultCache, ResultCacheConfig
+from .plan_executor import CallResult, DependencyFailedError, InvokeFn, PlanExecutor
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(slots=True)
 class ToolScore:
     tool: Tool
     server_score: float
@@ -29,384 +49,1349 @@ class ToolScore:
     combined_score: float
     context_relevance: float = 0.0
 
+    @staticmethod
+    def pack(scores: List["ToolScore"]) -> bytes:
+        """Compact wire format: tool ids plus a float32 score matrix
+
+        Layout: little-endian uint32 header length, JSON list of tool ids,
+        then one row of (server, tool, combined, context) scores per tool.
+        """
+        header = json.dumps([score.tool.id for score in scores]).encode()
+        values = np.array(
+            [
+                (s.server_score, s.tool_score, s.combined_score, s.context_relevance)
+                for s in scores
+            ],
+            dtype="<f4",
+        )
+        return struct.pack("<I", len(header)) + header + values.tobytes()
+
+    @staticmethod
+    def unpack(
+        payload: bytes, resolve_tool: Callable[[str], Optional[Tool]]
+    ) -> List["ToolScore"]:
+        """Rehydrate packed scores; tools that no longer resolve are dropped"""
+        (header_len,) = struct.unpack_from("<I", payload)
+        tool_ids = json.loads(payload[4 : 4 + header_len])
+        values = np.frombuffer(payload, dtype="<f4", offset=4 + header_len).reshape(
+            len(tool_ids), 4
+        )
+
+        scores = []
+        for tool_id, row in zip(tool_ids, values):
+            tool = resolve_tool(tool_id)
+            if tool is not None:
+                scores.append(ToolScore(tool, *(float(v) for v in row)))
+        return scores
+
+
+class DependencyCycleError(ValueError):
+    """Raised when tool calls reference each other in a cycle"""
+
+    def __init__(self, call_ids: List[str]):
+        self.call_ids = call_ids
+        super().__init__(f"Dependency cycle between calls: {', '.join(call_ids)}")
+
+
+@dataclass
+class StageEstimate:
+    """Latency estimate for one plan stage (milliseconds)"""
+
+    p50: float
+    p95: float
+    critical_call: Optional[str] = None  # call most often the slowest in the stage
+    critical_share: float = 0.0  # fraction of samples in which it was the slowest
+
+
+@dataclass
+class DurationEstimate:
+    """Latency distribution of a whole plan (milliseconds)"""
+
+    p50: float = 0.0
+    p95: float = 0.0
+    mean: float = 0.0
+    stages: List[StageEstimate] = field(default_factory=list)
+
 
 @dataclass
 class ExecutionPlan:
-    """Represents an optimized execution plan for multiple tools"""
-    stages: List[List[Tool]] = field(default_factory=list)
+    """Represents an optimized execution plan for multiple tools
+
+    Stages hold call ids; ``calls`` and ``tools`` map each call id to its
+    call spec and the tool it invokes.
+    """
+
+    stages: List[List[str]] = field(default_factory=list)
     dependencies: Dict[str, List[str]] = field(default_factory=dict)
-    estimated_duration: float = 0.0
-    
-    def add_parallel_stage(self, tools: List[Tool]):
-        """Add tools that can execute in parallel"""
-        self.stages.append(tools)
-    
-    def add_sequential_stages(self, tools: List[Tool]):
-        """Add tools that must execute sequentially"""
-        for tool in tools:
-            self.stages.append([tool])
+    calls: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    tools: Dict[str, Optional[Tool]] = field(default_factory=dict)
+    duration: DurationEstimate = field(default_factory=DurationEstimate)
+    strategy: str = "default"
+    latency_slo: Optional[float] = None
+    meets_slo: Optional[bool] = None
+
+    @property
+    def estimated_duration(self) -> float:
+        """Median end-to-end duration, kept for callers of the old field"""
+        return self.duration.p50
+
+    def add_parallel_stage(self, call_ids: List[str]):
+        """Add calls that can execute in parallel"""
+        self.stages.append(list(call_ids))
+
+    def add_sequential_stages(self, call_ids: List[str]):
+        """Add calls that must execute sequentially"""
+        for call_id in call_ids:
+            self.stages.append([call_id])
 
 
 class SemanticToolOrchestrator:
     """Advanced tool orchestration with semantic search and intelligent routing"""
-    
-    def __init__(self, 
-                 tool_registry: ToolRegistry,
-                 cache_manager: CacheManager,
-                 embedding_model: str = "all-MiniLM-L6-v2"):
+
+    def __init__(
+        self,
+        tool_registry: ToolRegistry,
+        cache_manager: CacheManager,
+        embedding_model: str = "all-MiniLM-L6-v2",
+        embedding_cache_dir: Optional[str] = None,
+        index_config: Optional[IndexConfig] = None,
+        batch_window_ms: float = 0.0,
+        max_batch_size: int = 64,
+        executor_config: Optional[ExecutorConfig] = None,
+        discovery_cache_config: Optional[DiscoveryCacheConfig] = None,
+        hedging_config: Optional[HedgingConfig] = None,
+        result_cache_config: Optional[ResultCacheConfig] = None,
+        shared_index_dir: Optional[str] = None,
+        shared_index_role: str = "builder",
+        instrumentation: Optional[Instrumentation] = None,
+        retrieval_config: Optional[RetrievalConfig] = None,
+    ):
         self.tool_registry = tool_registry
+        # Spans and histograms per hot-path phase; a no-op without exporters
+        self.instrumentation = instrumentation or Instrumentation()
         self.cache = cache_manager
-        self.embedding_model = SentenceTransformer(embedding_model)
+        self.discovery_cache = DiscoveryCache(
+            cache_manager,
+            discovery_cache_config,
+            pack=ToolScore.pack,
+            unpack=lambda payload: ToolScore.unpack(payload, self._resolve_tool),
+        )
+
+        # All encode and index work runs here, never on the event loop.
+        # In process mode the model is only loaded in the worker processes.
+        # Loading starts in ``initialize`` (or on the first encode).
+        # ``executor_config.backend`` selects PyTorch or ONNX Runtime.
+        self.executor = ModelExecutor(embedding_model, executor_config)
+
+        # Persistent embeddings and serialized index for fast warm starts
+        self.embedding_store = (
+            EmbeddingStore(embedding_cache_dir, self.executor.model_id)
+            if embedding_cache_dir
+            else None
+        )
         self.capability_graph = CapabilityGraph()
-        self.execution_history = defaultdict(list)
-        
-        # Initialize semantic index
-        self.semantic_index = None
-        self.tool_embeddings = {}
-        self.index_to_tool = {}
-        
+        # Rolling per-server/tool/session statistics (bounded memory)
+        self.execution_stats = ExecutionStats()
+
+        # Initialize semantic index (ID-mapped, updated incrementally)
+        self.index_config = index_config or IndexConfig()
+        self.semantic_index: Optional[ToolIndex] = None
+        self._index_lock = asyncio.Lock()
+
+        # Model-free BM25 index, fused with vector search; also serves
+        # discovery while the model warms up
+        self.lexical_index = LexicalIndex()
+        self.retrieval_config = retrieval_config or RetrievalConfig()
+        self._warmup: Optional[asyncio.Task] = None
+        self.warmup_error: Optional[str] = None
+
+        # Index shared by several orchestrator processes on a host: the
+        # builder publishes every change, workers attach read-only
+        if shared_index_role not in ("builder", "worker"):
+            raise ValueError(f"Unknown shared index role: {shared_index_role}")
+        self.shared_index = (
+            SharedIndexStore(shared_index_dir) if shared_index_dir else None
+        )
+        self.shared_index_role = shared_index_role
+        self.shared_index_poll_interval = 1.0  # seconds between version checks
+        self.shared_index_version: Optional[int] = None
+        self._shared_index_checked = 0.0
+
+        # Micro-batching of concurrent discovery requests (off when window is 0)
+        self.batcher: Optional[DiscoveryBatcher] = None
+        if batch_window_ms > 0:
+            self.batcher = DiscoveryBatcher(
+                self.discover_tools_batch,
+                self._generate_cache_key,
+                window=batch_window_ms / 1000.0,
+                max_batch_size=max_batch_size,
+            )
+
         # Circuit breakers for each MCP server
-        self.circuit_breakers = {}
-        
-    async def initialize(self):
-        """Initialize semantic index with discovered tools"""
+        self.circuit_breakers = CircuitBreakerRegistry(
+            instrumentation=self.instrumentation
+        )
+
+        # Backup requests for slow idempotent calls (opt-in)
+        self.hedger = Hedger(self._select_hedge, hedging_config)
+
+        # Outputs of cacheable tools, shared by concurrent identical calls
+        self.result_cache = ResultCache(result_cache_config)
+
+        # Planning
+        self.max_parallel_tools = 32  # per stage; servers also have their own budgets
+        self.default_tool_latency = 100.0  # ms, for tools without history
+        self.duration_samples = 1024
+
+    async def initialize(self, wait: bool = True):
+        """Initialize the lexical and semantic indexes with discovered tools
+
+        With ``wait=False`` this returns as soon as the lexical index is
+        built; the model and semantic index load in the background while
+        discovery answers from the discovery cache and the lexical index.
+        ``semantic_ready`` / ``wait_until_ready`` report when that is done.
+        """
         tools = await self.tool_registry.get_all_tools()
-        await self._build_semantic_index(tools)
-        
+        await self.executor.run(self.lexical_index.upsert, tools)
+
+        if wait:
+            await self._warm_up(tools)
+        elif self._warmup is None or self._warmup.done():
+            self._warmup = asyncio.create_task(self._warm_up_in_background(tools))
+
+    async def _warm_up(self, tools: List[Tool]):
+        """Load the model and load, build or attach the semantic index"""
+        tracing = self.instrumentation.enabled
+        with self.instrumentation.span(
+            "startup.warm_up", {"tools": len(tools)} if tracing else None
+        ):
+            async with self._index_lock:
+                if self._is_shared_worker:
+                    if not await self.refresh_shared_index():
+                        logger.warning(
+                            "No shared tool index published yet, "
+                            "waiting for the builder"
+                        )
+                elif self.embedding_store and os.path.exists(
+                    self.embedding_store.index_meta_path
+                ):
+                    try:
+                        await self._load_semantic_index(tools)
+                    except Exception as e:
+                        logger.warning(
+                            f"Could not load saved tool index, rebuilding: {e}"
+                        )
+                        await self._build_semantic_index(tools)
+                else:
+                    await self._build_semantic_index(tools)
+
+                if not self._is_shared_worker:
+                    await self.save_index()
+                    await self._publish_shared_index()
+
+            # A restored index may not have needed the model yet
+            await self.executor.load()
+        self.warmup_error = None
+
+    async def _warm_up_in_background(self, tools: List[Tool]):
+        try:
+            await self._warm_up(tools)
+            logger.info("Semantic tool search ready")
+        except Exception as e:
+            self.warmup_error = str(e)
+            logger.error(f"Warm-up failed, serving lexical results only: {e}")
+
+    @property
+    def semantic_ready(self) -> bool:
+        """Whether discovery uses the embedding model and semantic index"""
+        return self.semantic_index is not None and self.executor.loaded
+
+    @property
+    def embedding_model(self):
+        """The in-process embedding backend, once loaded (None in process mode)"""
+        return self.executor.model
+
+    async def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background warm-up; returns ``semantic_ready``"""
+        if self._warmup is not None and not self._warmup.done():
+            await asyncio.wait({self._warmup}, timeout=timeout)
+        return self.semantic_ready
+
+    def get_readiness(self) -> Dict[str, Any]:
+        """Readiness signal, e.g. for a health endpoint"""
+        return {
+            "lexical": len(self.lexical_index) > 0,
+            "semantic": self.semantic_ready,
+            "model_loaded": self.executor.loaded,
+            "warming_up": self._warmup is not None and not self._warmup.done(),
+            "error": self.warmup_error,
+        }
+
+    @property
+    def _is_shared_worker(self) -> bool:
+        return self.shared_index is not None and self.shared_index_role == "worker"
+
+    async def _publish_shared_index(self):
+        """Builder side: publish the current index as a new shared version"""
+        if (
+            self.shared_index is None
+            or self._is_shared_worker
+            or self.semantic_index is None
+        ):
+            return
+        self.shared_index_version = await self.executor.run(
+            self.shared_index.publish, self.semantic_index
+        )
+        # Key discovery cache entries by catalog version, like the workers do
+        self.discovery_cache.set_index_version(self.shared_index_version)
+
+    async def refresh_shared_index(self) -> bool:
+        """Worker side: attach the latest published version if it changed
+
+        The new index is mapped completely before the reference is swapped,
+        so searches see either the old or the new catalog generation. The
+        lexical index is brought to the snapshot's tool set first, so tools
+        the builder removed are not returned by lexical matching either.
+        Returns whether a newer version was attached.
+        """
+        self._shared_index_checked = time.monotonic()
+        version = self.shared_index.current_version()
+        if version is None or version == self.shared_index_version:
+            return False
+
+        tools = {tool.id: tool for tool in await self.tool_registry.get_all_tools()}
+        attached = await self.executor.run(
+            self.shared_index.attach, tools, self.index_config, version
+        )
+        if attached is None:
+            return False
+        index, self.shared_index_version = attached
+        # Lexical results must come from the same catalog as semantic ones
+        await self.executor.run(self.lexical_index.sync, index.get_tools())
+        self.semantic_index = index
+        # Every worker on the same version shares discovery cache entries
+        self.discovery_cache.set_index_version(version)
+        logger.info(f"Attached shared tool index version {version}")
+        return True
+
+    async def _load_semantic_index(self, tools: List[Tool]):
+        """Restore the serialized index, encoding only new or changed tools"""
+        store = self.embedding_store
+        vectors = await self._encode_tools(tools)
+        keys = {tool.id: EmbeddingStore.key(tool) for tool in tools}
+
+        index, pending = await self.executor.run(
+            ToolIndex.load,
+            store.index_path,
+            store.index_meta_path,
+            tools,
+            keys,
+            vectors,
+            config=self.index_config,
+        )
+        if index.dimension != vectors.shape[1]:
+            raise ValueError("saved index dimension does not match the model")
+        if pending:
+            await self.executor.run(
+                index.upsert, [tools[i] for i in pending], vectors[pending]
+            )
+        if index.needs_rebuild():
+            await self.executor.run(index.rebuild)
+        self.semantic_index = index
+        await self.discovery_cache.invalidate()
+
+    async def save_index(self):
+        """Persist the current tool index next to the embedding store"""
+        if self.embedding_store is None or self.semantic_index is None:
+            return
+        tools = [
+            self.semantic_index.get_tool(tool_id)
+            for tool_id in list(self.semantic_index.tool_slots)
+        ]
+        keys = {tool.id: EmbeddingStore.key(tool) for tool in tools if tool}
+        await self.executor.run(
+            self.semantic_index.save,
+            self.embedding_store.index_path,
+            self.embedding_store.index_meta_path,
+            keys,
+        )
+
+    async def _encode_tools(self, tools: List[Tool]) -> np.ndarray:
+        """Embed tool descriptions, reusing persisted vectors where possible"""
+        if self.embedding_store is None:
+            return await self.executor.encode(
+                [tool_description(tool) for tool in tools]
+            )
+
+        keys = [EmbeddingStore.key(tool) for tool in tools]
+        vectors, missing = self.embedding_store.get_many(keys)
+        if missing:
+            encoded = await self.executor.encode(
+                [tool_description(tools[i]) for i in missing]
+            )
+            await self.executor.run(
+                self.embedding_store.put_many, [keys[i] for i in missing], encoded
+            )
+            if vectors is None:
+                vectors = np.zeros((len(tools), encoded.shape[1]), dtype="float32")
+            vectors[missing] = encoded
+        return vectors
+
     async def _build_semantic_index(self, tools: List[Tool]):
         """Build FAISS index for semantic tool search"""
         if not tools:
             return
-            
-        # Generate embeddings for each tool
-        tool_descriptions = []
-        for i, tool in enumerate(tools):
-            description = f"{tool.server_name} {tool.name} {tool.description}"
-            tool_descriptions.append(description)
-            self.index_to_tool[i] = tool
-            
+
         # Create embeddings
-        embeddings = self.embedding_model.encode(tool_descriptions)
-        
-        # Build FAISS index
-        dimension = embeddings.shape[1]
-        self.semantic_index = faiss.IndexFlatL2(dimension)
-        self.semantic_index.add(embeddings.astype('float32'))
-        
-        # Store embeddings for later use
-        for i, (tool, embedding) in enumerate(zip(tools, embeddings)):
-            self.tool_embeddings[tool.id] = embedding
-            
-    async def discover_tools(self, 
-                           intent: str, 
-                           context: Dict[str, Any],
-                           top_k: int = 5) -> List[ToolScore]:
+        embeddings = await self._encode_tools(tools)
+
+        # Build the new index completely before swapping it in
+        index = ToolIndex(
+            embeddings.shape[1], self.index_config, expected_size=len(tools)
+        )
+        await self.executor.run(index.upsert, tools, embeddings)
+        self.semantic_index = index
+        await self.discovery_cache.invalidate()
+
+    async def add_tools(self, tools: List[Tool]):
+        """Add tools from a newly registered MCP server"""
+        await self.update_tools(tools)
+
+    async def update_tools(self, tools: List[Tool]):
+        """Add or update tools by ``tool.id``
+
+        Only tools that are new or whose embedded description changed are
+        re-encoded; metadata-only changes reuse the stored vector.
+        """
+        if not tools:
+            return
+        self._check_index_owner()
+        await self.executor.run(self.lexical_index.upsert, tools)
+
+        async with self._index_lock:
+            if self.semantic_index is None:
+                await self._build_semantic_index(tools)
+                await self._publish_shared_index()
+                return
+
+            changed = []
+            unchanged = []
+            for tool in tools:
+                current = self.semantic_index.get_tool(tool.id)
+                if current is None or tool_description(current) != tool_description(
+                    tool
+                ):
+                    changed.append(tool)
+                else:
+                    unchanged.append(tool)
+
+            # Encode before touching the index so searches never see a
+            # partially applied update
+            if changed:
+                embeddings = await self._encode_tools(changed)
+                await self.executor.run(self.semantic_index.upsert, changed, embeddings)
+            if unchanged:
+                vectors = self.semantic_index.get_vectors([t.id for t in unchanged])
+                await self.executor.run(self.semantic_index.upsert, unchanged, vectors)
+            await self._maybe_rebuild_index()
+            await self.discovery_cache.invalidate()
+            await self._publish_shared_index()
+
+    async def remove_tools(self, tool_ids: List[str]) -> List[str]:
+        """Remove tools, e.g. when their MCP server disconnects"""
+        self._check_index_owner()
+        await self.executor.run(self.lexical_index.remove, tool_ids)
+        async with self._index_lock:
+            if self.semantic_index is None:
+                return []
+            removed = await self.executor.run(self.semantic_index.remove, tool_ids)
+            await self._maybe_rebuild_index()
+            if removed:
+                await self.discovery_cache.invalidate()
+                await self._publish_shared_index()
+            return removed
+
+    def _check_index_owner(self):
+        if self._is_shared_worker:
+            raise RuntimeError(
+                "This orchestrator attaches to a shared tool index; "
+                "update tools through the builder process"
+            )
+
+    async def _maybe_rebuild_index(self):
+        """Switch backend as the catalog grows or shrinks and purge tombstones"""
+        if self.semantic_index.needs_rebuild():
+            logger.info(
+                f"Rebuilding tool index ({len(self.semantic_index)} tools, "
+                f"backend {self.semantic_index.backend})"
+            )
+            await self.executor.run(self.semantic_index.rebuild)
+
+    async def discover_tools(
+        self, intent: str, context: Dict[str, Any], top_k: int = 5
+    ) -> List[ToolScore]:
         """Discover relevant tools using semantic search and context"""
-        
-        # Check cache first
-        cache_key = self._generate_cache_key(intent, context)
-        cached_result = await self.cache.get(cache_key)
-        if cached_result:
-            return cached_result
-            
-        # Semantic similarity search
-        query_embedding = self.embedding_model.encode([intent])
-        distances, indices = self.semantic_index.search(
-            query_embedding.astype('float32'), 
-            top_k * 4  # Get more candidates for filtering
+        # Concurrent callers are coalesced into one batch when enabled
+        if self.batcher is not None:
+            return await self.batcher.submit(intent, context, top_k)
+
+        results = await self.discover_tools_batch([(intent, context)], top_k)
+        return results[0]
+
+    async def discover_tools_batch(
+        self, requests: List[Tuple[str, Dict[str, Any]]], top_k: int = 5
+    ) -> List[List[ToolScore]]:
+        """Discover tools for several ``(intent, context)`` requests at once
+
+        Identical requests are computed once, all cache misses are encoded in
+        a single ``encode`` call and searched with one multi-row index query.
+        """
+        tracing = self.instrumentation.enabled
+        with self.instrumentation.span(
+            "discovery", {"requests": len(requests)} if tracing else None
+        ):
+            return await self._discover_batch(requests, top_k)
+
+    async def _discover_batch(
+        self, requests: List[Tuple[str, Dict[str, Any]]], top_k: int
+    ) -> List[List[ToolScore]]:
+        if (
+            self._is_shared_worker
+            and time.monotonic() - self._shared_index_checked
+            >= self.shared_index_poll_interval
+        ):
+            await self.refresh_shared_index()
+
+        cache_keys = [
+            self._generate_cache_key(intent, context, top_k)
+            for intent, context in requests
+        ]
+        unique = {}
+        for cache_key, request in zip(cache_keys, requests):
+            unique.setdefault(cache_key, request)
+
+        # Check cache first (exact: in-process LRU, then shared tier)
+        resolved = {}
+        pending = []
+        remaining = []
+        # Attribute dicts are only built while someone is listening
+        tracing = self.instrumentation.enabled
+        with self.instrumentation.span(
+            "discovery.cache_lookup", {"keys": len(unique)} if tracing else None
+        ) as span:
+            for cache_key in unique:
+                cached_result = await self.discovery_cache.get(cache_key)
+                if cached_result:
+                    resolved[cache_key] = cached_result
+                else:
+                    pending.append(cache_key)
+            span.set_attribute("hits", len(resolved))
+
+        if pending and self.retrieval_config.fast_path:
+            # Intents that name a tool skip the encoder
+            pending = await self._discover_named(unique, pending, resolved, top_k)
+
+        if pending and not self.semantic_ready:
+            # Still warming up: lexical results, not cached
+            await self._discover_lexical(unique, pending, resolved, top_k)
+            pending = []
+
+        fusion = self.retrieval_config.fusion
+        search_k = max(top_k, self.retrieval_config.candidates) if fusion else top_k
+        lexical_hits = {}
+        if pending and self.semantic_index is not None:
+            # Each intent is encoded exactly once
+            with self.instrumentation.span(
+                "discovery.encode", {"texts": len(pending)} if tracing else None
+            ):
+                encoding = self.executor.encode(
+                    [unique[cache_key][0] for cache_key in pending]
+                )
+                if fusion:
+                    # BM25 needs only the text, so it runs while the intents encode
+                    query_embeddings, lexical_results = await asyncio.gather(
+                        encoding, self._lexical_search(unique, pending, search_k)
+                    )
+                    lexical_hits = dict(zip(pending, lexical_results))
+                else:
+                    query_embeddings = await encoding
+                query_embeddings = normalize(query_embeddings)
+
+            # Near-duplicate intents with the same context reuse a result
+            context_keys = {}
+            with self.instrumentation.span(
+                "discovery.similar_lookup", {"keys": len(pending)} if tracing else None
+            ):
+                for cache_key, query_embedding in zip(pending, query_embeddings):
+                    context_keys[cache_key] = self._generate_context_key(
+                        unique[cache_key][1], top_k
+                    )
+                    similar = self.discovery_cache.get_similar(
+                        context_keys[cache_key], query_embedding
+                    )
+                    if similar:
+                        resolved[cache_key] = similar
+                    else:
+                        self.discovery_cache.record_miss()
+                        remaining.append((cache_key, query_embedding))
+
+        # Requests sharing a context filter share one filtered search
+        by_filter = defaultdict(list)
+        for cache_key, query_embedding in remaining:
+            by_filter[self._tool_filter(unique[cache_key][1])].append(
+                (cache_key, query_embedding)
+            )
+
+        for tool_filter, group in by_filter.items():
+            # Semantic similarity search, restricted to tools matching the
+            # context so every returned candidate is valid
+            attributes = None
+            if tracing:
+                attributes = {
+                    "queries": len(group),
+                    "filtered": not tool_filter.is_empty,
+                }
+            with self.instrumentation.span("discovery.search", attributes):
+                search_results = await self.executor.run(
+                    self.semantic_index.search,
+                    np.stack([query_embedding for _, query_embedding in group]),
+                    search_k,
+                    tool_filter,
+                )
+
+            for (cache_key, query_embedding), results in zip(group, search_results):
+                intent, context = unique[cache_key]
+
+                if fusion:
+                    candidates, tool_scores = self._fuse(
+                        results, lexical_hits[cache_key], search_k
+                    )
+                else:
+                    tool_scores = None
+                    candidates = []
+                    for tool, distance in results:
+                        # Calculate semantic similarity score (inverse of distance)
+                        similarity = 1.0 / (1.0 + distance)
+                        candidates.append((tool, similarity))
+
+                # Score and rank tools
+                with self.instrumentation.span(
+                    "discovery.scoring",
+                    {"candidates": len(candidates)} if tracing else None,
+                ):
+                    scored_tools = await self._score_tools(
+                        candidates,
+                        intent,
+                        context,
+                        query_embedding=query_embedding,
+                        tool_scores=tool_scores,
+                    )
+
+                # Cache the result
+                with self.instrumentation.span("discovery.cache_set"):
+                    await self.discovery_cache.set(
+                        cache_key,
+                        scored_tools[:top_k],
+                        context_keys[cache_key],
+                        query_embedding,
+                    )
+                resolved[cache_key] = scored_tools[:top_k]
+
+        return [resolved.get(cache_key, []) for cache_key in cache_keys]
+
+    def _fuse(
+        self,
+        vector_hits: List[Tuple[Tool, float]],
+        lexical_hits: List[Tuple[Tool, float]],
+        limit: int,
+    ) -> Tuple[List[Tuple[Tool, float]], np.ndarray]:
+        """Reciprocal-rank fusion of vector and lexical candidates
+
+        Tool scores are the fused scores scaled so that ranking first in
+        every non-empty list gives 1.0.
+        """
+        tools = {tool.id: tool for tool, _ in vector_hits}
+        tools.update((tool.id, tool) for tool, _ in lexical_hits)
+        rankings = [
+            [tool.id for tool, _ in hits]
+            for hits in (vector_hits, lexical_hits)
+            if hits
+        ]
+        k = self.retrieval_config.rrf_k
+        ceiling = len(rankings) / (k + 1)
+
+        candidates = [
+            (tools[tool_id], score / ceiling)
+            for tool_id, score in reciprocal_rank_fusion(rankings, k)[:limit]
+        ]
+        return candidates, np.array([score for _, score in candidates])
+
+    async def _lexical_search(
+        self, unique: Dict[str, Tuple[str, Dict[str, Any]]], keys: List[str], k: int
+    ) -> List[List[Tuple[Tool, float]]]:
+        """BM25 candidates for each key's intent, filtered by its context"""
+        tracing = self.instrumentation.enabled
+        with self.instrumentation.span(
+            "discovery.lexical_search", {"queries": len(keys)} if tracing else None
+        ):
+            return await self.executor.run(
+                self.lexical_index.search_many,
+                [
+                    (unique[cache_key][0], self._tool_filter(unique[cache_key][1]))
+                    for cache_key in keys
+                ],
+                k,
+            )
+
+    async def _score_lexical(
+        self,
+        named: List[Tool],
+        hits: List[Tuple[Tool, float]],
+        intent: str,
+        context: Dict[str, Any],
+        top_k: int,
+    ) -> List[ToolScore]:
+        """Rank lexical results: named tools first, BM25 hits at relative score"""
+        named_ids = {tool.id for tool in named}
+        best = hits[0][1] if hits else 1.0
+        weight = 0.5 if named else 1.0
+        candidates = [(tool, 1.0) for tool in named] + [
+            (tool, weight * score / best)
+            for tool, score in hits
+            if tool.id not in named_ids
+        ]
+        candidates = candidates[: max(top_k, len(named))]
+        if not candidates:
+            return []
+        scored_tools = await self._score_tools(
+            candidates,
+            intent,
+            context,
+            tool_scores=np.array([score for _, score in candidates]),
         )
-        
-        candidates = []
-        for idx, distance in zip(indices[0], distances[0]):
-            if idx in self.index_to_tool:
-                tool = self.index_to_tool[idx]
-                # Calculate semantic similarity score (inverse of distance)
-                similarity = 1.0 / (1.0 + distance)
-                candidates.append((tool, similarity))
-                
-        # Filter by context and capabilities
-        filtered = await self._filter_by_context(candidates, context)
-        
-        # Score and rank tools
-        scored_tools = await self._score_tools(filtered, intent, context)
-        
-        # Cache the result
-        await self.cache.set(cache_key, scored_tools[:top_k], ttl=300)
-        
         return scored_tools[:top_k]
-        
-    async def _filter_by_context(self, 
-                                candidates: List[Tuple[Tool, float]], 
-                                context: Dict[str, Any]) -> List[Tuple[Tool, float]]:
-        """Filter tools based on context requirements"""
-        filtered = []
-        
-        for tool, score in candidates:
-            # Check if tool matches context requirements
-            if await self._matches_context(tool, context):
-                filtered.append((tool, score))
-                
-        return filtered
-        
-    async def _matches_context(self, tool: Tool, context: Dict[str, Any]) -> bool:
-        """Check if tool matches the given context"""
-        # Check required capabilities
-        if 'required_capabilities' in context:
-            tool_caps = set(tool.capabilities)
-            required_caps = set(context['required_capabilities'])
-            if not required_caps.issubset(tool_caps):
-                return False
-                
-        # Check authentication requirements
-        if 'auth_required' in context and context['auth_required']:
-            if not tool.requires_auth:
-                return False
-                
-        # Check server availability
-        server_id = tool.server_id
-        if server_id in self.circuit_breakers:
-            if not self.circuit_breakers[server_id].is_available():
-                return False
-                
-        return True
-        
-    async def _score_tools(self, 
-                          candidates: List[Tuple[Tool, float]], 
-                          intent: str, 
-                          context: Dict[str, Any]) -> List[ToolScore]:
-        """Score tools based on multiple factors"""
+
+    async def _discover_named(
+        self,
+        unique: Dict[str, Tuple[str, Dict[str, Any]]],
+        pending: List[str],
+        resolved: Dict[str, List[ToolScore]],
+        top_k: int,
+    ) -> List[str]:
+        """Fast path for intents that name tools, e.g. "github create_issue"
+
+        Such intents are answered from the lexical index without encoding
+        and cached like any other result. Returns the keys still pending.
+        """
+        rest = []
+        tracing = self.instrumentation.enabled
+        with self.instrumentation.span(
+            "discovery.fast_path", {"queries": len(pending)} if tracing else None
+        ) as span:
+            for cache_key in pending:
+                intent, context = unique[cache_key]
+                tool_filter = self._tool_filter(context)
+                # A few dict probes per intent, cheap enough to run on the loop
+                named = self.lexical_index.match_names(intent, tool_filter)
+                if not named:
+                    rest.append(cache_key)
+                    continue
+                hits = await self.executor.run(
+                    self.lexical_index.search, intent, top_k, tool_filter
+                )
+                scored_tools = await self._score_lexical(
+                    named, hits, intent, context, top_k
+                )
+                await self.discovery_cache.set(
+                    cache_key, scored_tools, self._generate_context_key(context, top_k)
+                )
+                resolved[cache_key] = scored_tools
+            span.set_attribute("hits", len(pending) - len(rest))
+        return rest
+
+    async def _discover_lexical(
+        self,
+        unique: Dict[str, Tuple[str, Dict[str, Any]]],
+        pending: List[str],
+        resolved: Dict[str, List[ToolScore]],
+        top_k: int,
+    ):
+        """Answer pending requests from the lexical index alone"""
+        tracing = self.instrumentation.enabled
+        with self.instrumentation.span(
+            "discovery.lexical", {"queries": len(pending)} if tracing else None
+        ):
+            for cache_key in pending:
+                intent, context = unique[cache_key]
+                tool_filter = self._tool_filter(context)
+                named = self.lexical_index.match_names(intent, tool_filter)
+                hits = await self.executor.run(
+                    self.lexical_index.search, intent, top_k, tool_filter
+                )
+                scored_tools = await self._score_lexical(
+                    named, hits, intent, context, top_k
+                )
+                if scored_tools:
+                    resolved[cache_key] = scored_tools
+
+    def _tool_filter(self, context: Dict[str, Any]) -> ToolFilter:
+        """Constraints a tool must meet for the given context
+
+        Required capabilities, the auth requirement and servers whose
+        circuit breaker currently rejects calls; evaluated as a bitmask by
+        the index rather than per candidate.
+        """
+        return ToolFilter(
+            capabilities=frozenset(context.get("required_capabilities", ())),
+            requires_auth=bool(context.get("auth_required")),
+            excluded_servers=frozenset(
+                server_id
+                for server_id, breaker in self.circuit_breakers.breakers.items()
+                if not breaker.is_available()
+            ),
+        )
+
+    async def _score_tools(
+        self,
+        candidates: List[Tuple[Tool, float]],
+        intent: str,
+        context: Dict[str, Any],
+        query_embedding: Optional[np.ndarray] = None,
+        tool_scores: Optional[np.ndarray] = None,
+    ) -> List[ToolScore]:
+        """Score tools based on multiple factors
+
+        ``tool_scores`` overrides the embedding-based tool relevance.
+        """
         scored = []
-        
-        for tool, semantic_score in candidates:
+        if not candidates:
+            return scored
+
+        if tool_scores is None:
+            if query_embedding is None:
+                query_embedding = (await self.executor.encode([intent]))[0]
+
+            # Tool-level scores for every candidate in one vectorized pass
+            tool_scores = self._calculate_tool_scores(
+                [tool for tool, _ in candidates], query_embedding
+            )
+
+        for (tool, semantic_score), tool_score in zip(candidates, tool_scores):
             # Calculate server-level score
             server_score = await self._calculate_server_score(tool)
-            
-            # Calculate tool-level score
-            tool_score = await self._calculate_tool_score(tool, intent)
-            
+            tool_score = float(tool_score)
+
             # Combine scores using the research-backed formula
             combined_score = (server_score * tool_score) * max(server_score, tool_score)
-            
+
             # Add context relevance
             context_score = await self._calculate_context_relevance(tool, context)
-            
-            scored.append(ToolScore(
-                tool=tool,
-                server_score=server_score,
-                tool_score=tool_score,
-                combined_score=combined_score,
-                context_relevance=context_score
-            ))
-            
+
+            scored.append(
+                ToolScore(
+                    tool=tool,
+                    server_score=server_score,
+                    tool_score=tool_score,
+                    combined_score=combined_score,
+                    context_relevance=context_score,
+                )
+            )
+
         # Sort by combined score
-        scored.sort(key=lambda x: x.combined_score * (1 + x.context_relevance), 
-                   reverse=True)
-        
+        scored.sort(
+            key=lambda x: x.combined_score * (1 + x.context_relevance), reverse=True
+        )
+
         return scored
-        
+
     async def _calculate_server_score(self, tool: Tool) -> float:
         """Calculate server reliability and performance score"""
         server_id = tool.server_id
-        
-        # Check historical performance
-        if server_id in self.execution_history:
-            history = self.execution_history[server_id]
-            if history:
-                # Calculate success rate and average latency
-                successes = sum(1 for h in history if h['success'])
-                success_rate = successes / len(history)
-                
-                avg_latency = sum(h['latency'] for h in history) / len(history)
-                latency_score = 1.0 / (1.0 + avg_latency / 1000)  # Normalize to 0-1
-                
-                return 0.7 * success_rate + 0.3 * latency_score
-                
+
+        # Check recent performance
+        stats = self.execution_stats.server(server_id)
+        if stats is not None and stats.count:
+            latency_score = 1.0 / (1.0 + stats.mean_latency / 1000)  # Normalize to 0-1
+            return 0.7 * stats.success_rate + 0.3 * latency_score
+
         return 0.8  # Default score for new servers
-        
-    async def _calculate_tool_score(self, tool: Tool, intent: str) -> float:
-        """Calculate tool-specific relevance score"""
-        # Use semantic similarity between tool description and intent
-        tool_desc = f"{tool.name} {tool.description}"
-        
-        tool_embedding = self.embedding_model.encode([tool_desc])
-        intent_embedding = self.embedding_model.encode([intent])
-        
-        # Cosine similarity
-        similarity = np.dot(tool_embedding[0], intent_embedding[0]) / (
-            np.linalg.norm(tool_embedding[0]) * np.linalg.norm(intent_embedding[0])
-        )
-        
-        return float(similarity)
-        
-    async def _calculate_context_relevance(self, 
-                                         tool: Tool, 
-                                         context: Dict[str, Any]) -> float:
+
+    def _calculate_tool_scores(
+        self, tools: List[Tool], query_embedding: np.ndarray
+    ) -> np.ndarray:
+        """Calculate tool-specific relevance scores for a batch of tools
+
+        Cosine similarity between the intent and each tool's stored vector.
+        Tool vectors are normalized once at index time, so this is a single
+        gather plus matrix-vector product.
+        """
+        query = normalize(np.asarray(query_embedding).reshape(1, -1))[0]
+        matrix = self.semantic_index.get_vectors([tool.id for tool in tools])
+        return matrix @ query
+
+    async def _calculate_context_relevance(
+        self, tool: Tool, context: Dict[str, Any]
+    ) -> float:
         """Calculate how well the tool fits the current context"""
         relevance = 0.0
-        
+
         # Check if tool was recently used successfully in similar context
-        if 'session_id' in context:
-            session_history = self.execution_history.get(
-                f"session_{context['session_id']}", []
+        if "session_id" in context:
+            relevance += 0.2 * self.execution_stats.session_successes(
+                context["session_id"], tool.id
             )
-            for entry in session_history:
-                if entry['tool_id'] == tool.id and entry['success']:
-                    relevance += 0.2
-                    
+
         # Check if tool is part of a known workflow
-        if 'workflow_type' in context:
+        if "workflow_type" in context:
             if tool.id in self.capability_graph.get_workflow_tools(
-                context['workflow_type']
+                context["workflow_type"]
             ):
                 relevance += 0.3
-                
+
         return min(relevance, 1.0)
-        
-    def _generate_cache_key(self, intent: str, context: Dict[str, Any]) -> str:
-        """Generate cache key for tool discovery results"""
+
+    def record_execution(
+        self,
+        tool: Tool,
+        success: bool,
+        latency: float,
+        session_id: Optional[str] = None,
+    ):
+        """Record the outcome of a tool call (latency in milliseconds)"""
+        self.execution_stats.record(
+            tool.server_id, tool.id, success, latency, session_id=session_id
+        )
+
+    def _resolve_tool(self, tool_id: str) -> Optional[Tool]:
+        """Look up a currently indexed tool by id"""
+        if self.semantic_index is None:
+            return None
+        return self.semantic_index.get_tool(tool_id)
+
+    def _generate_cache_key(
+        self, intent: str, context: Dict[str, Any], top_k: int = 5
+    ) -> str:
+        """Generate cache key for tool discovery results
+
+        Results are truncated to ``top_k``, so it is part of the key.
+        """
         context_str = json.dumps(context, sort_keys=True)
-        combined = f"{intent}:{context_str}"
+        combined = f"{intent}:{context_str}:{top_k}"
         return hashlib.md5(combined.encode()).hexdigest()
-        
-    async def create_execution_plan(self, 
-                                  tool_calls: List[Dict[str, Any]]) -> ExecutionPlan:
-        """Create optimized execution plan for multiple tool calls"""
-        plan = ExecutionPlan()
-        
-        # Analyze dependencies
-        dep_graph = await self._analyze_dependencies(tool_calls)
-        
-        # Find independent groups that can run in parallel
-        parallel_groups = self._find_parallel_groups(dep_graph)
-        
+
+    def _generate_context_key(self, context: Dict[str, Any], top_k: int = 5) -> str:
+        """Generate key grouping semantic cache entries with equal context and k"""
+        context_str = json.dumps(context, sort_keys=True)
+        combined = f"{context_str}:{top_k}"
+        return hashlib.md5(combined.encode()).hexdigest()
+
+    async def create_execution_plan(
+        self, tool_calls: List[Dict[str, Any]], latency_slo: Optional[float] = None
+    ) -> ExecutionPlan:
+        """Create optimized execution plan for multiple tool calls
+
+        Groups too large to run in parallel are either serialized or split
+        into parallel chunks; each variant is estimated and the one with the
+        lowest p95 is returned. With ``latency_slo`` (milliseconds, compared
+        against p95) the most conservative plan that meets it is returned
+        instead, i.e. the one with the most stages and so the fewest calls in
+        flight at once; if none does, the fastest plan is returned with
+        ``meets_slo`` False.
+        """
+        tracing = self.instrumentation.enabled
+        with self.instrumentation.span(
+            "plan.analyze", {"calls": len(tool_calls)} if tracing else None
+        ):
+            # Analyze dependencies
+            dep_graph = await self._analyze_dependencies(tool_calls)
+            calls = {call.get("id", str(i)): call for i, call in enumerate(tool_calls)}
+            tools = {
+                call_id: self._resolve_call_tool(call)
+                for call_id, call in calls.items()
+            }
+
+            # Find independent groups that can run in parallel
+            parallel_groups = self._find_parallel_groups(dep_graph)
+
         # Check resource constraints
-        for group in parallel_groups:
-            if await self._can_run_parallel(group):
-                plan.add_parallel_stage(group)
+        fits = [await self._can_run_parallel(group, tools) for group in parallel_groups]
+        strategies = (
+            ["default"] if all(fits) else ["default", "chunked", "latency_packed"]
+        )
+
+        candidates = []
+        for strategy in strategies:
+            plan = ExecutionPlan(
+                dependencies=dep_graph, calls=calls, tools=tools, strategy=strategy
+            )
+            for group, fit in zip(parallel_groups, fits):
+                if fit:
+                    plan.add_parallel_stage(group)
+                elif strategy == "default":
+                    plan.add_sequential_stages(group)
+                else:
+                    for chunk in self._split_group(
+                        group, tools, by_latency=strategy == "latency_packed"
+                    ):
+                        plan.add_parallel_stage(chunk)
+
+            # Estimate execution time
+            with self.instrumentation.span(
+                "plan.estimate", {"strategy": strategy} if tracing else None
+            ):
+                plan.duration = await self._estimate_duration(plan)
+            candidates.append(plan)
+
+        best = min(candidates, key=lambda p: p.duration.p95)
+        if latency_slo is not None:
+            # Spare the servers whenever the SLO leaves room to
+            eligible = [p for p in candidates if p.duration.p95 <= latency_slo]
+            if eligible:
+                best = min(eligible, key=lambda p: (-len(p.stages), p.duration.p95))
+            best.latency_slo = latency_slo
+            best.meets_slo = bool(eligible)
+            if not best.meets_slo:
+                logger.warning(
+                    f"No plan meets the {latency_slo:.0f}ms SLO, "
+                    f"fastest p95 is {best.duration.p95:.0f}ms"
+                )
+
+        return best
+
+    async def execute_plan(
+        self,
+        plan: ExecutionPlan,
+        invoke: InvokeFn,
+        session_id: Optional[str] = None,
+        fallback: Optional[InvokeFn] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[CallResult]:
+        """Execute a plan, yielding call results as they complete
+
+        ``invoke(tool, inputs)`` performs the actual MCP call. Calls start as
+        soon as their dependencies finish rather than stage by stage, wait
+        for a slot in the server's bulkhead and go through its circuit
+        breaker; results of cacheable tools are served from the result
+        cache. No call runs past ``deadline`` (``time.monotonic()``).
+        Completed calls feed the execution statistics used for scoring and
+        planning.
+        """
+        executor = PlanExecutor(
+            invoke,
+            self.circuit_breakers,
+            fallback=fallback,
+            hedger=self.hedger,
+            result_cache=self.result_cache,
+        )
+        async for result in executor.execute(plan, deadline):
+            # A hedge's latency includes the wait before it was sent
+            hedge_won = result.hedged and result.tool is not plan.tools.get(
+                result.call_id
+            )
+            if (
+                result.tool is not None
+                and not hedge_won
+                and not result.cached
+                and not isinstance(
+                    result.error,
+                    (
+                        DependencyFailedError,
+                        CircuitOpenError,
+                        ServiceDegradedError,
+                        DeadlineExceededError,
+                    ),
+                )
+            ):
+                self.record_execution(
+                    result.tool, result.ok, result.latency, session_id
+                )
+            yield result
+
+    async def _select_hedge(
+        self, call: Dict[str, Any], tool: Tool
+    ) -> Optional[Tuple[Tool, float]]:
+        """Backup tool and hedge delay (seconds) for a call, if it may be hedged
+
+        Only idempotent calls with enough latency history are hedged. The
+        backup is the best-ranked equivalent tool on another available
+        server: from ``call['alternatives']`` (e.g. ``discover_tools``
+        results) if given, else "equivalent" relations in the capability
+        graph ranked by server score.
+        """
+        if not call.get("idempotent", getattr(tool, "idempotent", False)):
+            return None
+        stats = self.execution_stats.tool(tool.id)
+        if stats is None or stats.count < self.hedger.config.min_samples:
+            return None
+
+        if "alternatives" in call:
+            ranked = [getattr(alt, "tool", alt) for alt in call["alternatives"]]
+        else:
+            related = [
+                self._resolve_tool(tool_id)
+                for tool_id in self.capability_graph.get_related_tools(
+                    tool.id, "equivalent"
+                )
+            ]
+            scores = {
+                alt.id: await self._calculate_server_score(alt)
+                for alt in related
+                if alt is not None
+            }
+            ranked = sorted(
+                (alt for alt in related if alt is not None),
+                key=lambda alt: scores[alt.id],
+                reverse=True,
+            )
+
+        for alt in ranked:
+            if alt is None or alt.id == tool.id or alt.server_id == tool.server_id:
+                continue
+            breaker = self.circuit_breakers.breakers.get(alt.server_id)
+            if breaker is not None and not breaker.is_available():
+                continue
+            delay = stats.quantile(self.hedger.config.delay_quantile) / 1000.0
+            return alt, delay
+        return None
+
+    def _resolve_call_tool(self, call: Dict[str, Any]) -> Optional[Tool]:
+        """Tool invoked by a call: given directly or looked up by ``tool_id``"""
+        if call.get("tool") is not None:
+            return call["tool"]
+        if "tool_id" in call:
+            return self._resolve_tool(call["tool_id"])
+        return None
+
+    def _split_group(
+        self,
+        group: List[str],
+        tools: Dict[str, Optional[Tool]],
+        by_latency: bool = False,
+    ) -> List[List[str]]:
+        """Split an over-wide group into chunks that may run in parallel
+
+        Calls are placed first-fit into the earliest chunk that still has
+        room under the stage cap and the call's server budget. With
+        ``by_latency`` calls are ordered by p95 first, so slow calls share a
+        stage instead of each stretching a different one.
+        """
+        if by_latency:
+            group = sorted(
+                group,
+                key=lambda call_id: self._get_tool_p95(tools.get(call_id)),
+                reverse=True,
+            )
+
+        chunks: List[List[str]] = []
+        usage: List[Dict[Optional[str], int]] = []
+        for call_id in group:
+            server_id, budget = self._server_budget(tools.get(call_id))
+            for chunk, used in zip(chunks, usage):
+                if (
+                    len(chunk) < self.max_parallel_tools
+                    and used.get(server_id, 0) < budget
+                ):
+                    break
             else:
-                plan.add_sequential_stages(group)
-                
-        # Estimate execution time
-        plan.estimated_duration = await self._estimate_duration(plan)
-        
-        return plan
-        
-    async def _analyze_dependencies(self, 
-                                  tool_calls: List[Dict[str, Any]]) -> Dict[str, List[str]]:
-        """Analyze dependencies between tool calls"""
+                chunk, used = [], {}
+                chunks.append(chunk)
+                usage.append(used)
+            chunk.append(call_id)
+            used[server_id] = used.get(server_id, 0) + 1
+        return chunks
+
+    def _server_budget(self, tool: Optional[Tool]) -> Tuple[Optional[str], int]:
+        """Server a call is charged to and that server's concurrency budget"""
+        if tool is None:
+            return None, self.max_parallel_tools
+        return (
+            tool.server_id,
+            self.circuit_breakers.get_bulkhead(tool.server_id).capacity,
+        )
+
+    async def _analyze_dependencies(
+        self, tool_calls: List[Dict[str, Any]]
+    ) -> Dict[str, List[str]]:
+        """Analyze dependencies between tool calls
+
+        A ``$call_id.field`` input depends on that call, wherever it appears
+        in the list. Strings starting with ``$`` that name no call are
+        treated as literals.
+        """
+        call_ids = [call.get("id", str(i)) for i, call in enumerate(tool_calls)]
+        known = set(call_ids)
         dependencies = {}
-        
-        for i, call in enumerate(tool_calls):
-            call_id = call.get('id', str(i))
-            dependencies[call_id] = []
-            
-            # Check if this call depends on outputs from previous calls
-            if 'inputs' in call:
-                for input_key, input_value in call['inputs'].items():
-                    if isinstance(input_value, str) and input_value.startswith('$'):
+
+        for call_id, call in zip(call_ids, tool_calls):
+            deps = {}
+
+            # Check if this call depends on outputs from other calls
+            if "inputs" in call:
+                for input_key, input_value in call["inputs"].items():
+                    if isinstance(input_value, str) and input_value.startswith("$"):
                         # Reference to another tool's output
-                        dep_id = input_value[1:].split('.')[0]
-                        dependencies[call_id].append(dep_id)
-                        
+                        dep_id = input_value[1:].split(".")[0]
+                        if dep_id in known:
+                            deps[dep_id] = None
+            dependencies[call_id] = list(deps)
+
         return dependencies
-        
-    def _find_parallel_groups(self, 
-                            dependencies: Dict[str, List[str]]) -> List[List[str]]:
-        """Find groups of tools that can execute in parallel"""
-        # Topological sort to find execution order
-        visited = set()
+
+    def _find_parallel_groups(
+        self, dependencies: Dict[str, List[str]]
+    ) -> List[List[str]]:
+        """Find groups of tools that can execute in parallel
+
+        Kahn-style topological layering in O(calls + edges): each call is
+        placed in the stage right after its latest dependency, so the number
+        of stages equals the longest dependency chain (the minimum possible).
+        Calls keep their input order within a stage.
+        """
+        dependents = defaultdict(list)
+        remaining = {}
+        for call_id, deps in dependencies.items():
+            remaining[call_id] = len(deps)
+            for dep_id in deps:
+                dependents[dep_id].append(call_id)
+
+        order = {call_id: i for i, call_id in enumerate(dependencies)}
         groups = []
-        
-        def can_add_to_group(tool_id: str, group: List[str]) -> bool:
-            """Check if tool can be added to current parallel group"""
-            # Tool can be added if it doesn't depend on any tool in the group
-            # and no tool in the group depends on it
-            for other_id in group:
-                if other_id in dependencies.get(tool_id, []):
-                    return False
-                if tool_id in dependencies.get(other_id, []):
-                    return False
-            return True
-            
-        for tool_id in dependencies:
-            if tool_id not in visited:
-                # Try to add to existing group
-                added = False
-                for group in groups:
-                    if can_add_to_group(tool_id, group):
-                        group.append(tool_id)
-                        visited.add(tool_id)
-                        added = True
-                        break
-                        
-                # Create new group if needed
-                if not added:
-                    groups.append([tool_id])
-                    visited.add(tool_id)
-                    
+        layer = [call_id for call_id, count in remaining.items() if count == 0]
+        scheduled = 0
+        while layer:
+            groups.append(layer)
+            scheduled += len(layer)
+            next_layer = []
+            for call_id in layer:
+                for dependent in dependents[call_id]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        next_layer.append(dependent)
+            layer = sorted(next_layer, key=order.__getitem__)
+
+        if scheduled < len(dependencies):
+            raise DependencyCycleError(
+                [call_id for call_id, count in remaining.items() if count > 0]
+            )
+
         return groups
-        
-    async def _can_run_parallel(self, tools: List[str]) -> bool:
-        """Check if tools can run in parallel based on resource constraints"""
-        # Simple heuristic: limit parallel execution based on tool count
-        # In production, this would check actual resource usage
-        return len(tools) <= 5
-        
-    async def _estimate_duration(self, plan: ExecutionPlan) -> float:
-        """Estimate total execution duration for the plan"""
-        total_duration = 0.0
-        
+
+    async def _can_run_parallel(
+        self, call_ids: List[str], tools: Dict[str, Optional[Tool]]
+    ) -> bool:
+        """Check if calls can run in parallel based on resource constraints
+
+        Each server admits as many concurrent calls as its adaptive bulkhead
+        currently allows; ``max_parallel_tools`` caps the stage as a whole.
+        """
+        if len(call_ids) > self.max_parallel_tools:
+            return False
+        per_server = defaultdict(int)
+        for call_id in call_ids:
+            server_id, budget = self._server_budget(tools.get(call_id))
+            per_server[server_id] += 1
+            if per_server[server_id] > budget:
+                return False
+        return True
+
+    async def _estimate_duration(self, plan: ExecutionPlan) -> DurationEstimate:
+        """Estimate the execution duration distribution for the plan
+
+        Monte Carlo over per-tool latency histograms: a parallel stage takes
+        the max of its calls' samples, stages add up. Tools are assumed
+        independent. Tools without history use the default latency.
+        """
+        rng = np.random.default_rng(0)
+        samples = self.duration_samples
+        total = np.zeros(samples)
+        stages = []
+
         for stage in plan.stages:
-            # For parallel execution, duration is the max of all tools
-            # For sequential, it's the sum
-            stage_duration = 0.0
-            
-            if len(stage) == 1:
-                # Sequential
-                tool = stage[0]
-                stage_duration = await self._get_tool_avg_duration(tool.id)
-            else:
-                # Parallel - take the maximum
-                durations = []
-                for tool in stage:
-                    durations.append(await self._get_tool_avg_duration(tool.id))
-                stage_duration = max(durations) if durations else 0.0
-                
-            total_duration += stage_duration
-            
-        return total_duration
-        
+            if not stage:
+                continue
+            call_samples = np.stack(
+                [
+                    self._sample_tool_latency(plan.tools.get(call_id), rng, samples)
+                    for call_id in stage
+                ]
+            )
+            stage_time = call_samples.max(axis=0)
+
+            # Critical-path attribution: which call bounds the stage
+            slowest = np.bincount(call_samples.argmax(axis=0), minlength=len(stage))
+            critical = int(slowest.argmax())
+            stages.append(
+                StageEstimate(
+                    p50=float(np.percentile(stage_time, 50)),
+                    p95=float(np.percentile(stage_time, 95)),
+                    critical_call=stage[critical],
+                    critical_share=float(slowest[critical] / samples),
+                )
+            )
+            total += stage_time
+
+        return DurationEstimate(
+            p50=float(np.percentile(total, 50)),
+            p95=float(np.percentile(total, 95)),
+            mean=float(total.mean()),
+            stages=stages,
+        )
+
+    def _sample_tool_latency(
+        self, tool: Optional[Tool], rng: np.random.Generator, size: int
+    ) -> np.ndarray:
+        """Latency samples for a tool from its rolling histogram"""
+        stats = self.execution_stats.tool(tool.id) if tool is not None else None
+        if stats is None or not stats.count:
+            return np.full(size, self.default_tool_latency)
+        return stats.sample(rng, size)
+
+    def _get_tool_p95(self, tool: Optional[Tool]) -> float:
+        stats = self.execution_stats.tool(tool.id) if tool is not None else None
+        if stats is None or not stats.count:
+            return self.default_tool_latency
+        return stats.quantile(0.95)
+
     async def _get_tool_avg_duration(self, tool_id: str) -> float:
         """Get average execution duration for a tool"""
-        history = self.execution_history.get(tool_id, [])
-        if history:
-            return sum(h['latency'] for h in history) / len(history)
-        return 100.0  # Default 100ms
+        stats = self.execution_stats.tool(tool_id)
+        if stats is not None and stats.count:
+            return stats.mean_latency
+        return self.default_tool_latency
 
 
 class CapabilityGraph:
     """Graph-based representation of tool capabilities and relationships"""
-    
+
     def __init__(self):
         self.graph = defaultdict(set)
         self.workflows = defaultdict(list)
-        
+
     def add_capability_relation(self, tool1_id: str, tool2_id: str, relation_type: str):
         """Add a relationship between two tools"""
         self.graph[tool1_id].add((tool2_id, relation_type))
-        
-    def get_related_tools(self, tool_id: str, relation_type: Optional[str] = None) -> List[str]:
+
+    def get_related_tools(
+        self, tool_id: str, relation_type: Optional[str] = None
+    ) -> List[str]:
         """Get tools related to the given tool"""
         related = []
         for other_id, rel_type in self.graph.get(tool_id, []):
             if relation_type is None or rel_type == relation_type:
                 related.append(other_id)
         return related
-        
+
+    def add_equivalent_tools(self, tool_ids: List[str]):
+        """Mark tools as interchangeable (e.g. the same tool on several servers)"""
+        for tool_id in tool_ids:
+            for other_id in tool_ids:
+                if other_id != tool_id:
+                    self.add_capability_relation(tool_id, other_id, "equivalent")
+
     def add_workflow(self, workflow_type: str, tool_ids: List[str]):
         """Define a workflow as a sequence of tools"""
         self.workflows[workflow_type] = tool_ids
-        
+
     def get_workflow_tools(self, workflow_type: str) -> List[str]:
         """Get tools that are part of a workflow"""
-        return self.workflows.get(workflow_type, [])
\ No newline at end of file
+        return self.workflows.get(workflow_type, [])
@@ -0,0 +1,272 @@
+"""
+Plan Executor
+Runs an execution plan as a dependency graph, starting each tool call as soon
+as the calls it references have finished and streaming results as they arrive
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from ..mcp.tool_registry import Tool
+from .circuit_breaker import CircuitBreakerRegistry, current_deadline
+from .hedging import Hedger
+from .instrumentation import Instrumentation, Span
+from .result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+InvokeFn = Callable[[Tool, Dict[str, Any]], Awaitable[Any]]
+
+
+class DependencyFailedError(Exception):
+    """Raised for a call whose input came from a call that failed"""
+
+    def __init__(self, call_id: str, dependency_id: str):
+        self.call_id = call_id
+        self.dependency_id = dependency_id
+        super().__init__(f"Call {call_id} skipped: dependency {dependency_id} failed")
+
+
+@dataclass
+class CallResult:
+    """Outcome of one tool call in a plan"""
+
+    call_id: str
+    tool: Optional[Tool]
+    result: Any = None
+    error: Optional[Exception] = None
+    latency: float = 0.0  # milliseconds, 0 for calls that never started
+    hedged: bool = False  # a backup request was sent; ``tool`` is the one that answered
+    cached: bool = False  # answered by the result cache or another caller's request
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def resolve_reference(value: Any, results: Dict[str, Any]) -> Any:
+    """Replace a ``$call_id.field`` reference with the referenced output
+
+    Fields may be nested (``$call.a.b``) and walk dict keys, then attributes.
+    ``$call_id`` alone yields the whole result. Strings that name no finished
+    call are returned unchanged.
+    """
+    if not isinstance(value, str) or not value.startswith("$"):
+        return value
+    call_id, *path = value[1:].split(".")
+    if call_id not in results:
+        return value
+
+    resolved = results[call_id]
+    for part in path:
+        if isinstance(resolved, dict):
+            resolved = resolved[part]
+        else:
+            resolved = getattr(resolved, part)
+    return resolved
+
+
+class PlanExecutor:
+    """
+    Dataflow executor for ``ExecutionPlan``
+
+    Stages are ignored at run time: a call starts the moment every call in
+    its ``dependencies`` entry has succeeded, so a fast branch never waits
+    for an unrelated slow one. Each call holds a slot in its server's
+    bulkhead and goes through its circuit breaker. With a ``hedger``, slow
+    idempotent calls may also be sent to an equivalent tool elsewhere. With
+    a ``result_cache``, cacheable calls are answered from it or coalesced
+    before reaching the breaker. When a call fails, everything downstream
+    of it is reported with ``DependencyFailedError`` without being started.
+    """
+
+    def __init__(
+        self,
+        invoke: InvokeFn,
+        breakers: CircuitBreakerRegistry,
+        fallback: Optional[InvokeFn] = None,
+        hedger: Optional[Hedger] = None,
+        result_cache: Optional[ResultCache] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
+        self.invoke = invoke
+        self.breakers = breakers
+        self.fallback = fallback
+        self.hedger = hedger
+        self.result_cache = result_cache
+        self.instrumentation = instrumentation or breakers.instrumentation
+
+    async def execute(
+        self, plan: Any, deadline: Optional[float] = None
+    ) -> AsyncIterator[CallResult]:
+        """Run the plan, yielding each call's result as it completes
+
+        ``deadline`` (``time.monotonic()``) bounds every call, including the
+        wait for a bulkhead slot; inside another breaker call it defaults to
+        that call's deadline.
+        """
+        if deadline is None:
+            deadline = current_deadline()
+        dependencies: Dict[str, List[str]] = plan.dependencies
+        dependents: Dict[str, List[str]] = {call_id: [] for call_id in dependencies}
+        waiting: Dict[str, int] = {}
+        for call_id, deps in dependencies.items():
+            waiting[call_id] = len(deps)
+            for dep_id in deps:
+                dependents[dep_id].append(call_id)
+
+        outputs: Dict[str, Any] = {}
+        completed: asyncio.Queue = asyncio.Queue()
+        tasks: Dict[str, asyncio.Task] = {}
+        # Ended explicitly: a span made current here would leak across yields
+        tracing = self.instrumentation.enabled
+        plan_span = self.instrumentation.span(
+            "plan.execute", {"calls": len(dependencies)} if tracing else None
+        )
+        failed = 0
+
+        def start(call_id: str):
+            tasks[call_id] = asyncio.create_task(
+                self._run_call(plan, call_id, outputs, completed, deadline, plan_span)
+            )
+
+        for call_id, count in waiting.items():
+            if count == 0:
+                start(call_id)
+
+        try:
+            remaining = len(dependencies)
+            while remaining:
+                result: CallResult = await completed.get()
+                remaining -= 1
+                tasks.pop(result.call_id, None)
+
+                skipped = []
+                if result.ok:
+                    outputs[result.call_id] = result.result
+                    for dependent in dependents[result.call_id]:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0:
+                            start(dependent)
+                else:
+                    # Skip the failed call's whole downstream subgraph
+                    skipped = self._downstream(result.call_id, dependents, waiting)
+                    remaining -= len(skipped)
+                    failed += 1 + len(skipped)
+
+                yield result
+                for call_id in skipped:
+                    yield CallResult(
+                        call_id,
+                        plan.tools.get(call_id),
+                        error=DependencyFailedError(call_id, result.call_id),
+                    )
+        finally:
+            # The consumer stopped early or the executor was cancelled
+            for task in tasks.values():
+                task.cancel()
+            plan_span.set_attribute("failed", failed)
+            plan_span.end()
+
+    @staticmethod
+    def _downstream(
+        call_id: str, dependents: Dict[str, List[str]], waiting: Dict[str, int]
+    ) -> List[str]:
+        """Not-yet-started calls that transitively depend on ``call_id``"""
+        skipped = []
+        stack = list(dependents[call_id])
+        while stack:
+            dependent = stack.pop()
+            if waiting.get(dependent, 0) <= 0:
+                continue
+            waiting[dependent] = -1  # never start
+            skipped.append(dependent)
+            stack.extend(dependents[dependent])
+        return skipped
+
+    async def _run_call(
+        self,
+        plan: Any,
+        call_id: str,
+        outputs: Dict[str, Any],
+        completed: asyncio.Queue,
+        deadline: Optional[float] = None,
+        plan_span: Optional[Span] = None,
+    ):
+        tool = plan.tools.get(call_id)
+        call = plan.calls.get(call_id, {})
+        start = time.perf_counter()
+        try:
+            if tool is None:
+                raise ValueError(f"Call {call_id} does not resolve to a known tool")
+            attributes = None
+            if self.instrumentation.enabled:
+                attributes = {
+                    "call_id": call_id,
+                    "tool": tool.id,
+                    "server": tool.server_id,
+                }
+            with self.instrumentation.span(
+                "plan.call", attributes, parent=plan_span
+            ) as span:
+                result = await self._attempt_call(
+                    call_id, tool, call, outputs, deadline
+                )
+                span.set_attribute("hedged", result.hedged)
+                span.set_attribute("cached", result.cached)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Call {call_id} failed: {e}")
+            result = CallResult(call_id, tool, error=e)
+        result.latency = (time.perf_counter() - start) * 1000.0
+        completed.put_nowait(result)
+
+    async def _attempt_call(
+        self,
+        call_id: str,
+        tool: Tool,
+        call: Dict[str, Any],
+        outputs: Dict[str, Any],
+        deadline: Optional[float],
+    ) -> CallResult:
+        """Resolve inputs and make the call, hedged and cached where enabled"""
+        inputs = {
+            key: resolve_reference(value, outputs)
+            for key, value in call.get("inputs", {}).items()
+        }
+
+        called = False
+
+        async def attempt(target: Tool) -> Any:
+            async def guarded(fallback: Optional[InvokeFn]) -> Any:
+                nonlocal called
+                called = True
+                breaker = self.breakers.get_breaker(target.server_id)
+                bulkhead = self.breakers.get_bulkhead(target.server_id)
+                async with bulkhead.slot(deadline) as permit:
+                    return await breaker.call(
+                        self.invoke,
+                        target,
+                        inputs,
+                        fallback=fallback,
+                        deadline=deadline,
+                        permit=permit,
+                    )
+
+            if self.result_cache is not None and self.result_cache.is_cacheable(target):
+                return await self.result_cache.get_or_call(
+                    target, inputs, guarded, fallback=self.fallback, deadline=deadline
+                )
+            return await guarded(self.fallback)
+
+        if self.hedger is not None:
+            value, answered_by, hedged = await self.hedger.run(call, tool, attempt)
+            result = CallResult(call_id, answered_by, result=value, hedged=hedged)
+        else:
+            result = CallResult(call_id, tool, result=await attempt(tool))
+        result.cached = not called
+        return result
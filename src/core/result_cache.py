@@ -0,0 +1,229 @@
+"""
+Tool Result Cache
+Caches outputs of cacheable (read-only) tool calls by tool and canonicalized
+inputs, coalescing concurrent identical calls into a single request
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..mcp.tool_registry import Tool
+from .circuit_breaker import CircuitOpenError, DeadlineExceededError, current_deadline
+
+logger = logging.getLogger(__name__)
+
+FallbackFn = Callable[[Tool, Dict[str, Any]], Awaitable[Any]]
+# Performs the real call; receives the breaker fallback to use
+CallFn = Callable[[FallbackFn], Awaitable[Any]]
+
+
+@dataclass
+class ResultCacheConfig:
+    """Configuration for tool result caching"""
+
+    max_bytes: int = 64 * 1024 * 1024
+    default_ttl: float = 60.0  # seconds
+    ttls: Dict[str, float] = field(default_factory=dict)  # per tool id
+    fallback_ttl: float = (
+        300.0  # seconds past expiry a value may serve while the circuit is open
+    )
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+    fallback_until: float
+    tool_id: str
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    deadline: Optional[float]  # time.monotonic(); None: unbounded
+
+
+def _covers(flight: Optional[float], deadline: Optional[float]) -> bool:
+    """Whether a call bounded by ``flight`` may run as long as ``deadline`` allows"""
+    return flight is None or (deadline is not None and flight >= deadline)
+
+
+class ResultCache:
+    """
+    Byte-bounded LRU of tool results with single-flight
+
+    Only tools marked ``cacheable`` (or given a TTL in the config) are
+    cached. Concurrent identical calls share one in-flight request, which
+    keeps running if the caller that started it is cancelled. A caller only
+    joins a request whose deadline is at least as late as its own and stops
+    waiting at its own deadline; a caller with a later deadline makes a
+    request of its own, which later callers join instead. A value stays
+    usable as the circuit breaker fallback for ``fallback_ttl`` seconds
+    after it expires; results served that way are not cached again.
+    """
+
+    def __init__(self, config: Optional[ResultCacheConfig] = None):
+        self.config = config or ResultCacheConfig()
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], _Flight] = {}
+        self.bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.fallback_hits = 0
+        self.evictions = 0
+
+    def is_cacheable(self, tool: Tool) -> bool:
+        return tool.id in self.config.ttls or bool(getattr(tool, "cacheable", False))
+
+    @staticmethod
+    def key(tool: Tool, inputs: Dict[str, Any]) -> Tuple[str, str]:
+        """``(tool.id, digest of inputs)`` with key order and spacing normalized"""
+        canonical = json.dumps(
+            inputs, sort_keys=True, separators=(",", ":"), default=str
+        )
+        return tool.id, hashlib.sha256(canonical.encode()).hexdigest()
+
+    async def get_or_call(
+        self,
+        tool: Tool,
+        inputs: Dict[str, Any],
+        call: CallFn,
+        fallback: Optional[FallbackFn] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Return a cached result, join an identical in-flight call, or make the call
+
+        ``call`` receives the fallback to hand to the circuit breaker: a
+        recent cached value, then ``fallback`` if given. ``deadline``
+        (``time.monotonic()``) must be the one ``call`` runs under; inside a
+        breaker call it defaults to that call's deadline.
+        """
+        key = self.key(tool, inputs)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+        inherited = current_deadline()
+        if inherited is not None:
+            deadline = inherited if deadline is None else min(deadline, inherited)
+
+        flight = self._inflight.get(key)
+        if flight is not None and _covers(flight.deadline, deadline):
+            self.coalesced += 1
+        else:
+            # Nothing in flight, or it would give up before this caller does
+            self.misses += 1
+            flight = _Flight(
+                asyncio.create_task(self._fill(key, tool, call, fallback)), deadline
+            )
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda done: self._finish(key, flight))
+
+        # Shield so one cancelled caller does not cancel the shared call
+        shared = asyncio.shield(flight.task)
+        if flight.deadline == deadline:
+            return await shared
+        try:
+            return await asyncio.wait_for(shared, max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            if flight.task.done():
+                raise  # the shared call itself timed out
+            raise DeadlineExceededError(tool.server_id)
+
+    async def _fill(
+        self,
+        key: Tuple[str, str],
+        tool: Tool,
+        call: CallFn,
+        fallback: Optional[FallbackFn],
+    ) -> Any:
+        served_from_cache = False
+
+        async def cached_fallback(tool: Tool, inputs: Dict[str, Any]) -> Any:
+            nonlocal served_from_cache
+            entry = self._entries.get(key)
+            if entry is not None and entry.fallback_until > time.time():
+                served_from_cache = True
+                self.fallback_hits += 1
+                return entry.value
+            if fallback is not None:
+                return await fallback(tool, inputs)
+            raise CircuitOpenError(tool.server_id, f"No cached result for {tool.id}")
+
+        value = await call(cached_fallback)
+        if not served_from_cache:
+            self._store(key, tool, value)
+        return value
+
+    def _finish(self, key: Tuple[str, str], flight: _Flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            flight.task.exception()  # retrieved here in case every caller was cancelled
+
+    def _store(self, key: Tuple[str, str], tool: Tool, value: Any):
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            size = sys.getsizeof(value)
+        if size > self.config.max_bytes:
+            return
+
+        ttl = self.config.ttls.get(tool.id, getattr(tool, "cache_ttl", None))
+        if ttl is None:
+            ttl = self.config.default_ttl
+        now = time.time()
+
+        self._drop(key)
+        self._entries[key] = _Entry(
+            value, size, now + ttl, now + ttl + self.config.fallback_ttl, tool.id
+        )
+        self.bytes += size
+
+        while self.bytes > self.config.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def invalidate(self, tool_id: Optional[str] = None):
+        """Drop cached results, for one tool or all of them"""
+        if tool_id is None:
+            self._entries.clear()
+            self.bytes = 0
+            return
+        for key in [key for key in self._entries if key[0] == tool_id]:
+            self._drop(key)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache metrics"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "fallback_hits": self.fallback_hits,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+        }
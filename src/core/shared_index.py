@@ -0,0 +1,206 @@
+"""
+Shared Tool Index
+Versioned on-disk snapshots of the tool index that one builder process
+publishes and any number of worker processes memory-map read-only
+"""
+
+import json
+import logging
+import os
+import shutil
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..mcp.tool_registry import Tool
+from .tool_index import IndexConfig, ToolIndex
+from .vector_store import QuantizedVectors, VectorStoreIndex
+from .lazy_import import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use; see lazy_import
+faiss = LazyModule("faiss")
+
+
+class SharedIndexStore:
+    """
+    Directory of index snapshots plus a ``CURRENT`` pointer
+
+    Each ``publish`` writes a complete ``vNNNNNNNN`` directory (vectors,
+    FAISS index, slot metadata) and then replaces ``CURRENT`` atomically,
+    so a reader sees either the old or the new version, never a mix.
+    Readers map the vectors with mmap, so every worker on a host shares one
+    copy in the page cache. The flat backend is searched directly over
+    that mapping, so it is shared completely; FAISS cannot map HNSW graphs
+    or IVF-PQ codes, so each worker loads its own copy of those (the
+    vectors stay shared). Old versions are deleted once ``keep_versions``
+    newer ones exist; readers that still have them mapped keep working
+    until they refresh.
+    """
+
+    def __init__(self, root: str, keep_versions: int = 2):
+        self.root = root
+        self.keep_versions = keep_versions
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def current_path(self) -> str:
+        return os.path.join(self.root, "CURRENT")
+
+    def _version_dir(self, version: int) -> str:
+        return os.path.join(self.root, f"v{version:08d}")
+
+    def current_version(self) -> Optional[int]:
+        """Version the ``CURRENT`` pointer names, None before the first publish"""
+        try:
+            with open(self.current_path) as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def publish(self, index: ToolIndex) -> int:
+        """Write a snapshot of ``index`` and make it current; returns its version"""
+        # Copy under the lock, write outside it so searches are not blocked on I/O
+        with index._lock:
+            rows = index._next_slot
+            codes = np.array(index.vectors.codes[:rows])
+            scales = np.array(index.vectors.scales[:rows])
+            # Flat snapshots are searched over the mapped vectors, not FAISS
+            store_backed = index.backend == "flat"
+            serialized = None if store_backed else faiss.serialize_index(index.index)
+            meta = {
+                "dimension": index.dimension,
+                "backend": index.backend,
+                "vector_dtype": index.vectors.dtype,
+                "store_backed": store_backed,
+                "next_slot": rows,
+                "tombstones": index._tombstones,
+                "slots": dict(index.tool_slots),
+            }
+
+        version = max(self.current_version() or 0, self._latest_version_dir()) + 1
+        staging = os.path.join(self.root, f"staging-{os.getpid()}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        np.save(os.path.join(staging, "vectors.npy"), codes)
+        np.save(os.path.join(staging, "scales.npy"), scales)
+        if serialized is not None:
+            with open(os.path.join(staging, "index.faiss"), "wb") as f:
+                f.write(serialized.tobytes())
+        while True:
+            meta["version"] = version
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            try:
+                os.rename(staging, self._version_dir(version))
+                break
+            except OSError:
+                if not os.path.isdir(self._version_dir(version)):
+                    raise
+                # Left by an interrupted publish or taken by another builder;
+                # never overwrite a version a reader may have mapped
+                version += 1
+
+        with open(self.current_path + ".tmp", "w") as f:
+            f.write(str(version))
+        os.replace(self.current_path + ".tmp", self.current_path)
+
+        self._prune(version)
+        logger.info(
+            f"Published tool index version {version} ({len(meta['slots'])} tools)"
+        )
+        return version
+
+    def attach(
+        self,
+        tools: Dict[str, Tool],
+        config: Optional[IndexConfig] = None,
+        version: Optional[int] = None,
+    ) -> Optional[Tuple[ToolIndex, int]]:
+        """Map a published snapshot read-only
+
+        ``tools`` maps ids to this process's Tool objects; published slots
+        for tools it does not know are treated as tombstones. Returns None
+        if nothing has been published yet or the version was pruned before
+        it could be read; the next refresh then finds a newer one.
+        """
+        version = version or self.current_version()
+        if version is None:
+            return None
+        try:
+            return self._read_snapshot(version, tools, config), version
+        except FileNotFoundError:
+            logger.info(f"Shared index version {version} was pruned while attaching")
+            return None
+
+    def _read_snapshot(
+        self, version: int, tools: Dict[str, Tool], config: Optional[IndexConfig]
+    ) -> ToolIndex:
+        directory = self._version_dir(version)
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+
+        # The snapshot decides backend and storage; the config keeps search params
+        config = replace(
+            config or IndexConfig(),
+            backend=meta["backend"],
+            vector_dtype=meta["vector_dtype"],
+        )
+        index = ToolIndex(meta["dimension"], config)
+        index.read_only = True
+        index.vectors = QuantizedVectors.from_arrays(
+            np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "scales.npy"), mmap_mode="r"),
+        )
+        index._next_slot = meta["next_slot"]
+        index._tombstones = meta["tombstones"]
+
+        for tool_id, slot in meta["slots"].items():
+            tool = tools.get(tool_id)
+            if tool is None:
+                index._tombstones += 1
+                continue
+            index.tool_slots[tool_id] = slot
+            index.slot_to_tool[slot] = tool
+            index.capabilities.set(slot, tool)
+
+        if meta["store_backed"]:
+            index.index = VectorStoreIndex(index.vectors)
+            index.index.add_with_ids(
+                None, np.array(list(index.slot_to_tool), dtype="int64")
+            )
+        else:
+            path = os.path.join(directory, "index.faiss")
+            try:
+                index.index = faiss.read_index(path, faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # FAISS reports a missing file as a generic error
+                if not os.path.exists(path):
+                    raise FileNotFoundError(path)
+                raise
+            index._apply_search_params(index.index)
+        index.generation = version
+        return index
+
+    def _versions(self) -> List[int]:
+        """Versions that have a snapshot directory"""
+        versions = []
+        for name in os.listdir(self.root):
+            if not name.startswith("v") or name.endswith(".tmp"):
+                continue
+            try:
+                versions.append(int(name[1:]))
+            except ValueError:
+                continue
+        return versions
+
+    def _latest_version_dir(self) -> int:
+        return max(self._versions(), default=0)
+
+    def _prune(self, current: int):
+        for version in self._versions():
+            if version <= current - self.keep_versions:
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
@@ -0,0 +1,540 @@
+"""
+Incremental Semantic Tool Index
+ID-mapped FAISS index over normalized tool embeddings that supports adding,
+removing and updating tools without rebuilding the whole catalog
+"""
+
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass
+from typing import List, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from ..mcp.tool_registry import Tool
+from .capability_index import CapabilityIndex, ToolFilter
+from .vector_store import QuantizedVectors, VectorStoreIndex, top_k_similar
+from .lazy_import import LazyModule
+
+# Imported on first use; see lazy_import
+faiss = LazyModule("faiss")
+
+INDEX_BACKENDS = ("flat", "hnsw", "ivf_pq")
+
+# Catalog sizes at which "auto" moves to the next backend
+FLAT_MAX_TOOLS = 5_000
+HNSW_MAX_TOOLS = 200_000
+
+
+@dataclass
+class IndexConfig:
+    """Configuration for the vector index backend
+
+    ``ToolIndex`` keeps every vector in its own ``vectors`` matrix, which
+    exact filtered scans, updates and snapshots read. The flat backend
+    searches that matrix, so vectors are stored once. HNSW and IVF-PQ keep
+    a second copy inside FAISS (the graph's flat or SQ storage, the PQ
+    codes); ``vector_dtype`` shrinks both copies for HNSW.
+    """
+
+    backend: str = "auto"  # "auto", "flat", "hnsw" or "ivf_pq"
+    hnsw_m: int = 32
+    ef_construction: int = 80
+    ef_search: int = 64
+    nlist: Optional[int] = None  # defaults to ~4 * sqrt(catalog size)
+    nprobe: int = 16
+    pq_m: Optional[int] = None  # defaults to the largest of 64/48/32/... dividing d
+    pq_bits: int = 8
+    rebuild_tombstone_ratio: float = 0.25
+    exact_filter_max: int = 2048  # filtered searches over fewer tools scan them exactly
+    vector_dtype: str = "float32"  # "float32", "float16" or "int8" vector storage
+
+
+def choose_backend(num_tools: int) -> str:
+    """Pick an index backend for a catalog of the given size"""
+    if num_tools < FLAT_MAX_TOOLS:
+        return "flat"
+    if num_tools < HNSW_MAX_TOOLS:
+        return "hnsw"
+    return "ivf_pq"
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows of a 2D array, leaving zero rows untouched"""
+    vectors = np.asarray(vectors, dtype="float32")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def tool_description(tool: Tool) -> str:
+    """Text that is embedded for a tool"""
+    return f"{tool.server_name} {tool.name} {tool.description}"
+
+
+class ToolIndex:
+    """
+    Vector index keyed by tool id
+
+    Each tool owns a slot: a row in the contiguous ``vectors`` matrix and the
+    matching FAISS id. The flat backend searches that matrix directly; with
+    a quantized ``vector_dtype`` it is stored as float16/int8 and HNSW uses
+    a scalar-quantized graph.
+    Updating a tool moves it to a fresh slot. Backends that support
+    deletion (flat, IVF-PQ) drop the old slot and reuse it later; HNSW
+    cannot delete, so old slots become tombstones that are filtered out of
+    results until the next rebuild.
+
+    IVF-PQ needs enough vectors to train on; a smaller catalog is served
+    by the flat backend until a rebuild can train it.
+
+    A ``CapabilityIndex`` mirrors the slots so searches can be restricted
+    to tools matching a ``ToolFilter`` inside FAISS, instead of filtering an
+    over-fetched candidate list afterwards.
+
+    All mutations and searches take the same lock and mutations never yield,
+    so a search always sees a complete generation of the index.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        config: Optional[IndexConfig] = None,
+        expected_size: int = 0,
+    ):
+        self.dimension = dimension
+        self.config = config or IndexConfig()
+        self.backend = self.config.backend
+        if self.backend == "auto":
+            self.backend = choose_backend(expected_size)
+        if self.backend not in INDEX_BACKENDS:
+            raise ValueError(f"Unknown index backend: {self.backend}")
+
+        # Created on first upsert, IVF-PQ needs vectors to train on
+        self.index = None
+        self.vectors = QuantizedVectors(dimension, self.config.vector_dtype)
+
+        self.slot_to_tool: Dict[int, Tool] = {}
+        self.tool_slots: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._tombstones = 0
+        self._next_slot = 0
+        self._lock = threading.RLock()
+        self.capabilities = CapabilityIndex()
+        # Set for indexes attached from a shared snapshot
+        self.read_only = False
+
+        # Bumped on every mutation so dependent caches can invalidate
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self.tool_slots)
+
+    def __contains__(self, tool_id: str) -> bool:
+        return tool_id in self.tool_slots
+
+    @property
+    def supports_removal(self) -> bool:
+        return self.backend != "hnsw"
+
+    def upsert(self, tools: List[Tool], embeddings: np.ndarray):
+        """Add new tools and replace the vectors of tools already indexed"""
+        if not tools:
+            return
+        self._check_writable()
+
+        embeddings = normalize(embeddings)
+        with self._lock:
+            if self.index is None:
+                self.index, self.backend = self._create_index(self.backend, embeddings)
+
+            self._release_slots(
+                [self.tool_slots.pop(t.id) for t in tools if t.id in self.tool_slots]
+            )
+
+            slots = []
+            for tool in tools:
+                slot = self._allocate_slot()
+                self.tool_slots[tool.id] = slot
+                self.slot_to_tool[slot] = tool
+                self.capabilities.set(slot, tool)
+                slots.append(slot)
+
+            slot_ids = np.array(slots, dtype="int64")
+            self.vectors.set(slot_ids, embeddings)
+            self.index.add_with_ids(embeddings, slot_ids)
+            self.generation += 1
+
+    def remove(self, tool_ids: Iterable[str]) -> List[str]:
+        """Remove tools by id, returning the ids that were actually indexed"""
+        self._check_writable()
+        with self._lock:
+            removed = [tool_id for tool_id in tool_ids if tool_id in self.tool_slots]
+            if not removed:
+                return []
+
+            self._release_slots([self.tool_slots.pop(tool_id) for tool_id in removed])
+            self.generation += 1
+            return removed
+
+    def search(
+        self, queries: np.ndarray, k: int, tool_filter: Optional[ToolFilter] = None
+    ) -> List[List[Tuple[Tool, float]]]:
+        """Return ``(tool, distance)`` candidates for each query row
+
+        With ``tool_filter`` only matching tools are searched, so up to ``k``
+        valid results come back without over-fetching. Filters that leave at
+        most ``exact_filter_max`` tools are answered by an exact scan of
+        those rows, which is faster than a restricted graph search and keeps
+        full recall.
+        """
+        queries = normalize(np.atleast_2d(queries))
+        with self._lock:
+            if not self.tool_slots:
+                return [[] for _ in range(len(queries))]
+
+            if tool_filter is not None and not tool_filter.is_empty:
+                allowed = self.capabilities.mask(tool_filter, self._next_slot)
+                count = int(allowed.sum())
+                if count == 0:
+                    return [[] for _ in range(len(queries))]
+                k = min(k, count)
+                if count <= self.config.exact_filter_max or isinstance(
+                    self.index, VectorStoreIndex
+                ):
+                    distances, ids = self._exact_search(
+                        queries, k, np.flatnonzero(allowed)
+                    )
+                else:
+                    bitmap = np.packbits(allowed, bitorder="little")
+                    selector = faiss.IDSelectorBitmap(
+                        len(bitmap), faiss.swig_ptr(bitmap)
+                    )
+                    distances, ids = self.index.search(
+                        queries, k, params=self._search_parameters(selector, k)
+                    )
+                    # A graph search can miss matches of a sparse filter;
+                    # rows that came back short are rescanned exactly
+                    short = (ids < 0).any(axis=1)
+                    if short.any():
+                        distances[short], ids[short] = self._exact_search(
+                            queries[short], k, np.flatnonzero(allowed)
+                        )
+            else:
+                k = min(k, len(self.tool_slots))
+                distances, ids = self.index.search(queries, k + self._tombstones)
+
+            results = []
+            for row_ids, row_distances in zip(ids, distances):
+                results.append(
+                    [
+                        (self.slot_to_tool[slot], float(distance))
+                        for slot, distance in zip(row_ids, row_distances)
+                        if slot in self.slot_to_tool
+                    ][:k]
+                )
+            return results
+
+    def _exact_search(
+        self, queries: np.ndarray, k: int, slots: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k over selected slots, as squared L2 distances"""
+        top, similarities = top_k_similar(self.vectors.dot(queries, slots), k)
+        # Unit vectors: ||q - v||^2 = 2 - 2 q.v
+        return 2.0 - 2.0 * similarities, slots[top]
+
+    def _search_parameters(self, selector, k: int):
+        """Search parameters of the backend's type, carrying an id selector"""
+        index = self.index
+        if isinstance(index, faiss.IndexIDMap):
+            index = faiss.downcast_index(index.index)
+        if isinstance(index, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW()
+            params.efSearch = max(self.config.ef_search, k)
+        elif isinstance(index, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF()
+            params.nprobe = self.config.nprobe
+        else:
+            params = faiss.SearchParameters()
+        params.sel = selector
+        return params
+
+    def set_search_params(
+        self, ef_search: Optional[int] = None, nprobe: Optional[int] = None
+    ):
+        """Tune the recall/latency trade-off of approximate backends"""
+        with self._lock:
+            if ef_search is not None:
+                self.config.ef_search = ef_search
+            if nprobe is not None:
+                self.config.nprobe = nprobe
+            if self.index is not None:
+                self._apply_search_params(self.index)
+
+    def needs_rebuild(self) -> bool:
+        """Whether the backend no longer fits the catalog or has too many tombstones"""
+        if self.index is None:
+            return False
+        if self.config.backend == "auto":
+            # 10% hysteresis so a catalog hovering at a threshold does not flap
+            size = len(self)
+            target = choose_backend(size)
+            if target != self.backend and choose_backend(
+                int(size * 0.9)
+            ) == choose_backend(int(size * 1.1)):
+                return True
+        elif self.backend != self.config.backend and self._can_train_ivf_pq(len(self)):
+            # Fell back to flat until the catalog was large enough to train
+            return True
+        total = len(self.tool_slots) + self._tombstones
+        return (
+            total > 0 and self._tombstones / total > self.config.rebuild_tombstone_ratio
+        )
+
+    def rebuild(self, backend: Optional[str] = None):
+        """Rebuild the FAISS index from the stored vectors without re-encoding
+
+        The new index is built outside the lock so searches keep running
+        against the old one; it is swapped in only if no mutation happened
+        in the meantime, otherwise the rebuild starts over.
+        """
+        self._check_writable()
+        while True:
+            with self._lock:
+                target = backend or self.config.backend
+                if target == "auto":
+                    target = choose_backend(len(self))
+                generation = self.generation
+                slot_ids = np.array(sorted(self.slot_to_tool), dtype="int64")
+                vectors = self.vectors.get(slot_ids)
+
+            index, target = self._create_index(target, vectors)
+            if len(slot_ids):
+                index.add_with_ids(vectors, slot_ids)
+
+            with self._lock:
+                if self.generation != generation:
+                    continue
+                self.index = index
+                self.backend = target
+                used = set(slot_ids.tolist())
+                self._free_slots = [s for s in range(self._next_slot) if s not in used]
+                self._tombstones = 0
+                self.generation += 1
+                return
+
+    def get_vectors(self, tool_ids: List[str]) -> np.ndarray:
+        """Gather stored vectors for tools; unknown tools get zero vectors"""
+        with self._lock:
+            slots = np.array(
+                [self.tool_slots.get(tool_id, -1) for tool_id in tool_ids],
+                dtype="int64",
+            )
+            result = np.zeros((len(tool_ids), self.dimension), dtype="float32")
+            known = slots >= 0
+            result[known] = self.vectors.get(slots[known])
+            return result
+
+    def get_tools(self) -> List[Tool]:
+        """Every indexed tool"""
+        with self._lock:
+            return list(self.slot_to_tool.values())
+
+    def get_tool(self, tool_id: str) -> Optional[Tool]:
+        """Look up an indexed tool by id"""
+        with self._lock:
+            slot = self.tool_slots.get(tool_id)
+            return self.slot_to_tool.get(slot) if slot is not None else None
+
+    def save(self, index_path: str, meta_path: str, keys: Dict[str, str]):
+        """Serialize the FAISS index and its slot mapping
+
+        ``keys`` maps tool ids to the content hash their vector was built
+        from, so a later ``load`` can tell which slots are still valid.
+        """
+        with self._lock:
+            if self.index is None:
+                return
+            if isinstance(self.index, VectorStoreIndex):
+                # Nothing beyond the vectors themselves, rebuilt on load
+                open(index_path + ".tmp", "wb").close()
+            else:
+                faiss.write_index(self.index, index_path + ".tmp")
+            meta = {
+                "dimension": self.dimension,
+                "backend": self.backend,
+                "vector_dtype": self.config.vector_dtype,
+                "next_slot": self._next_slot,
+                "free_slots": self._free_slots,
+                "tombstones": self._tombstones,
+                "slots": {
+                    tool_id: [slot, keys.get(tool_id)]
+                    for tool_id, slot in self.tool_slots.items()
+                },
+            }
+            with open(meta_path + ".tmp", "w") as f:
+                json.dump(meta, f)
+            os.replace(index_path + ".tmp", index_path)
+            os.replace(meta_path + ".tmp", meta_path)
+
+    @classmethod
+    def load(
+        cls,
+        index_path: str,
+        meta_path: str,
+        tools: List[Tool],
+        keys: Dict[str, str],
+        vectors: np.ndarray,
+        config: Optional[IndexConfig] = None,
+    ) -> Tuple["ToolIndex", List[int]]:
+        """Restore a serialized index and reconcile it with the live catalog
+
+        ``tools``/``keys``/``vectors`` describe the current catalog, with
+        vectors taken from the embedding store. Slots whose tool disappeared
+        or whose content hash changed are dropped. Returns the index and the
+        positions in ``tools`` that still need to be upserted.
+        """
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        config = config or IndexConfig()
+        if config.backend not in ("auto", meta["backend"]):
+            raise ValueError(
+                f"Saved index uses {meta['backend']}, configured {config.backend}"
+            )
+
+        if meta.get("vector_dtype", "float32") != config.vector_dtype:
+            raise ValueError(
+                f"Saved index stores {meta.get('vector_dtype', 'float32')} vectors, "
+                f"configured {config.vector_dtype}"
+            )
+
+        index = cls(meta["dimension"], config)
+        index.backend = meta["backend"]
+        # Older float32 flat saves also wrote a FAISS file; it is ignored
+        store_backed = index.backend == "flat"
+        if store_backed:
+            index.index = VectorStoreIndex(index.vectors)
+        else:
+            index.index = faiss.read_index(index_path)
+            index._apply_search_params(index.index)
+        index._next_slot = meta["next_slot"]
+        index._free_slots = list(meta["free_slots"])
+        index._tombstones = meta["tombstones"]
+        index.vectors.grow(max(16, index._next_slot))
+
+        saved = meta["slots"]
+        stale = []
+        pending = []
+        for position, tool in enumerate(tools):
+            entry = saved.pop(tool.id, None)
+            if entry is None:
+                pending.append(position)
+                continue
+            slot, key = entry
+            if key != keys.get(tool.id):
+                stale.append(slot)
+                pending.append(position)
+                continue
+            index.tool_slots[tool.id] = slot
+            index.slot_to_tool[slot] = tool
+            index.capabilities.set(slot, tool)
+            index.vectors.set([slot], normalize(vectors[position : position + 1]))
+
+        # Tools that changed or left the catalog while we were down
+        stale.extend(slot for slot, _ in saved.values())
+        if store_backed:
+            index.index.add_with_ids(
+                None, np.array(list(index.slot_to_tool), dtype="int64")
+            )
+        index._release_slots(stale)
+
+        return index, pending
+
+    def _create_index(self, backend: str, training_vectors: np.ndarray):
+        """Create an empty FAISS index that accepts explicit ids
+
+        Returns the index and the backend actually used.
+        """
+        d = self.dimension
+        if backend == "ivf_pq":
+            num = len(training_vectors)
+            if self._can_train_ivf_pq(num):
+                nlist = self._ivf_nlist(num)
+                pq_m = self.config.pq_m or next(
+                    m for m in (64, 48, 32, 24, 16, 8, 4, 2, 1) if d % m == 0
+                )
+                quantizer = faiss.IndexFlatL2(d)
+                index = faiss.IndexIVFPQ(quantizer, d, nlist, pq_m, self.config.pq_bits)
+                index.train(training_vectors)
+                self._apply_search_params(index)
+                return index, backend
+            # Too few vectors to train on, fall back to an exact scan
+            backend = "flat"
+
+        if backend == "hnsw":
+            if self.config.vector_dtype == "float32":
+                hnsw = faiss.IndexHNSWFlat(d, self.config.hnsw_m)
+            else:
+                qtype = (
+                    faiss.ScalarQuantizer.QT_fp16
+                    if self.config.vector_dtype == "float16"
+                    else faiss.ScalarQuantizer.QT_8bit
+                )
+                hnsw = faiss.IndexHNSWSQ(d, qtype, self.config.hnsw_m)
+                hnsw.train(training_vectors)
+            hnsw.hnsw.efConstruction = self.config.ef_construction
+            index = faiss.IndexIDMap2(hnsw)
+            self._apply_search_params(index)
+            return index, backend
+
+        # Exact search runs over ``self.vectors``, no second copy in FAISS
+        return VectorStoreIndex(self.vectors), "flat"
+
+    def _ivf_nlist(self, num: int) -> int:
+        return self.config.nlist or max(1, min(int(4 * math.sqrt(num)), num // 39))
+
+    def _can_train_ivf_pq(self, num: int) -> bool:
+        """FAISS wants ~39 training points per PQ centroid and per list"""
+        return num >= 39 * max(2**self.config.pq_bits, self._ivf_nlist(num))
+
+    def _apply_search_params(self, index):
+        """Push efSearch/nprobe down to the FAISS index"""
+        if isinstance(index, faiss.IndexIDMap):
+            index = faiss.downcast_index(index.index)
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = self.config.ef_search
+        elif isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.config.nprobe
+
+    def _check_writable(self):
+        if self.read_only:
+            raise RuntimeError("Tool index is a read-only shared snapshot")
+
+    def _release_slots(self, slots: List[int]):
+        """Drop slots from the index, or tombstone them where that is impossible"""
+        if not slots:
+            return
+        for slot in slots:
+            self.slot_to_tool.pop(slot, None)
+        self.vectors.clear(slots)
+        self.capabilities.clear(slots)
+
+        if self.supports_removal:
+            self.index.remove_ids(np.array(slots, dtype="int64"))
+            self._free_slots.extend(slots)
+        else:
+            self._tombstones += len(slots)
+
+    def _allocate_slot(self) -> int:
+        """Reuse a freed slot or grow the vector matrix"""
+        if self._free_slots:
+            return self._free_slots.pop()
+
+        slot = self._next_slot
+        self._next_slot += 1
+        if slot >= len(self.vectors):
+            self.vectors.grow(max(16, len(self.vectors) * 2))
+        return slot
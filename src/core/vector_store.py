@@ -0,0 +1,157 @@
+"""
+Quantized Vector Storage
+Contiguous tool-vector matrix stored as float32, float16 or per-row scaled
+int8, plus an exact-search index that reads straight from it
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+# Rows dequantized per step when scanning, bounds temporary memory
+SCAN_CHUNK = 4096
+
+
+def top_k_similar(similarities: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column positions and values of the ``k`` largest entries per row, sorted"""
+    k = min(k, similarities.shape[1])
+    if k == 0:
+        empty = np.zeros((len(similarities), 0))
+        return empty.astype("int64"), empty
+    top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(similarities, top, axis=1)
+    order = np.argsort(-values, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(
+        values, order, axis=1
+    )
+
+
+class QuantizedVectors:
+    """
+    Row-addressable vector matrix with optional scalar quantization
+
+    float16 halves memory with negligible effect on cosine scores. int8
+    stores each row as ``round(v / scale)`` with ``scale = max|v| / 127``,
+    a quarter of float32, and dot products are taken on the codes and
+    rescaled per row.
+    """
+
+    def __init__(self, dimension: int, dtype: str = "float32", capacity: int = 0):
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector dtype: {dtype}")
+        self.dimension = dimension
+        self.dtype = dtype
+        self.codes = np.zeros((capacity, dimension), dtype=dtype)
+        self.scales = np.ones(capacity if dtype == "int8" else 0, dtype="float32")
+
+    @classmethod
+    def from_arrays(cls, codes: np.ndarray, scales: np.ndarray) -> "QuantizedVectors":
+        """Wrap existing (e.g. memory-mapped, read-only) arrays without copying"""
+        vectors = cls(codes.shape[1], str(codes.dtype))
+        vectors.codes = codes
+        vectors.scales = scales
+        return vectors
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def grow(self, capacity: int):
+        if capacity <= len(self.codes):
+            return
+        codes = np.zeros((capacity, self.dimension), dtype=self.dtype)
+        codes[: len(self.codes)] = self.codes
+        self.codes = codes
+        if self.dtype == "int8":
+            scales = np.ones(capacity, dtype="float32")
+            scales[: len(self.scales)] = self.scales
+            self.scales = scales
+
+    def set(self, rows: np.ndarray, vectors: np.ndarray):
+        """Store float32 vectors at the given rows"""
+        vectors = np.asarray(vectors, dtype="float32")
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self.codes[rows] = np.rint(vectors / scales[:, None]).astype("int8")
+            self.scales[rows] = scales
+        else:
+            self.codes[rows] = vectors
+
+    def clear(self, rows):
+        self.codes[rows] = 0
+        if self.dtype == "int8":
+            self.scales[rows] = 1.0
+
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        """Dequantized float32 copies of the given rows"""
+        vectors = self.codes[rows].astype("float32")
+        if self.dtype == "int8":
+            vectors *= self.scales[rows][:, None]
+        return vectors
+
+    def dot(self, queries: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """``queries @ vectors[rows].T`` without dequantizing all rows at once"""
+        queries = np.asarray(queries, dtype="float32")
+        result = np.empty((len(queries), len(rows)), dtype="float32")
+        for start in range(0, len(rows), SCAN_CHUNK):
+            chunk = rows[start : start + SCAN_CHUNK]
+            if self.dtype == "float32":
+                result[:, start : start + len(chunk)] = queries @ self.codes[chunk].T
+            else:
+                products = queries @ self.codes[chunk].astype("float32").T
+                if self.dtype == "int8":
+                    products *= self.scales[chunk]
+                result[:, start : start + len(chunk)] = products
+        return result
+
+
+class VectorStoreIndex:
+    """
+    Exact search over a ``QuantizedVectors`` matrix
+
+    Mirrors the subset of the FAISS index API that ``ToolIndex`` uses
+    (``add_with_ids``, ``remove_ids``, ``search``) with ids being row
+    numbers, so the flat backend keeps a single copy of the vectors instead
+    of a second one inside FAISS. Distances are squared L2 between unit
+    vectors, like ``IndexFlatL2``.
+    """
+
+    def __init__(self, store: QuantizedVectors):
+        self.store = store
+        self._live = set()
+        self._rows: Optional[np.ndarray] = None
+
+    @property
+    def ntotal(self) -> int:
+        return len(self._live)
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray):
+        # The caller has already written the vectors to the shared store
+        self._live.update(int(i) for i in ids)
+        self._rows = None
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        before = len(self._live)
+        self._live.difference_update(int(i) for i in ids)
+        self._rows = None
+        return before - len(self._live)
+
+    def search(
+        self, queries: np.ndarray, k: int, params=None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if self._rows is None:
+            self._rows = np.array(sorted(self._live), dtype="int64")
+        positions, similarities = top_k_similar(self.store.dot(queries, self._rows), k)
+
+        distances = np.full((len(queries), k), np.inf, dtype="float32")
+        ids = np.full((len(queries), k), -1, dtype="int64")
+        found = positions.shape[1]
+        distances[:, :found] = 2.0 - 2.0 * similarities
+        ids[:, :found] = self._rows[positions]
+        return distances, ids
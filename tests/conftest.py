@@ -0,0 +1,112 @@
+"""
+Shared test fixtures
+Duck-typed tools, an in-memory registry and cache tier, and an offline
+hashing encoder, so orchestrator tests need no embedding model or Redis
+"""
+
+import zlib
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytest
+
+from src.core.embedding_backend import EmbeddingBackend
+
+
+class FakeRegistry:
+    """Tool registry with the interface the orchestrator uses"""
+
+    def __init__(self, tools: List[SimpleNamespace]):
+        self.tools = {tool.id: tool for tool in tools}
+
+    async def get_all_tools(self) -> List[SimpleNamespace]:
+        return list(self.tools.values())
+
+    async def get_tool(self, tool_id: str) -> Optional[SimpleNamespace]:
+        return self.tools.get(tool_id)
+
+
+class FakeCache:
+    """Stand-in for the shared cache tier"""
+
+    def __init__(self):
+        self.entries: Dict[str, Any] = {}
+
+    async def get(self, key: str) -> Any:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self.entries[key] = value
+
+    async def delete(self, key: str):
+        self.entries.pop(key, None)
+
+
+class HashingBackend(EmbeddingBackend):
+    """Deterministic bag-of-words encoder; ``config`` is the dimension"""
+
+    name = "hashing"
+
+    def __init__(self, model_name: str, config: Optional[int] = None):
+        super().__init__(model_name, config)
+        self.dimension = config or 64
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                rng = np.random.default_rng(zlib.crc32(token.encode()))
+                vectors[row] += rng.standard_normal(self.dimension).astype("float32")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+@pytest.fixture
+def fake_cache() -> FakeCache:
+    """An empty shared cache tier"""
+    return FakeCache()
+
+
+@pytest.fixture
+def make_tool():
+    """Build a tool-shaped record; unspecified fields get neutral defaults"""
+
+    def make(tool_id: str, server_id: str = "server", **fields) -> SimpleNamespace:
+        values = {
+            "id": tool_id,
+            "name": tool_id,
+            "server_id": server_id,
+            "server_name": server_id,
+            "description": f"{tool_id} tool",
+            "capabilities": [],
+            "requires_auth": False,
+            "idempotent": False,
+            "cacheable": False,
+            "input_schema": {},
+        }
+        values.update(fields)
+        return SimpleNamespace(**values)
+
+    return make
+
+
+@pytest.fixture
+def make_orchestrator():
+    """Build orchestrators over a tool list; executors are shut down afterwards"""
+    from src.core.model_executor import ExecutorConfig
+    from src.core.orchestrator import SemanticToolOrchestrator
+
+    created = []
+
+    def make(tools: List[SimpleNamespace] = (), registry=None, **kwargs):
+        kwargs.setdefault("executor_config", ExecutorConfig(backend=HashingBackend))
+        orchestrator = SemanticToolOrchestrator(
+            registry or FakeRegistry(list(tools)), FakeCache(), **kwargs
+        )
+        created.append(orchestrator)
+        return orchestrator
+
+    yield make
+    for orchestrator in created:
+        orchestrator.executor.shutdown(wait=False)
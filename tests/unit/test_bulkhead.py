@@ -0,0 +1,134 @@
+"""Adaptive per-server concurrency limits"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.core.circuit_breaker import (
+    AdaptiveBulkhead,
+    BulkheadConfig,
+    CircuitBreakerConfig,
+    DeadlineExceededError,
+    MCPCircuitBreaker,
+)
+
+
+async def fail():
+    raise ConnectionError("server down")
+
+
+async def cached():
+    return "cached"
+
+
+def test_fast_successes_raise_the_limit_additively():
+    bulkhead = AdaptiveBulkhead("server", BulkheadConfig(initial_limit=4))
+    for _ in range(4):
+        bulkhead.record(True, 10.0)
+    # +increase/limit per call: about one slot per window of calls
+    assert 4.9 < bulkhead.limit < 5.0
+    bulkhead.record(True, 10.0)
+    assert bulkhead.capacity == 5
+
+
+def test_limit_never_exceeds_max():
+    bulkhead = AdaptiveBulkhead("server", BulkheadConfig(initial_limit=2, max_limit=3))
+    for _ in range(50):
+        bulkhead.record(True, 10.0)
+    assert bulkhead.limit == 3.0
+
+
+def test_failure_halves_the_limit():
+    bulkhead = AdaptiveBulkhead("server", BulkheadConfig(initial_limit=8))
+    bulkhead.record(False, 10.0)
+    assert bulkhead.capacity == 4
+    assert bulkhead.decreases == 1
+
+
+def test_slow_call_halves_the_limit():
+    bulkhead = AdaptiveBulkhead(
+        "server", BulkheadConfig(initial_limit=8, latency_target=50.0)
+    )
+    bulkhead.record(True, 10.0)
+    limit = bulkhead.limit
+    bulkhead.record(True, 200.0)
+    assert bulkhead.limit == pytest.approx(limit / 2)
+
+
+def test_burst_of_failures_counts_once_per_latency():
+    bulkhead = AdaptiveBulkhead("server", BulkheadConfig(initial_limit=8))
+    for _ in range(5):
+        bulkhead.record(False, 10_000.0)
+    assert bulkhead.decreases == 1
+    assert bulkhead.capacity == 4
+
+
+async def test_waiting_for_a_slot_stops_at_the_deadline():
+    bulkhead = AdaptiveBulkhead("server", BulkheadConfig(initial_limit=1))
+    async with bulkhead.slot():
+        with pytest.raises(DeadlineExceededError):
+            async with bulkhead.slot(time.monotonic() + 0.02):
+                pass
+    assert bulkhead.in_flight == 0
+    assert not bulkhead._waiters
+
+
+async def test_slot_records_server_outcomes():
+    bulkhead = AdaptiveBulkhead("server", BulkheadConfig(initial_limit=4))
+    async with bulkhead.slot():
+        pass
+    assert bulkhead.limit > 4.0
+
+    with pytest.raises(ConnectionError):
+        async with bulkhead.slot():
+            await fail()
+    assert bulkhead.decreases == 1
+
+
+async def test_rejected_calls_leave_the_limit_alone():
+    breaker = MCPCircuitBreaker("server", CircuitBreakerConfig(failure_threshold=2))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+
+    bulkhead = AdaptiveBulkhead("server", BulkheadConfig(initial_limit=4))
+    for _ in range(10):
+        async with bulkhead.slot() as permit:
+            result = await breaker.call(fail, fallback=cached, permit=permit)
+        assert result == "cached"
+        assert permit.rejected
+
+    assert bulkhead.limit == 4.0
+    assert bulkhead.latency_ewma is None
+    assert bulkhead.in_flight == 0
+
+
+async def test_waiter_gets_the_released_slot():
+    bulkhead = AdaptiveBulkhead("server", BulkheadConfig(initial_limit=1))
+    order = []
+
+    async def hold(name, seconds):
+        async with bulkhead.slot():
+            order.append(name)
+            await asyncio.sleep(seconds)
+
+    await asyncio.gather(hold("first", 0.02), hold("second", 0.0))
+    assert order == ["first", "second"]
+    assert bulkhead.total_waited == 1
+
+
+def test_planner_splits_a_group_over_one_servers_limit(make_orchestrator, make_tool):
+    orchestrator = make_orchestrator()
+    orchestrator.circuit_breakers.get_bulkhead("narrow").limit = 2.0
+    tools = {
+        **{f"n{i}": make_tool(f"n{i}", server_id="narrow") for i in range(5)},
+        "w": make_tool("w", server_id="wide"),
+    }
+    chunks = orchestrator._split_group(list(tools), tools)
+
+    assert [len(chunk) for chunk in chunks] == [3, 2, 1]
+    for chunk in chunks:
+        narrow = [call_id for call_id in chunk if tools[call_id].server_id == "narrow"]
+        assert len(narrow) <= 2
+    assert "w" in chunks[0]
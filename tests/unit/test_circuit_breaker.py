@@ -0,0 +1,162 @@
+"""Circuit breaker state machine"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.core.circuit_breaker import (
+    CircuitBreakerConfig,
+    CircuitOpenError,
+    CircuitState,
+    DeadlineExceededError,
+    MCPCircuitBreaker,
+    SlidingWindow,
+    current_deadline,
+)
+
+
+async def fail():
+    raise ConnectionError("server down")
+
+
+async def succeed():
+    return "ok"
+
+
+async def open_breaker(breaker: MCPCircuitBreaker):
+    for _ in range(breaker.config.failure_threshold):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+    assert breaker.state == CircuitState.OPEN
+
+
+async def test_open_breaker_becomes_available_after_reset_timeout():
+    breaker = MCPCircuitBreaker("server", CircuitBreakerConfig(failure_threshold=2))
+    await open_breaker(breaker)
+    assert not breaker.is_available()
+
+    # Discovery offers the server again once a probe would be let through
+    breaker.last_failure_time = breaker.state_changed_time = (
+        time.time() - breaker.config.reset_timeout
+    )
+    assert breaker.is_available()
+    assert breaker.state == CircuitState.OPEN
+
+
+async def test_discovery_stops_excluding_server_after_reset_timeout(make_orchestrator):
+    orchestrator = make_orchestrator()
+    breaker = orchestrator.circuit_breakers.get_breaker("server")
+    await open_breaker(breaker)
+    assert orchestrator._tool_filter({}).excluded_servers == {"server"}
+
+    breaker.last_failure_time = breaker.state_changed_time = (
+        time.time() - breaker.config.reset_timeout
+    )
+    assert not orchestrator._tool_filter({}).excluded_servers
+
+
+def test_sliding_window_drops_expired_buckets():
+    window = SlidingWindow(size=10.0, buckets=5)
+    window.record(False, False, now=100.0)
+    window.record(True, True, now=105.0)
+    assert window.totals(now=105.0) == (2, 1, 1)
+    # The first bucket [100, 102) has left the window ten seconds later
+    assert window.totals(now=110.0) == (1, 0, 1)
+    assert window.totals(now=116.0) == (0, 0, 0)
+
+
+async def test_failure_rate_needs_minimum_volume():
+    config = CircuitBreakerConfig(
+        failure_threshold=100, minimum_calls=6, failure_rate_threshold=0.5
+    )
+    breaker = MCPCircuitBreaker("server", config)
+    for call in (succeed, fail, succeed, fail, fail):
+        try:
+            await breaker.call(call)
+        except ConnectionError:
+            pass
+    # 60% failures, but only five calls
+    assert breaker.state == CircuitState.CLOSED
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+    assert breaker.state == CircuitState.OPEN
+
+
+async def test_slow_call_rate_opens_circuit():
+    config = CircuitBreakerConfig(
+        minimum_calls=4, slow_call_duration=0.01, slow_call_rate_threshold=0.75
+    )
+    breaker = MCPCircuitBreaker("server", config)
+
+    async def slow():
+        await asyncio.sleep(0.02)
+
+    await breaker.call(succeed)
+    for _ in range(3):
+        await breaker.call(slow)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.total_failures == 0
+
+
+async def test_half_open_probes_are_capped():
+    config = CircuitBreakerConfig(
+        failure_threshold=1, half_open_limit=2, reset_timeout=0.0
+    )
+    breaker = MCPCircuitBreaker("server", config)
+    await open_breaker(breaker)
+    release = asyncio.Event()
+
+    async def probe():
+        await release.wait()
+        return "ok"
+
+    probes = [asyncio.create_task(breaker.call(probe)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.half_open_in_flight == 2
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(probe)
+
+    release.set()
+    assert await asyncio.gather(*probes) == ["ok", "ok"]
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.total_rejected == 1
+
+
+async def test_every_rejection_is_counted():
+    breaker = MCPCircuitBreaker("server", CircuitBreakerConfig(failure_threshold=1))
+    await open_breaker(breaker)
+    for _ in range(3):
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeed)
+    assert breaker.get_metrics()["total_rejected"] == 3
+
+
+async def test_nested_call_inherits_deadline_without_counting_a_failure():
+    outer, inner = MCPCircuitBreaker("outer"), MCPCircuitBreaker("inner")
+    deadline = time.monotonic() + 0.05
+    seen = []
+
+    async def hang():
+        seen.append(current_deadline())
+        await asyncio.sleep(1)
+
+    async def nested():
+        seen.append(current_deadline())
+        return await inner.call(hang)
+
+    with pytest.raises(DeadlineExceededError):
+        await outer.call(nested, deadline=deadline)
+    assert seen == [pytest.approx(deadline, abs=0.01)] * 2
+    assert current_deadline() is None
+    assert outer.total_failures == inner.total_failures == 0
+    assert outer.state == inner.state == CircuitState.CLOSED
+
+
+async def test_expired_deadline_rejects_before_calling():
+    breaker = MCPCircuitBreaker("server")
+    with pytest.raises(DeadlineExceededError):
+        await breaker.call(succeed, deadline=time.monotonic() - 1)
+    assert breaker.total_failures == 0
@@ -0,0 +1,60 @@
+"""End-to-end tool discovery through the orchestrator"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("faiss")
+
+
+@pytest.fixture
+def catalog(make_tool):
+    names = [
+        "send_email",
+        "send_sms",
+        "send_fax",
+        "send_page",
+        "send_slack",
+        "send_push",
+        "send_webhook",
+        "send_letter",
+        "send_tweet",
+        "send_invoice",
+        "list_repos",
+        "query_metrics",
+    ]
+    return [make_tool(name, description=name.replace("_", " ")) for name in names]
+
+
+@pytest.mark.parametrize("intent", ["send a message", "send_email"])
+async def test_cached_result_is_not_reused_for_a_larger_top_k(
+    make_orchestrator, catalog, intent
+):
+    orchestrator = make_orchestrator(catalog)
+    await orchestrator.initialize()
+
+    assert len(await orchestrator.discover_tools(intent, {}, top_k=3)) == 3
+    assert len(await orchestrator.discover_tools(intent, {}, top_k=10)) == 10
+    # Both results stay cached under their own key
+    assert len(await orchestrator.discover_tools(intent, {}, top_k=3)) == 3
+
+
+async def test_discovery_answers_lexically_while_warming_up(make_orchestrator, catalog):
+    orchestrator = make_orchestrator(catalog)
+    build = orchestrator._build_semantic_index
+    release = asyncio.Event()
+
+    async def slow_build(tools):
+        await release.wait()
+        await build(tools)
+
+    orchestrator._build_semantic_index = slow_build
+    await orchestrator.initialize(wait=False)
+    try:
+        scores = await orchestrator.discover_tools("send_email", {}, top_k=3)
+        assert not orchestrator.semantic_ready
+        assert scores[0].tool.id == "send_email"
+        assert orchestrator.get_readiness()["lexical"]
+    finally:
+        release.set()
+    assert await orchestrator.wait_until_ready(timeout=5)
@@ -0,0 +1,61 @@
+"""Micro-batching of concurrent discovery requests"""
+
+import asyncio
+import gc
+
+import pytest
+
+from src.core.discovery_batcher import DiscoveryBatcher
+
+
+def cache_key(intent, context):
+    return f"{intent}:{sorted(context.items())}"
+
+
+async def test_concurrent_requests_share_one_batch():
+    batches = []
+
+    async def discover_batch(requests, top_k):
+        batches.append([intent for intent, _ in requests])
+        return [f"{intent}/{top_k}" for intent, _ in requests]
+
+    batcher = DiscoveryBatcher(discover_batch, cache_key, window=0.01)
+    results = await asyncio.gather(
+        batcher.submit("a", {}), batcher.submit("b", {}), batcher.submit("a", {})
+    )
+    assert results == ["a/5", "b/5", "a/5"]
+    assert batches == [["a", "b"]]
+    assert batcher.coalesced_requests == 1
+
+
+async def test_flush_task_is_kept_until_done():
+    release = asyncio.Event()
+
+    async def discover_batch(requests, top_k):
+        await release.wait()
+        return [intent for intent, _ in requests]
+
+    batcher = DiscoveryBatcher(discover_batch, cache_key, window=0)
+    request = asyncio.ensure_future(batcher.submit("a", {}))
+    await asyncio.sleep(0.01)
+
+    # The running flush is referenced by the batcher, not only by the loop
+    assert len(batcher._flush_tasks) == 1
+    gc.collect()
+    release.set()
+    assert await asyncio.wait_for(request, 1) == "a"
+    await asyncio.sleep(0)
+    assert not batcher._flush_tasks
+
+
+async def test_batch_errors_reach_every_caller():
+    async def discover_batch(requests, top_k):
+        raise RuntimeError("index unavailable")
+
+    batcher = DiscoveryBatcher(discover_batch, cache_key, window=0)
+    results = await asyncio.gather(
+        batcher.submit("a", {}), batcher.submit("b", {}), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await batcher.submit("c", {})
@@ -0,0 +1,43 @@
+"""Generations and catalog versions of the two-tier discovery cache"""
+
+from src.core.discovery_cache import DiscoveryCache
+
+
+async def test_invalidate_reaches_other_processes(fake_cache):
+    first, second = DiscoveryCache(fake_cache), DiscoveryCache(fake_cache)
+    await first.set("key", "stale", "context")
+    assert await second.get("key") == "stale"
+
+    await first.invalidate()
+    await second.sync_generation(force=True)
+    assert await second.get("key") is None
+    assert second.generation == first.generation
+
+
+async def test_restarted_process_skips_entries_from_before_invalidation(fake_cache):
+    old = DiscoveryCache(fake_cache)
+    await old.set("key", "stale", "context")
+    await DiscoveryCache(fake_cache).invalidate()
+
+    # A fresh process starts at generation 0, where the stale entry lives
+    restarted = DiscoveryCache(fake_cache)
+    assert await restarted.get("key") is None
+    assert restarted.generation == 1
+
+
+async def test_invalidation_never_reuses_a_generation(fake_cache):
+    first, second = DiscoveryCache(fake_cache), DiscoveryCache(fake_cache)
+    await first.invalidate()
+    await second.invalidate()
+    assert (first.generation, second.generation) == (1, 2)
+
+
+async def test_index_versions_do_not_share_entries(fake_cache):
+    builder, worker = DiscoveryCache(fake_cache), DiscoveryCache(fake_cache)
+    builder.set_index_version(2)
+    worker.set_index_version(1)
+    await builder.set("key", "v2 result", "context")
+    assert await worker.get("key") is None
+
+    worker.set_index_version(2)
+    assert await worker.get("key") == "v2 result"
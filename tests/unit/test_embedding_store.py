@@ -0,0 +1,63 @@
+"""Persistent embedding store shared by several processes"""
+
+import multiprocessing
+import zlib
+
+import numpy as np
+
+from src.core.embedding_store import EmbeddingStore
+
+
+def vector(key: str, dimension: int = 8) -> np.ndarray:
+    rng = np.random.default_rng(zlib.crc32(key.encode()))
+    return rng.standard_normal(dimension).astype("float32")
+
+
+def assert_complete(store: EmbeddingStore, keys):
+    stored, missing = store.get_many(keys)
+    assert missing == []
+    np.testing.assert_array_equal(stored, np.stack([vector(key) for key in keys]))
+
+
+def test_round_trip(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    store.put_many(["a", "b"], np.stack([vector("a"), vector("b")]))
+    assert_complete(EmbeddingStore(str(tmp_path), "model"), ["a", "b"])
+
+
+def test_stores_opened_together_do_not_overwrite_each_other(tmp_path):
+    first = EmbeddingStore(str(tmp_path), "model")
+    second = EmbeddingStore(str(tmp_path), "model")
+
+    first.put_many(["a", "b"], np.stack([vector("a"), vector("b")]))
+    # ``second`` has not seen a/b; it must append after them, not over them
+    second.put_many(["c"], np.stack([vector("c")]))
+    first.put_many(["d"], np.stack([vector("d")]))
+
+    assert_complete(EmbeddingStore(str(tmp_path), "model"), ["a", "b", "c", "d"])
+    assert_complete(second, ["a", "b", "c"])
+
+
+def _write_keys(root: str, worker: int):
+    store = EmbeddingStore(root, "model")
+    for batch in range(5):
+        keys = [f"w{worker}-{batch}-{i}" for i in range(4)]
+        store.put_many(keys, np.stack([vector(key) for key in keys]))
+
+
+def test_concurrent_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_write_keys, args=(str(tmp_path), worker))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    keys = [f"w{w}-{b}-{i}" for w in range(4) for b in range(5) for i in range(4)]
+    store = EmbeddingStore(str(tmp_path), "model")
+    assert len(store) == len(keys)
+    assert_complete(store, keys)
@@ -0,0 +1,53 @@
+"""Hedged requests"""
+
+import asyncio
+
+import pytest
+
+from src.core.hedging import Hedger, HedgingConfig
+
+
+def hedger(backup, delay: float, **config) -> Hedger:
+    async def select(call, tool):
+        return backup, delay
+
+    return Hedger(select, HedgingConfig(enabled=True, **config))
+
+
+async def test_slow_primary_loses_to_hedge(make_tool):
+    primary, backup = make_tool("primary"), make_tool("backup", server_id="other")
+
+    async def attempt(tool):
+        await asyncio.sleep(1 if tool is primary else 0)
+        return tool.id
+
+    assert await hedger(backup, 0.01).run({}, primary, attempt) == (
+        "backup",
+        backup,
+        True,
+    )
+
+
+@pytest.mark.parametrize("burst", [10.0, 0.0])
+async def test_cancelling_the_caller_cancels_the_primary(make_tool, burst):
+    primary = make_tool("primary")
+    started, cancelled = asyncio.Event(), []
+
+    async def attempt(tool):
+        started.set()
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(tool.id)
+            raise
+
+    # Cancelled while waiting for the hedge delay, or with the budget spent
+    hedged = hedger(make_tool("backup"), 0.5 if burst else 0.0, budget_burst=burst)
+    run = asyncio.create_task(hedged.run({}, primary, attempt))
+    await started.wait()
+    await asyncio.sleep(0.01)
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+    await asyncio.sleep(0)
+    assert cancelled == ["primary"]
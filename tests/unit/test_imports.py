@@ -0,0 +1,27 @@
+"""Importing the orchestrator must not load the heavy optional dependencies"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_orchestrator_import_does_not_load_models_or_faiss():
+    script = (
+        "import json, sys\n"
+        "import src.core.orchestrator\n"
+        "print(json.dumps(sorted(\n"
+        "    name for name in ('faiss', 'sentence_transformers', 'torch')\n"
+        "    if name in sys.modules\n"
+        ")))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert json.loads(result.stdout) == []
@@ -0,0 +1,147 @@
+"""Spans, events and their exporters"""
+
+import pytest
+
+from src.core.circuit_breaker import CircuitBreakerConfig, MCPCircuitBreaker
+from src.core.instrumentation import (
+    NULL_SPAN,
+    InMemoryExporter,
+    Instrumentation,
+    OpenTelemetryExporter,
+    PrometheusExporter,
+)
+
+
+class RecordingInstrumentation(Instrumentation):
+    """Disabled instrumentation that remembers what call sites passed in"""
+
+    def __init__(self):
+        super().__init__()
+        self.attributes = []
+
+    def span(self, name, attributes=None, parent=None):
+        self.attributes.append(attributes)
+        return super().span(name, attributes, parent)
+
+    def event(self, name, attributes=None):
+        self.attributes.append(attributes)
+        super().event(name, attributes)
+
+
+async def fail():
+    raise ConnectionError("server down")
+
+
+def test_disabled_instrumentation_is_a_no_op():
+    instrumentation = Instrumentation()
+    assert not instrumentation.enabled
+    with instrumentation.span("phase", {"server": "a"}) as span:
+        assert span is NULL_SPAN
+        span.set_attribute("ignored", 1)
+    instrumentation.event("event", {"server": "a"})
+    assert instrumentation.get_metrics() == {}
+
+
+async def test_disabled_call_sites_build_no_attributes(make_orchestrator, make_tool):
+    instrumentation = RecordingInstrumentation()
+    orchestrator = make_orchestrator(instrumentation=instrumentation)
+    tool = make_tool("search")
+    await orchestrator.create_execution_plan(
+        [
+            {"id": "a", "tool": tool, "inputs": {}},
+            {"id": "b", "tool": tool, "inputs": {"x": "$a.out"}},
+        ]
+    )
+    breaker = MCPCircuitBreaker(
+        "server", CircuitBreakerConfig(failure_threshold=1), instrumentation
+    )
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    assert instrumentation.attributes
+    assert all(attributes is None for attributes in instrumentation.attributes)
+
+
+def test_in_memory_exporter_counts_phases_errors_and_events():
+    exporter = InMemoryExporter()
+    instrumentation = Instrumentation([exporter])
+    with instrumentation.span("phase"):
+        instrumentation.event("hit")
+    with pytest.raises(ValueError):
+        with instrumentation.span("phase"):
+            raise ValueError()
+
+    metrics = instrumentation.get_metrics()
+    assert metrics["phases"]["phase"]["count"] == 2
+    assert metrics["phases"]["phase"]["errors"] == 1
+    assert metrics["events"] == {"hit": 1}
+
+
+def test_prometheus_exporter_records_phases_and_breaker_state():
+    prometheus_client = pytest.importorskip("prometheus_client")
+    registry = prometheus_client.CollectorRegistry()
+    instrumentation = Instrumentation([PrometheusExporter(registry=registry)])
+
+    with instrumentation.span("breaker.call", {"server": "github"}):
+        pass
+    with pytest.raises(RuntimeError):
+        with instrumentation.span("breaker.call", {"server": "github"}):
+            raise RuntimeError()
+    instrumentation.event(
+        "circuit_breaker.state_change",
+        {"server": "github", "from_state": "closed", "to_state": "open"},
+    )
+
+    def sample(name, **labels):
+        return registry.get_sample_value(f"localmcp_{name}", labels)
+
+    labels = {"phase": "breaker.call", "server": "github"}
+    assert sample("phase_duration_seconds_count", **labels) == 2
+    assert sample("phase_errors_total", **labels) == 1
+    assert (
+        sample(
+            "breaker_transitions_total",
+            server="github",
+            from_state="closed",
+            to_state="open",
+        )
+        == 1
+    )
+    assert sample("breaker_state", server="github") == 2
+    assert (
+        sample("events_total", event="circuit_breaker.state_change", server="github")
+        == 1
+    )
+
+
+def test_opentelemetry_exporter_mirrors_span_tree():
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+    from opentelemetry.trace import StatusCode
+
+    finished = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(finished))
+    instrumentation = Instrumentation(
+        [OpenTelemetryExporter(provider.get_tracer("test"))]
+    )
+
+    with instrumentation.span("discovery", {"requests": 2}):
+        with pytest.raises(ValueError):
+            with instrumentation.span("discovery.search", {"filters": ["auth"]}):
+                instrumentation.event("cache.miss", {"key": 1})
+                raise ValueError("bad query")
+
+    spans = {span.name: span for span in finished.get_finished_spans()}
+    parent, child = spans["discovery"], spans["discovery.search"]
+    assert child.parent.span_id == parent.context.span_id
+    assert parent.attributes["requests"] == 2
+    # Values OpenTelemetry cannot hold are exported as strings
+    assert child.attributes["filters"] == "['auth']"
+    assert child.status.status_code == StatusCode.ERROR
+    assert [event.name for event in child.events] == ["cache.miss"]
+    assert child.events[0].attributes["key"] == "1"
@@ -0,0 +1,88 @@
+"""ONNX Runtime backend against the PyTorch model it was exported from
+
+Downloads and exports the model on first run; skipped unless the ``onnx``
+extra and sentence-transformers are installed.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+pytest.importorskip("sentence_transformers")
+
+from src.core.embedding_backend import OnnxConfig, load_backend  # noqa: E402
+from src.core.tool_index import normalize  # noqa: E402
+from src.core.vector_store import top_k_similar  # noqa: E402
+
+MODEL = "all-MiniLM-L6-v2"
+K = 5
+DOMAINS = ["github", "jira", "slack", "postgres", "s3", "calendar", "email", "grafana"]
+ACTIONS = [
+    ("create", "issue"),
+    ("list", "pull requests"),
+    ("search", "messages"),
+    ("query", "table rows"),
+    ("upload", "file"),
+    ("schedule", "meeting"),
+    ("send", "message"),
+    ("fetch", "dashboard metrics"),
+]
+
+
+def catalog():
+    texts, intents = [], []
+    for domain in DOMAINS:
+        for verb, noun in ACTIONS:
+            texts.append(
+                f"{domain} {domain}_{verb}_{noun.replace(' ', '_')} "
+                f"{verb.capitalize()} a {noun} in {domain}"
+            )
+    for i, (verb, noun) in enumerate(ACTIONS):
+        intents.append(f"I need to {verb} a {noun} in {DOMAINS[i % len(DOMAINS)]}")
+        intents.append(f"{verb} {noun}")
+    return texts, intents
+
+
+def rankings(backend, texts, intents):
+    tools = normalize(backend.encode(texts))
+    queries = normalize(np.stack([backend.encode([intent])[0] for intent in intents]))
+    ranked, _ = top_k_similar(queries @ tools.T, K)
+    return ranked, tools, queries
+
+
+@pytest.fixture(scope="module")
+def reference():
+    texts, intents = catalog()
+    return texts, intents, rankings(load_backend(MODEL), texts, intents)
+
+
+@pytest.fixture(scope="module")
+def onnx_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("onnx") / MODEL)
+
+
+@pytest.mark.parametrize(
+    "quantize, min_overlap, min_cosine",
+    [
+        (False, 0.95, 0.999),
+        (True, 0.9, 0.95),
+    ],
+)
+def test_onnx_backend_matches_pytorch(
+    reference, onnx_dir, quantize, min_overlap, min_cosine
+):
+    texts, intents, (expected, tools, queries) = reference
+    backend = load_backend(
+        MODEL, "onnx", OnnxConfig(model_dir=onnx_dir, quantize=quantize)
+    )
+    ranked, onnx_tools, onnx_queries = rankings(backend, texts, intents)
+
+    overlap = np.mean(
+        [len(set(row) & set(truth)) / K for row, truth in zip(ranked, expected)]
+    )
+    assert overlap >= min_overlap
+    cosines = np.concatenate(
+        [(tools * onnx_tools).sum(axis=1), (queries * onnx_queries).sum(axis=1)]
+    )
+    assert cosines.min() >= min_cosine
@@ -0,0 +1,166 @@
+"""Streaming dataflow execution of plans"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.circuit_breaker import CircuitBreakerRegistry
+from src.core.orchestrator import ExecutionPlan
+from src.core.plan_executor import (
+    DependencyFailedError,
+    PlanExecutor,
+    resolve_reference,
+)
+
+
+@pytest.fixture
+def make_plan(make_tool):
+    """Plan over ``{call_id: (dependencies, inputs)}``, one server per call"""
+
+    def make(calls):
+        plan = ExecutionPlan()
+        for call_id, (dependencies, inputs) in calls.items():
+            plan.dependencies[call_id] = list(dependencies)
+            plan.calls[call_id] = {"id": call_id, "inputs": inputs}
+            plan.tools[call_id] = make_tool(call_id, server_id=f"server_{call_id}")
+        return plan
+
+    return make
+
+
+class Server:
+    """``invoke`` stand-in: per-tool delays, failures and call log"""
+
+    def __init__(self, delays=None, failures=(), results=None):
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.results = results or {}
+        self.started = {}
+        self.inputs = {}
+        self.cancelled = []
+
+    async def invoke(self, tool, inputs):
+        self.started[tool.id] = time.monotonic()
+        self.inputs[tool.id] = inputs
+        try:
+            await asyncio.sleep(self.delays.get(tool.id, 0.0))
+        except asyncio.CancelledError:
+            self.cancelled.append(tool.id)
+            raise
+        if tool.id in self.failures:
+            raise RuntimeError(f"{tool.id} failed")
+        return self.results.get(tool.id, tool.id)
+
+
+async def run(plan, server):
+    executor = PlanExecutor(server.invoke, CircuitBreakerRegistry())
+    return [result async for result in executor.execute(plan)]
+
+
+async def test_call_starts_when_its_own_dependencies_finish(make_plan):
+    plan = make_plan(
+        {
+            "slow": ([], {}),
+            "fast": ([], {}),
+            "dependent": (["fast"], {}),
+        }
+    )
+    plan.stages = [["slow", "fast"], ["dependent"]]
+    server = Server(delays={"slow": 0.2, "fast": 0.01})
+    results = await run(plan, server)
+
+    # No stage barrier: the dependent ran while the slow call was still going
+    assert server.started["dependent"] < server.started["slow"] + 0.1
+    assert [result.call_id for result in results] == ["fast", "dependent", "slow"]
+
+
+async def test_results_stream_in_completion_order(make_plan):
+    plan = make_plan({"a": ([], {}), "b": ([], {}), "c": ([], {})})
+    server = Server(delays={"a": 0.06, "b": 0.0, "c": 0.03})
+    results = await run(plan, server)
+    assert [result.call_id for result in results] == ["b", "c", "a"]
+    assert all(result.ok for result in results)
+
+
+async def test_references_resolve_to_dependency_outputs(make_plan):
+    plan = make_plan(
+        {
+            "user": ([], {}),
+            "greet": (
+                ["user"],
+                {
+                    "name": "$user.profile.name",
+                    "whole": "$user",
+                    "literal": "$not_a_call.field",
+                    "plain": "hello",
+                },
+            ),
+        }
+    )
+    output = {"profile": {"name": "ada"}}
+    server = Server(results={"user": output})
+    results = await run(plan, server)
+    assert all(result.ok for result in results)
+    assert server.inputs["greet"] == {
+        "name": "ada",
+        "whole": output,
+        "literal": "$not_a_call.field",
+        "plain": "hello",
+    }
+
+
+def test_reference_walks_keys_then_attributes():
+    outputs = {"a": {"item": SimpleNamespace(size=3)}}
+    assert resolve_reference("$a.item.size", outputs) == 3
+    assert resolve_reference(7, outputs) == 7
+    with pytest.raises(KeyError):
+        resolve_reference("$a.missing", outputs)
+    with pytest.raises(AttributeError):
+        resolve_reference("$a.item.missing", outputs)
+
+
+async def test_missing_field_fails_only_the_referencing_call(make_plan):
+    plan = make_plan(
+        {
+            "source": ([], {}),
+            "reader": (["source"], {"value": "$source.missing"}),
+        }
+    )
+    results = {r.call_id: r for r in await run(plan, Server(results={"source": {}}))}
+    assert results["source"].ok
+    assert isinstance(results["reader"].error, KeyError)
+
+
+async def test_dependents_of_failed_call_are_skipped(make_plan):
+    plan = make_plan(
+        {
+            "a": ([], {}),
+            "b": (["a"], {}),
+            "c": (["b"], {}),
+            "independent": ([], {}),
+        }
+    )
+    server = Server(failures={"a"})
+    results = {r.call_id: r for r in await run(plan, server)}
+
+    assert isinstance(results["a"].error, RuntimeError)
+    assert results["independent"].ok
+    for call_id in ("b", "c"):
+        assert isinstance(results[call_id].error, DependencyFailedError)
+        assert results[call_id].error.dependency_id == "a"
+    assert set(server.started) == {"a", "independent"}
+
+
+async def test_closing_the_stream_cancels_in_flight_calls(make_plan):
+    plan = make_plan({"fast": ([], {}), "slow": ([], {})})
+    server = Server(delays={"slow": 1.0})
+    executor = PlanExecutor(server.invoke, CircuitBreakerRegistry())
+    stream = executor.execute(plan)
+
+    first = await stream.__anext__()
+    assert first.call_id == "fast"
+    await stream.aclose()
+    await asyncio.sleep(0.01)
+    assert server.cancelled == ["slow"]
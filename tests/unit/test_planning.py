@@ -0,0 +1,159 @@
+"""Execution planning: dependency layering, cycles and duration estimates"""
+
+import pytest
+
+from src.core.orchestrator import DependencyCycleError, ExecutionPlan
+
+
+def test_layering_places_calls_after_their_latest_dependency(make_orchestrator):
+    orchestrator = make_orchestrator()
+    groups = orchestrator._find_parallel_groups(
+        {
+            "a": [],
+            "b": ["a"],
+            "c": [],
+            "d": ["b"],
+        }
+    )
+    assert groups == [["a", "c"], ["b"], ["d"]]
+
+
+def test_layering_depth_is_longest_chain(make_orchestrator):
+    orchestrator = make_orchestrator()
+    groups = orchestrator._find_parallel_groups(
+        {
+            "fetch": [],
+            "parse": ["fetch"],
+            "lookup": [],
+            "merge": ["parse", "lookup"],
+        }
+    )
+    assert groups == [["fetch", "lookup"], ["parse"], ["merge"]]
+
+
+def test_cycle_raises_value_error(make_orchestrator):
+    orchestrator = make_orchestrator()
+    with pytest.raises(ValueError) as info:
+        orchestrator._find_parallel_groups(
+            {"a": ["c"], "b": ["a"], "c": ["b"], "d": []}
+        )
+    assert isinstance(info.value, DependencyCycleError)
+    assert sorted(info.value.call_ids) == ["a", "b", "c"]
+
+
+async def test_create_execution_plan_follows_references(make_orchestrator, make_tool):
+    orchestrator = make_orchestrator()
+    tool = make_tool("search")
+    plan = await orchestrator.create_execution_plan(
+        [
+            {"id": "a", "tool": tool, "inputs": {}},
+            {"id": "b", "tool": tool, "inputs": {"source": "$a.result"}},
+            {"id": "c", "tool": tool, "inputs": {"literal": "$not_a_call"}},
+            {"id": "d", "tool": tool, "inputs": {"source": "$b.result"}},
+        ]
+    )
+    assert plan.stages == [["a", "c"], ["b"], ["d"]]
+    assert plan.dependencies == {"a": [], "b": ["a"], "c": [], "d": ["b"]}
+
+
+async def test_cyclic_plan_is_rejected(make_orchestrator, make_tool):
+    orchestrator = make_orchestrator()
+    tool = make_tool("search")
+    with pytest.raises(ValueError):
+        await orchestrator.create_execution_plan(
+            [
+                {"id": "a", "tool": tool, "inputs": {"x": "$b.out"}},
+                {"id": "b", "tool": tool, "inputs": {"x": "$a.out"}},
+            ]
+        )
+
+
+async def test_duration_estimate_percentiles_are_ordered(make_orchestrator, make_tool):
+    orchestrator = make_orchestrator()
+    fast, slow = make_tool("fast"), make_tool("slow")
+    for i in range(200):
+        orchestrator.record_execution(fast, True, 10.0 + i % 10)
+        orchestrator.record_execution(slow, True, 50.0 + i % 100)
+
+    plan = ExecutionPlan(tools={"a": fast, "b": slow, "c": fast})
+    plan.add_parallel_stage(["a", "b"])
+    plan.add_parallel_stage(["c"])
+    estimate = await orchestrator._estimate_duration(plan)
+
+    assert 0 < estimate.p50 < estimate.p95
+    for stage in estimate.stages:
+        assert stage.p50 <= stage.p95
+    # The slow tool bounds the parallel stage; stages add up
+    assert estimate.stages[0].critical_call == "b"
+    assert estimate.stages[0].p50 >= 50.0
+    assert estimate.p50 >= estimate.stages[0].p50 + 10.0
+
+
+async def test_unknown_tools_use_default_latency(make_orchestrator):
+    orchestrator = make_orchestrator()
+    plan = ExecutionPlan(tools={"a": None})
+    plan.add_parallel_stage(["a"])
+    estimate = await orchestrator._estimate_duration(plan)
+    assert estimate.p50 == estimate.p95 == orchestrator.default_tool_latency
+
+
+@pytest.fixture
+def narrow_server_calls(make_orchestrator, make_tool):
+    """Four 10ms calls on a server that admits two at a time"""
+    orchestrator = make_orchestrator()
+    orchestrator.circuit_breakers.get_bulkhead("narrow").limit = 2.0
+    tool = make_tool("lookup", server_id="narrow")
+    for _ in range(100):
+        orchestrator.record_execution(tool, True, 10.0)
+    calls = [{"id": f"c{i}", "tool": tool, "inputs": {}} for i in range(4)]
+    return orchestrator, calls
+
+
+async def test_without_slo_the_fastest_plan_wins(narrow_server_calls):
+    orchestrator, calls = narrow_server_calls
+    plan = await orchestrator.create_execution_plan(calls)
+    assert plan.strategy != "default"
+    assert [len(stage) for stage in plan.stages] == [2, 2]
+    assert plan.latency_slo is None and plan.meets_slo is None
+
+
+async def test_loose_slo_picks_the_most_conservative_plan(narrow_server_calls):
+    orchestrator, calls = narrow_server_calls
+    plan = await orchestrator.create_execution_plan(calls, latency_slo=100.0)
+    assert plan.strategy == "default"
+    assert [len(stage) for stage in plan.stages] == [1, 1, 1, 1]
+    assert plan.latency_slo == 100.0
+    assert plan.meets_slo
+
+
+async def test_tight_slo_keeps_the_plan_that_meets_it(narrow_server_calls):
+    orchestrator, calls = narrow_server_calls
+    plan = await orchestrator.create_execution_plan(calls, latency_slo=30.0)
+    assert [len(stage) for stage in plan.stages] == [2, 2]
+    assert plan.duration.p95 <= 30.0
+    assert plan.meets_slo
+
+
+async def test_unreachable_slo_returns_the_fastest_plan(narrow_server_calls):
+    orchestrator, calls = narrow_server_calls
+    plan = await orchestrator.create_execution_plan(calls, latency_slo=5.0)
+    assert [len(stage) for stage in plan.stages] == [2, 2]
+    assert plan.latency_slo == 5.0
+    assert plan.meets_slo is False
+
+
+async def test_each_stage_names_its_critical_call(make_orchestrator, make_tool):
+    orchestrator = make_orchestrator()
+    latencies = {"a": 10.0, "b": 50.0, "c": 80.0, "d": 5.0}
+    tools = {call_id: make_tool(call_id) for call_id in latencies}
+    for call_id, latency in latencies.items():
+        for _ in range(100):
+            orchestrator.record_execution(tools[call_id], True, latency)
+
+    plan = ExecutionPlan(tools=tools)
+    plan.add_parallel_stage(["a", "b"])
+    plan.add_parallel_stage(["c", "d"])
+    estimate = await orchestrator._estimate_duration(plan)
+
+    assert [stage.critical_call for stage in estimate.stages] == ["b", "c"]
+    assert all(stage.critical_share == 1.0 for stage in estimate.stages)
@@ -0,0 +1,109 @@
+"""Tool result caching and single-flight"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.core.circuit_breaker import CircuitOpenError, DeadlineExceededError
+from src.core.result_cache import ResultCache, ResultCacheConfig
+
+
+@pytest.fixture
+def tool(make_tool):
+    return make_tool("search", cacheable=True)
+
+
+def counting_call(result="value", delay=0.0):
+    """Call function that records the fallback it was handed"""
+
+    async def call(fallback):
+        call.fallbacks.append(fallback)
+        await asyncio.sleep(delay)
+        return result
+
+    call.fallbacks = []
+    return call
+
+
+async def test_results_are_cached_by_canonical_inputs(tool):
+    cache, call = ResultCache(), counting_call()
+    assert await cache.get_or_call(tool, {"q": "x", "n": 1}, call) == "value"
+    assert await cache.get_or_call(tool, {"n": 1, "q": "x"}, call) == "value"
+    assert await cache.get_or_call(tool, {"q": "y", "n": 1}, call) == "value"
+    assert len(call.fallbacks) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+async def test_expired_results_are_fetched_again(tool):
+    cache, call = ResultCache(ResultCacheConfig(ttls={"search": 0.0})), counting_call()
+    await cache.get_or_call(tool, {}, call)
+    await cache.get_or_call(tool, {}, call)
+    assert len(call.fallbacks) == 2
+
+
+async def test_concurrent_identical_calls_share_one_request(tool):
+    cache, call = ResultCache(), counting_call(delay=0.01)
+    results = await asyncio.gather(
+        *(cache.get_or_call(tool, {}, call) for _ in range(3))
+    )
+    assert results == ["value"] * 3
+    assert len(call.fallbacks) == 1
+    assert cache.coalesced == 2
+    assert cache.get_metrics()["inflight"] == 0
+
+
+async def test_cancelled_caller_does_not_cancel_shared_call(tool):
+    cache, call = ResultCache(), counting_call(delay=0.02)
+    first = asyncio.create_task(cache.get_or_call(tool, {}, call))
+    second = asyncio.create_task(cache.get_or_call(tool, {}, call))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "value"
+    assert len(call.fallbacks) == 1
+
+
+async def test_expired_value_serves_as_breaker_fallback(tool):
+    cache = ResultCache(ResultCacheConfig(default_ttl=0.0))
+    await cache.get_or_call(tool, {}, counting_call("stale"))
+
+    async def circuit_open(fallback):
+        return await fallback(tool, {})
+
+    assert await cache.get_or_call(tool, {}, circuit_open) == "stale"
+    assert cache.fallback_hits == 1
+
+
+async def test_missing_fallback_raises_circuit_open(tool):
+    async def circuit_open(fallback):
+        return await fallback(tool, {})
+
+    with pytest.raises(CircuitOpenError):
+        await ResultCache().get_or_call(tool, {}, circuit_open)
+
+
+async def test_caller_with_earlier_deadline_stops_waiting_at_it(tool):
+    cache, call = ResultCache(), counting_call(delay=0.05)
+    now = time.monotonic()
+    shared = asyncio.create_task(cache.get_or_call(tool, {}, call, deadline=now + 1))
+    await asyncio.sleep(0)
+    with pytest.raises(DeadlineExceededError):
+        await cache.get_or_call(tool, {}, call, deadline=now + 0.01)
+    assert await shared == "value"
+    assert len(call.fallbacks) == 1
+
+
+async def test_caller_with_later_deadline_makes_its_own_call(tool):
+    cache = ResultCache()
+    now = time.monotonic()
+    short = counting_call("short", delay=0.02)
+    long = counting_call("long", delay=0.02)
+    first = asyncio.create_task(cache.get_or_call(tool, {}, short, deadline=now + 0.1))
+    await asyncio.sleep(0)
+    # Not bound to the first caller's deadline; later callers join this call
+    second = asyncio.create_task(cache.get_or_call(tool, {}, long, deadline=None))
+    await asyncio.sleep(0)
+    third = asyncio.create_task(cache.get_or_call(tool, {}, short, deadline=now + 0.5))
+    assert await asyncio.gather(first, second, third) == ["short", "long", "long"]
+    assert (len(short.fallbacks), len(long.fallbacks)) == (1, 1)
+    assert cache.get_metrics()["inflight"] == 0
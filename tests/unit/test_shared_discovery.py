@@ -0,0 +1,44 @@
+"""Discovery on a worker attached to a builder's shared index"""
+
+import pytest
+
+pytest.importorskip("faiss")
+
+
+@pytest.fixture
+def catalog(make_tool):
+    names = [
+        "archive_ticket",
+        "create_issue",
+        "list_repos",
+        "send_email",
+        "query_metrics",
+    ]
+    return [make_tool(name, description=name.replace("_", " ")) for name in names]
+
+
+@pytest.mark.parametrize("fast_path", [True, False])
+async def test_worker_never_returns_tools_the_builder_removed(
+    tmp_path, make_orchestrator, catalog, fast_path
+):
+    from src.core.lexical_index import RetrievalConfig
+
+    builder = make_orchestrator(catalog, shared_index_dir=str(tmp_path))
+    # The worker's registry still lists the tool, as one lagging behind would
+    worker = make_orchestrator(
+        registry=builder.tool_registry,
+        shared_index_dir=str(tmp_path),
+        shared_index_role="worker",
+        retrieval_config=RetrievalConfig(fast_path=fast_path),
+    )
+    await builder.initialize()
+    await worker.initialize()
+    intents = [("archive_ticket", {}), ("archive a ticket", {})]
+    found = await worker.discover_tools_batch(intents, top_k=5)
+    assert all("archive_ticket" in [s.tool.id for s in scores] for scores in found)
+
+    await builder.remove_tools(["archive_ticket"])
+    assert await worker.refresh_shared_index()
+    for scores in await worker.discover_tools_batch(intents, top_k=5):
+        assert "archive_ticket" not in [s.tool.id for s in scores]
+    assert "archive_ticket" not in worker.lexical_index
@@ -0,0 +1,83 @@
+"""Versioned shared index snapshots"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.core.shared_index import SharedIndexStore
+from src.core.tool_index import IndexConfig, ToolIndex
+from src.core.vector_store import VectorStoreIndex
+
+pytest.importorskip("faiss")
+
+
+@pytest.fixture
+def catalog(make_tool):
+    tools = [make_tool(f"t{i}") for i in range(50)]
+    vectors = np.random.default_rng(0).standard_normal((50, 16)).astype("float32")
+    return tools, vectors
+
+
+@pytest.mark.parametrize("backend", ["flat", "hnsw"])
+def test_attached_snapshot_matches_builder(tmp_path, catalog, backend):
+    tools, vectors = catalog
+    builder = ToolIndex(16, IndexConfig(backend=backend))
+    builder.upsert(tools, vectors)
+    store = SharedIndexStore(str(tmp_path))
+    version = store.publish(builder)
+
+    worker, attached = store.attach({tool.id: tool for tool in tools})
+    assert attached == version == 1
+    assert isinstance(worker.vectors.codes, np.memmap)
+    # Flat snapshots are searched straight from the mapped vectors
+    assert isinstance(worker.index, VectorStoreIndex) == (backend == "flat")
+
+    query = vectors[:3] + 0.1
+    expected = [[tool.id for tool, _ in hits] for hits in builder.search(query, 5)]
+    assert [
+        [tool.id for tool, _ in hits] for hits in worker.search(query, 5)
+    ] == expected
+
+
+def test_publish_skips_leftover_version_directories(tmp_path, catalog):
+    tools, vectors = catalog
+    index = ToolIndex(16, IndexConfig(backend="flat"))
+    index.upsert(tools, vectors)
+    store = SharedIndexStore(str(tmp_path), keep_versions=5)
+    assert store.publish(index) == 1
+
+    # An interrupted publish left v2 behind without moving CURRENT
+    leftover = os.path.join(str(tmp_path), "v00000002")
+    os.makedirs(leftover)
+    open(os.path.join(leftover, "meta.json"), "w").close()
+    assert store.publish(index) == 3
+    assert store.current_version() == 3
+    assert store.attach({tool.id: tool for tool in tools})[1] == 3
+
+
+@pytest.mark.parametrize("backend", ["flat", "hnsw"])
+def test_version_pruned_before_attach_is_skipped(tmp_path, catalog, backend):
+    tools, vectors = catalog
+    index = ToolIndex(16, IndexConfig(backend=backend))
+    index.upsert(tools, vectors)
+    store = SharedIndexStore(str(tmp_path), keep_versions=1)
+    store.publish(index)
+    version = store.current_version()
+
+    # The builder publishes again and prunes the version a worker just read
+    assert store.publish(index) == version + 1
+    assert not os.path.exists(store._version_dir(version))
+    assert store.attach({tool.id: tool for tool in tools}, version=version) is None
+    assert store.attach({tool.id: tool for tool in tools})[1] == version + 1
+
+
+def test_faiss_file_pruned_mid_attach_is_skipped(tmp_path, catalog):
+    tools, vectors = catalog
+    index = ToolIndex(16, IndexConfig(backend="hnsw"))
+    index.upsert(tools, vectors)
+    store = SharedIndexStore(str(tmp_path))
+    version = store.publish(index)
+
+    os.remove(os.path.join(store._version_dir(version), "index.faiss"))
+    assert store.attach({tool.id: tool for tool in tools}) is None
@@ -0,0 +1,107 @@
+"""Incremental tool index backends"""
+
+import numpy as np
+import pytest
+
+from src.core.tool_index import IndexConfig, ToolIndex
+from src.core.vector_store import VectorStoreIndex
+
+pytest.importorskip("faiss")
+
+
+def vectors(num: int, dimension: int = 16, seed: int = 0) -> np.ndarray:
+    return (
+        np.random.default_rng(seed).standard_normal((num, dimension)).astype("float32")
+    )
+
+
+def test_ivf_pq_replaces_flat_fallback_once_trainable(make_tool):
+    index = ToolIndex(16, IndexConfig(backend="ivf_pq", pq_bits=4))
+    index.upsert([make_tool(f"t{i}") for i in range(10)], vectors(10))
+    assert index.backend == "flat"
+    assert not index.needs_rebuild()
+
+    index.upsert([make_tool(f"t{i}") for i in range(10, 1000)], vectors(990, seed=1))
+    assert index.needs_rebuild()
+    index.rebuild()
+    assert index.backend == "ivf_pq"
+    assert not index.needs_rebuild()
+    assert len(index.search(vectors(1, seed=2), 5)[0]) == 5
+
+
+def test_flat_index_keeps_one_copy_of_the_vectors(tmp_path, make_tool):
+    tools = [make_tool(f"t{i}") for i in range(50)]
+    embeddings = vectors(50)
+    index = ToolIndex(16, IndexConfig(backend="flat"))
+    index.upsert(tools, embeddings)
+    assert isinstance(index.index, VectorStoreIndex)
+    assert index.index.store is index.vectors
+
+    index.remove(["t0"])
+    expected = [
+        [tool.id for tool, _ in hits] for hits in index.search(embeddings[:5], 3)
+    ]
+    assert "t0" not in expected[0]
+
+    keys = {tool.id: "k" for tool in tools}
+    index_path, meta_path = str(tmp_path / "index.faiss"), str(tmp_path / "index.json")
+    index.save(index_path, meta_path, keys)
+    restored, pending = ToolIndex.load(
+        index_path, meta_path, tools, keys, embeddings, IndexConfig(backend="flat")
+    )
+    assert pending == [0]
+    found = [
+        [tool.id for tool, _ in hits] for hits in restored.search(embeddings[:5], 3)
+    ]
+    assert found == expected
+
+
+@pytest.fixture
+def sparse_catalog(make_tool):
+    """2000 tools on 20 servers; 1 in 50 has the "billing" capability"""
+    tools = [
+        make_tool(
+            f"t{i}",
+            server_id=f"s{i % 20}",
+            capabilities=["billing"] if i % 50 == 7 else ["search"],
+        )
+        for i in range(2000)
+    ]
+    return tools, vectors(2000, seed=3)
+
+
+@pytest.mark.parametrize(
+    "config, min_recall",
+    [
+        (IndexConfig(backend="flat"), 1.0),
+        # No exact fallback: the HNSW search itself runs with an IDSelectorBitmap
+        (IndexConfig(backend="hnsw", exact_filter_max=0, ef_search=128), 0.8),
+    ],
+    ids=["flat_exact", "hnsw_bitmap"],
+)
+def test_restrictive_filter_still_returns_top_k(sparse_catalog, config, min_recall):
+    from src.core.capability_index import ToolFilter
+
+    tools, embeddings = sparse_catalog
+    index = ToolIndex(16, config)
+    index.upsert(tools, embeddings)
+    assert index.backend == config.backend
+
+    tool_filter = ToolFilter(
+        capabilities=frozenset({"billing"}), excluded_servers=frozenset({"s7", "s8"})
+    )
+    valid = [i for i, tool in enumerate(tools) if tool_filter.matches(tool)]
+    assert len(valid) == 20  # 1% of the catalog qualifies
+
+    queries = vectors(5, seed=4)
+    for query, results in zip(queries, index.search(queries, 10, tool_filter)):
+        assert len(results) == 10
+        assert all(tool_filter.matches(tool) for tool, _ in results)
+
+        unit = embeddings[valid] / np.linalg.norm(
+            embeddings[valid], axis=1, keepdims=True
+        )
+        nearest = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:10]
+        expected = {tools[valid[i]].id for i in nearest}
+        found = {tool.id for tool, _ in results}
+        assert len(found & expected) >= min_recall * 10